@@ -0,0 +1,270 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from aggregation import ASPECTS, RunningAggregate
+from cache import normalize_for_cache
+
+HISTOGRAM_BINS = 10
+
+
+def _bin(score):
+    return min(max(int(score * HISTOGRAM_BINS), 0), HISTOGRAM_BINS - 1)
+
+
+class AggregateStore:
+    """
+    Materialized per-product sentiment aggregates in SQLite: running sums,
+    counts and score histograms overall and per aspect. Reviews are folded in
+    incrementally (each review once per product, see review_keys), so answering
+    a comparison costs O(aspects) per product instead of rescoring every review.
+    Aggregates are tied to the model version that scored them; reviews folded in
+    under another version replace the product's aggregates instead of mixing in.
+    """
+
+    def __init__(self, db_path=':memory:', max_age_seconds=3600, aspects=ASPECTS):
+        """
+        db_path: SQLite file shared by all workers (':memory:' keeps it per process)
+        max_age_seconds: after this long a product's reviews are fetched again
+        """
+        self.db_path = db_path
+        self.max_age_seconds = max_age_seconds
+        self.aspects = list(aspects)
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        # Autocommit mode; writes take BEGIN IMMEDIATE so concurrent workers serialize
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS products (
+                product TEXT PRIMARY KEY,
+                review_count INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                histogram TEXT NOT NULL,
+                sample_reviews TEXT,
+                model_version TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS aspects (
+                product TEXT NOT NULL,
+                aspect TEXT NOT NULL,
+                review_count INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                histogram TEXT NOT NULL,
+                PRIMARY KEY (product, aspect)
+            );
+            CREATE TABLE IF NOT EXISTS reviews (
+                product TEXT NOT NULL,
+                review_key TEXT NOT NULL,
+                PRIMARY KEY (product, review_key)
+            ) WITHOUT ROWID;
+        ''')
+        # Databases created before model versions were tracked; their NULL version
+        # never matches, so those products are rebuilt on their next refresh
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(products)')}
+        if 'model_version' not in columns:
+            self._db.execute('ALTER TABLE products ADD COLUMN model_version TEXT')
+
+    def reopen(self):
+        """Open a fresh connection; call in a forked worker, which must not reuse the parent's"""
+        with self._lock:
+            self._connect()
+
+    @contextmanager
+    def _transaction(self):
+        # Caller holds self._lock
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+            self._db.execute('COMMIT')
+        except Exception:
+            self._db.execute('ROLLBACK')
+            raise
+
+    @staticmethod
+    def review_keys(reviews):
+        """
+        Stable identity for each review of a listing: the scraper's id, or its
+        (source, page, position), when the record has them; otherwise the text
+        hash plus its occurrence number, so identical reviews from different
+        buyers each count while refetching the same listing adds nothing
+        reviews: strings or scraper records with 'text'
+        """
+        keys, occurrences = [], {}
+        for review in reviews:
+            record = review if isinstance(review, dict) else {'text': review}
+            source = record.get('source', '')
+            if record.get('id') is not None:
+                keys.append(f"{source}:id:{record['id']}")
+            elif record.get('page') is not None and record.get('position') is not None:
+                keys.append(f"{source}:{record['page']}:{record['position']}")
+            else:
+                digest = hashlib.sha256(normalize_for_cache(record['text']).encode('utf-8')).hexdigest()[:32]
+                occurrence = occurrences.get(digest, 0)
+                occurrences[digest] = occurrence + 1
+                keys.append(f"{digest}#{occurrence}")
+        return keys
+
+    def unseen(self, product, reviews, model_version=None):
+        """
+        Reviews not yet folded into the product's aggregates by model_version;
+        everything is unseen when the aggregates came from another version
+        Returns: (keys, reviews) for the unseen ones, in input order
+        """
+        keys = self.review_keys(reviews)
+        seen = set()
+        with self._lock:
+            row = self._db.execute('SELECT model_version FROM products WHERE product = ?', (product,)).fetchone()
+            if row is None or row[0] == model_version:
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    seen.update(key for (key,) in self._db.execute(
+                        f'SELECT review_key FROM reviews WHERE product = ? AND review_key IN ({placeholders})',
+                        [product, *chunk]
+                    ))
+        unseen = [(key, review) for key, review in zip(keys, reviews) if key not in seen]
+        return [key for key, _ in unseen], [review for _, review in unseen]
+
+    def add_reviews(self, product, keys, scores, aspect_scores, model_version=None):
+        """
+        Fold scored reviews into the aggregates; reviews already counted are skipped.
+        If the product's aggregates were scored by another model version they
+        are dropped first, in the same transaction.
+        keys: review identities from review_keys / unseen
+        aspect_scores: one {aspect: score} per review
+        Returns: number of reviews added
+        """
+        with self._lock, self._transaction():
+            row = self._db.execute('SELECT model_version FROM products WHERE product = ?', (product,)).fetchone()
+            if row is not None and row[0] != model_version:
+                self._delete(product)
+            return self._add_reviews(product, keys, scores, aspect_scores, model_version)
+
+    def _add_reviews(self, product, keys, scores, aspect_scores, model_version):
+        count, total, histogram = 0, 0.0, [0] * HISTOGRAM_BINS
+        aspect_deltas = {}
+
+        for key, score, aspects in zip(keys, scores, aspect_scores):
+            inserted = self._db.execute(
+                'INSERT OR IGNORE INTO reviews (product, review_key) VALUES (?, ?)',
+                (product, key)
+            ).rowcount
+            if not inserted:
+                continue
+            count += 1
+            total += float(score)
+            histogram[_bin(score)] += 1
+            for aspect, aspect_score in aspects.items():
+                delta = aspect_deltas.setdefault(aspect, [0, 0.0, [0] * HISTOGRAM_BINS])
+                delta[0] += 1
+                delta[1] += aspect_score
+                delta[2][_bin(aspect_score)] += 1
+
+        if not count:
+            return 0
+
+        row = self._db.execute(
+            'SELECT review_count, score_sum, histogram FROM products WHERE product = ?', (product,)
+        ).fetchone()
+        if row is None:
+            self._db.execute(
+                'INSERT INTO products (product, review_count, score_sum, histogram, model_version, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (product, count, total, json.dumps(histogram), model_version, time.time())
+            )
+        else:
+            merged = [a + b for a, b in zip(json.loads(row[2]), histogram)]
+            self._db.execute(
+                'UPDATE products SET review_count = ?, score_sum = ?, histogram = ? WHERE product = ?',
+                (row[0] + count, row[1] + total, json.dumps(merged), product)
+            )
+
+        for aspect, (aspect_count, aspect_total, aspect_histogram) in aspect_deltas.items():
+            row = self._db.execute(
+                'SELECT review_count, score_sum, histogram FROM aspects WHERE product = ? AND aspect = ?',
+                (product, aspect)
+            ).fetchone()
+            if row is not None:
+                aspect_count += row[0]
+                aspect_total += row[1]
+                aspect_histogram = [a + b for a, b in zip(json.loads(row[2]), aspect_histogram)]
+            self._db.execute(
+                'INSERT OR REPLACE INTO aspects (product, aspect, review_count, score_sum, histogram) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (product, aspect, aspect_count, aspect_total, json.dumps(aspect_histogram))
+            )
+
+        return count
+
+    def touch(self, product, sample_reviews=None, model_version=None):
+        """Mark a product's aggregates as refreshed now"""
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO products (product, histogram, sample_reviews, model_version, updated_at) '
+                'VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(product) DO UPDATE SET updated_at = excluded.updated_at, '
+                'sample_reviews = COALESCE(excluded.sample_reviews, products.sample_reviews)',
+                (product, json.dumps([0] * HISTOGRAM_BINS),
+                 json.dumps(sample_reviews, ensure_ascii=False) if sample_reviews is not None else None,
+                 model_version, time.time())
+            )
+
+    def is_stale(self, product, model_version=None):
+        """
+        True if the product has never been refreshed, was refreshed over
+        max_age_seconds ago, or was scored by a model version other than model_version
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT updated_at, model_version FROM products WHERE product = ?', (product,)
+            ).fetchone()
+        return row is None or time.time() - row[0] > self.max_age_seconds or row[1] != model_version
+
+    def analysis(self, product):
+        """
+        Summary in analyze_product's format, straight from the stored aggregates
+        Returns: dict, or None for an unknown product
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT review_count, score_sum, histogram, sample_reviews, updated_at, model_version '
+                'FROM products WHERE product = ?',
+                (product,)
+            ).fetchone()
+            if row is None:
+                return None
+            aspect_rows = self._db.execute(
+                'SELECT aspect, review_count, score_sum, histogram FROM aspects WHERE product = ?', (product,)
+            ).fetchall()
+
+        aggregate = RunningAggregate(self.aspects)
+        aggregate.count, aggregate.total = row[0], row[1]
+        aspect_histograms = {}
+        for aspect, count, total, histogram in aspect_rows:
+            if aspect in aggregate.aspect_sums:
+                aggregate.aspect_sums[aspect] = total
+                aggregate.aspect_counts[aspect] = count
+                aspect_histograms[aspect] = json.loads(histogram)
+
+        analysis = aggregate.summary()
+        analysis['sample_reviews'] = json.loads(row[3]) if row[3] else []
+        analysis['score_histogram'] = json.loads(row[2])
+        analysis['aspect_histograms'] = aspect_histograms
+        analysis['updated_at'] = row[4]
+        analysis['model_version'] = row[5]
+        return analysis
+
+    def delete(self, product):
+        """Drop a product's aggregates so the next request rebuilds them"""
+        with self._lock, self._transaction():
+            self._delete(product)
+
+    def _delete(self, product):
+        # Caller holds self._lock inside a transaction
+        for table in ('products', 'aspects', 'reviews'):
+            self._db.execute(f'DELETE FROM {table} WHERE product = ?', (product,))
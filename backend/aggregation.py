@@ -0,0 +1,53 @@
+ASPECTS = ['Camera', 'Battery', 'Performance', 'Display', 'Value', 'Build Quality']
+
+
+class RunningAggregate:
+    """Running overall and per-aspect sentiment sums/counts for one product"""
+
+    def __init__(self, aspects=ASPECTS):
+        self.count = 0
+        self.total = 0.0
+        self.aspect_sums = {aspect: 0.0 for aspect in aspects}
+        self.aspect_counts = {aspect: 0 for aspect in aspects}
+
+    def add(self, score, aspects):
+        """
+        Fold in one review's score and the aspects it mentions. aspects is either
+        {aspect: aspect-level score} or a list of aspects scored with the review score.
+        """
+        self.count += 1
+        self.total += score
+        if not isinstance(aspects, dict):
+            aspects = dict.fromkeys(aspects, score)
+        for aspect, aspect_score in aspects.items():
+            if aspect in self.aspect_sums:
+                self.aspect_sums[aspect] += aspect_score
+                self.aspect_counts[aspect] += 1
+
+    def summary(self):
+        """Overall score, per-aspect scores, strengths and weaknesses so far"""
+        # Calculate scores (neutral until the first review arrives)
+        overall_score = self.total / self.count * 10 if self.count else 5.0
+
+        # Aspect scores
+        aspect_scores = {}
+        for aspect, total in self.aspect_sums.items():
+            count = self.aspect_counts[aspect]
+            if count:
+                aspect_scores[aspect] = int(total / count * 100)
+            else:
+                aspect_scores[aspect] = 50  # neutral
+
+        # Identify strengths and weaknesses
+        sorted_aspects = sorted(aspect_scores.items(), key=lambda x: x[1], reverse=True)
+        strengths = [asp[0] for asp in sorted_aspects[:3] if asp[1] > 70]
+        weaknesses = [asp[0] for asp in sorted_aspects[-3:] if asp[1] < 60]
+
+        return {
+            'overall_score': round(overall_score, 1),
+            'overall_sentiment': 'positive' if overall_score > 6 else 'neutral' if overall_score > 4 else 'negative',
+            'aspect_scores': aspect_scores,
+            'strengths': strengths if strengths else ['Overall Performance'],
+            'weaknesses': weaknesses if weaknesses else ['Price Point'],
+            'reviews_analyzed': self.count
+        }
@@ -1,18 +1,157 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from models import SentimentAnalyzer
+from backends import RuleBasedBackend
+from model_registry import DEFAULT_REGISTRY_DIR, ModelRegistry, ModelNotFoundError
 from aspect_extractor import AspectExtractor
 from preprocessor import TextPreprocessor
+from cache import SentimentCache
+from aggregate_store import AggregateStore
+from aggregation import ASPECTS, RunningAggregate
+from aspect_sentiment import PER_REVIEW_STATS
+from streaming import StreamingAnalyzer
+from dedup import Deduplicator
+from inference_worker import DeadlineExceededError, InferenceWorker, QueueFullError
+from concurrent.futures import ThreadPoolExecutor, wait
 import json
+import os
+import threading
+import time
 
 app = Flask(__name__)
 CORS(app)
 
 # Initialize components
-sentiment_analyzer = SentimentAnalyzer()
+# SENTIMENT_CACHE_DB enables the on-disk tier so cached scores survive restarts
+sentiment_cache = SentimentCache(
+    max_entries=int(os.environ.get('SENTIMENT_CACHE_SIZE', 10000)),
+    db_path=os.environ.get('SENTIMENT_CACHE_DB')
+)
+# Per-product aggregates; AGGREGATE_DB shares them across workers and restarts.
+# /api/compare answers from them until they are AGGREGATE_MAX_AGE_SECONDS old.
+aggregate_store = AggregateStore(
+    db_path=os.environ.get('AGGREGATE_DB', ':memory:'),
+    max_age_seconds=float(os.environ.get('AGGREGATE_MAX_AGE_SECONDS', 3600))
+)
+model_registry = ModelRegistry(os.environ.get('MODEL_REGISTRY_DIR', DEFAULT_REGISTRY_DIR))
+
+
+def build_analyzer(version=None):
+    """
+    Analyzer for a registered model version (MODEL_VERSION, else the registry's
+    current one); falls back to SENTIMENT_MODEL when nothing is registered.
+    SENTIMENT_BACKEND picks torch (default), onnx or rule;
+    SENTIMENT_QUANTIZE=1 serves the cached dynamic int8 torch model on CPU.
+    The model loads lazily so the server binds its port immediately.
+    """
+    options = {
+        'cache': sentiment_cache,
+        'quantize': os.environ.get('SENTIMENT_QUANTIZE') == '1',
+        'backend': os.environ.get('SENTIMENT_BACKEND', 'torch'),
+        'lazy': True
+    }
+    try:
+        return SentimentAnalyzer.from_registry(model_registry, version, **options)
+    except ModelNotFoundError:
+        if version:
+            raise
+        return SentimentAnalyzer(os.environ.get('SENTIMENT_MODEL', 'xlm-roberta-base'), **options)
+
+
 aspect_extractor = AspectExtractor()
 preprocessor = TextPreprocessor()
 
+# All inference goes through one worker so concurrent requests share batches.
+# Requests that would push the queue past INFERENCE_MAX_QUEUE_DEPTH get a 503,
+# or with INFERENCE_SHED_TO_RULES=1 are scored by the lexicon scorer instead;
+# a request larger than the whole queue is admitted in chunks as room frees up.
+# The worker holds the only reference to the serving analyzer (see current_analyzer),
+# so a hot swap leaves nothing pointing at the old model
+inference_worker = InferenceWorker(
+    build_analyzer(os.environ.get('MODEL_VERSION')),
+    max_batch_size=int(os.environ.get('INFERENCE_MAX_BATCH_SIZE', 64)),
+    max_wait_ms=float(os.environ.get('INFERENCE_MAX_WAIT_MS', 5)),
+    max_queue_depth=int(os.environ.get('INFERENCE_MAX_QUEUE_DEPTH', 4096)),
+    shed_scorer=RuleBasedBackend() if os.environ.get('INFERENCE_SHED_TO_RULES') == '1' else None
+)
+# Duplicate and near-duplicate spans (shingle Jaccard >= DEDUP_THRESHOLD) are
+# scored once; DEDUP_THRESHOLD=1 keeps exact-duplicate collapsing only
+streaming_analyzer = StreamingAnalyzer(
+    inference_worker, aspect_extractor, preprocessor,
+    deduplicator=Deduplicator(threshold=float(os.environ.get('DEDUP_THRESHOLD', 0.9)))
+)
+
+# Products are scraped and analyzed in parallel, bounded by COMPARE_MAX_WORKERS
+COMPARE_MAX_WORKERS = int(os.environ.get('COMPARE_MAX_WORKERS', 4))
+COMPARE_DEADLINE_SECONDS = float(os.environ.get('COMPARE_DEADLINE_SECONDS', 30))
+compare_executor = ThreadPoolExecutor(max_workers=COMPARE_MAX_WORKERS, thread_name_prefix='compare')
+
+
+def current_analyzer():
+    """The analyzer currently serving traffic (replaced by hot swaps)"""
+    return inference_worker.sentiment_analyzer
+
+
+def warm_up_model():
+    try:
+        current_analyzer().warmup()
+    except Exception as e:
+        print(f"Warmup failed: {e}")
+
+# Hot swap state for /api/admin/model
+model_swap_lock = threading.Lock()
+model_swap_status = {'state': 'idle', 'version': None, 'error': None}
+
+
+# A hot swap only replaces the model in the process that handled the admin request.
+# Under a pre-fork server, MODEL_REGISTRY_POLL_SECONDS > 0 makes every worker
+# follow the registry's current version (which the swap also sets) instead.
+MODEL_REGISTRY_POLL_SECONDS = float(os.environ.get('MODEL_REGISTRY_POLL_SECONDS', 0))
+
+
+def follow_registry(interval):
+    """
+    Swap whenever the registry's current version changes (e.g. another worker
+    handled POST /api/admin/model). Only changes are followed, so a worker
+    started with MODEL_VERSION stays pinned until someone swaps.
+    """
+    last_seen = model_registry.current_version()
+    while True:
+        time.sleep(interval)
+        try:
+            version = model_registry.current_version()
+        except Exception as e:
+            print(f"Registry poll failed: {e}")
+            continue
+        if version is None or version == last_seen:
+            continue
+        if version == current_analyzer().version:
+            last_seen = version
+            continue
+        if model_swap_lock.acquire(blocking=False):
+            # Tried once per change; a failed swap is reported in model_swap_status
+            last_seen = version
+            model_swap_status.update({'state': 'loading', 'version': version, 'error': None})
+            swap_model(version)
+
+
+def start_background_threads():
+    """Warm the model off the request path; under a pre-fork server this runs in each worker"""
+    threading.Thread(target=warm_up_model, name='model-warmup', daemon=True).start()
+    if MODEL_REGISTRY_POLL_SECONDS > 0:
+        threading.Thread(
+            target=follow_registry, args=(MODEL_REGISTRY_POLL_SECONDS,), name='registry-follower', daemon=True
+        ).start()
+
+
+# gunicorn.conf.py sets PRELOAD_MODEL=1: the master loads the weights here so forked
+# workers share them copy-on-write, and each worker starts its threads after the fork
+if os.environ.get('PRELOAD_MODEL') == '1':
+    print(f"Preloaded model: {current_analyzer().model_id}")
+else:
+    start_background_threads()
+
+
 @app.route('/api/compare', methods=['POST'])
 def compare_products():
     try:
@@ -22,148 +161,315 @@ def compare_products():
         if len(products) < 2:
             return jsonify({'error': 'At least 2 products required'}), 400
         
-        results = {
-            'products': products,
-            'comparison': {
-                'overall': [],
-                'aspects': [],
-                'radarData': [],
-                'reviews': {},
-                'strengths': {},
-                'weaknesses': {}
-            }
+        deadline = float(data.get('deadline_seconds', COMPARE_DEADLINE_SECONDS))
+        refresh = bool(data.get('refresh', False))
+        
+        # Analyze products in parallel; their queued inference is dropped once the deadline passes
+        deadline_at = time.monotonic() + deadline
+        futures = {
+            product: compare_executor.submit(fetch_and_analyze, product, refresh, deadline_at)
+            for product in products
         }
+        wait(futures.values(), timeout=deadline)
         
-        # Analyze each product
-        for product in products:
-            # Get reviews (mock data for now)
-            reviews = get_product_reviews(product)
-            
-            # Analyze sentiment and aspects
-            analysis = analyze_product(product, reviews)
-            
-            results['comparison']['overall'].append({
-                'name': product,
-                'score': analysis['overall_score'],
-                'sentiment': analysis['overall_sentiment']
-            })
-            
-            results['comparison']['reviews'][product] = analysis['sample_reviews']
-            results['comparison']['strengths'][product] = analysis['strengths']
-            results['comparison']['weaknesses'][product] = analysis['weaknesses']
+        # Past the deadline, answer with whatever has completed
+        completed = [product for product in products if futures[product].done()]
+        pending = [product for product in products if product not in completed]
+        for product in pending:
+            # Analyses that haven't started yet never will
+            futures[product].cancel()
+        
+        # Analyses that ran out of time count as pending, not as errors
+        timed_out = [p for p in completed if isinstance(futures[p].exception(), DeadlineExceededError)]
+        completed = [p for p in completed if p not in timed_out]
+        pending = [p for p in products if p not in completed]
         
-        # Build aspect comparison
-        aspects = ['Camera', 'Battery', 'Performance', 'Display', 'Value', 'Build Quality']
-        results['comparison']['aspects'] = build_aspect_comparison(products, aspects)
-        results['comparison']['radarData'] = results['comparison']['aspects']
+        if not completed:
+            return jsonify({'error': 'No product analysis finished before the deadline', 'pending': pending}), 504
         
-        # Determine winner
-        results['comparison']['winner'] = max(
-            results['comparison']['overall'],
-            key=lambda x: x['score']
-        )['name']
+        analyses = {product: futures[product].result() for product in completed}
+        results = build_comparison(completed, analyses)
+        
+        if pending:
+            results['partial'] = True
+            results['pending'] = pending
         
         return jsonify(results)
     
+    except QueueFullError as e:
+        return overloaded_response(e)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-def get_product_reviews(product_name):
-    """
-    In production: Scrape from Flipkart/Amazon
-    For now: Return mock reviews
-    """
-    mock_reviews = {
-        'hindi': [
-            "कैमरा बहुत बढ़िया है, फोटो क्वालिटी शानदार",
-            "बैटरी बैकअप थोड़ा कम है",
-            "परफॉर्मेंस एकदम जबरदस्त",
-            "डिस्प्ले बहुत अच्छा है",
-            "कीमत थोड़ी ज्यादा है"
-        ],
-        'marathi': [
-            "कॅमेरा खूप छान आहे",
-            "बॅटरी बॅकअप कमी आहे",
-            "परफॉर्मन्स उत्तम आहे"
-        ]
-    }
-    return mock_reviews
+def overloaded_response(error):
+    response = jsonify({'error': 'Server is overloaded, retry shortly', 'detail': str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
 
 
-def analyze_product(product_name, reviews):
-    """Analyze all reviews for a product"""
+@app.route('/api/compare/stream', methods=['GET'])
+def compare_products_stream():
+    """
+    Server-sent events variant of /api/compare
+    Pushes a 'partial' event per scored micro-batch and a final 'result' event
+    """
+    products = request.args.getlist('products')
+    if len(products) == 1:
+        products = [p.strip() for p in products[0].split(',') if p.strip()]
+    
+    if len(products) < 2:
+        return jsonify({'error': 'At least 2 products required'}), 400
     
-    all_reviews = reviews['hindi'] + reviews['marathi']
+    def events():
+        try:
+            analyses = {}
+            for product in products:
+                aggregate = RunningAggregate()
+                for aggregate in streaming_analyzer.run(iter_product_reviews(product), aggregate):
+                    yield sse_event('partial', {'product': product, **aggregate.summary()})
+                
+                analysis = aggregate.summary()
+                analysis['sample_reviews'] = build_sample_reviews(get_product_reviews(product))
+                analyses[product] = analysis
+            
+            yield sse_event('result', build_comparison(products, analyses))
+        
+        except Exception as e:
+            yield sse_event('error', {'error': str(e)})
     
-    # Sentiment analysis
-    sentiments = []
-    aspect_sentiments = {
-        'Camera': [], 'Battery': [], 'Performance': [],
-        'Display': [], 'Value': [], 'Build Quality': []
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def build_comparison(products, analyses):
+    """Assemble the /api/compare response from per-product analyses"""
+    results = {
+        'products': products,
+        'comparison': {
+            'overall': [],
+            'aspects': [],
+            'radarData': [],
+            'reviews': {},
+            'strengths': {},
+            'weaknesses': {},
+            'batch_stats': {}
+        }
     }
     
-    for review in all_reviews:
-        # Preprocess
-        clean_text = preprocessor.clean_text(review)
+    for product in products:
+        analysis = analyses[product]
         
-        # Get sentiment
-        sentiment_score = sentiment_analyzer.predict(clean_text)
-        sentiments.append(sentiment_score)
+        results['comparison']['overall'].append({
+            'name': product,
+            'score': analysis['overall_score'],
+            'sentiment': analysis['overall_sentiment']
+        })
         
-        # Extract aspects
-        aspects = aspect_extractor.extract_aspects(clean_text)
-        for aspect in aspects:
-            if aspect in aspect_sentiments:
-                aspect_sentiments[aspect].append(sentiment_score)
+        results['comparison']['reviews'][product] = analysis['sample_reviews']
+        results['comparison']['strengths'][product] = analysis['strengths']
+        results['comparison']['weaknesses'][product] = analysis['weaknesses']
+        # Only present when this request scored reviews rather than reading stored aggregates
+        results['comparison']['batch_stats'][product] = analysis.get('batch_stats')
     
-    # Calculate scores
-    overall_score = sum(sentiments) / len(sentiments) * 10
+    # Build aspect comparison
+    results['comparison']['aspects'] = build_aspect_comparison(products, analyses, ASPECTS)
+    results['comparison']['radarData'] = results['comparison']['aspects']
     
-    # Aspect scores
-    aspect_scores = {}
-    for aspect, scores in aspect_sentiments.items():
-        if scores:
-            avg_score = sum(scores) / len(scores)
-            aspect_scores[aspect] = int(avg_score * 100)
-        else:
-            aspect_scores[aspect] = 50  # neutral
+    # Determine winner
+    results['comparison']['winner'] = max(
+        results['comparison']['overall'],
+        key=lambda x: x['score']
+    )['name']
+    
+    return results
+
+
+def scoring_version():
+    """Identifies the serving model for stored aggregates (registry version, else model id)"""
+    analyzer = current_analyzer()
+    return analyzer.version or analyzer.model_id
+
+
+def fetch_and_analyze(product_name, refresh=False, deadline=None):
+    """
+    Stored aggregates while they are fresh and from the serving model; otherwise
+    get reviews (mock data for now) and fold any new ones in
+    deadline: time.monotonic() after which queued inference is dropped
+    """
+    if not refresh and not aggregate_store.is_stale(product_name, scoring_version()):
+        return aggregate_store.analysis(product_name)
+    reviews = get_product_reviews(product_name)
+    return analyze_product(product_name, reviews, deadline)
+
+
+def get_product_reviews(product_name):
+    """
+    In production: Scrape from Flipkart/Amazon
+    For now: Return mock reviews (code-mixed; languages are identified when scored)
+    """
+    return [
+        "कैमरा बहुत बढ़िया है, फोटो क्वालिटी शानदार",
+        "बैटरी बैकअप थोड़ा कम है",
+        "परफॉर्मेंस एकदम जबरदस्त",
+        "डिस्प्ले बहुत अच्छा है",
+        "कीमत थोड़ी ज्यादा है",
+        "कॅमेरा खूप छान आहे",
+        "बॅटरी बॅकअप कमी आहे",
+        "परफॉर्मन्स उत्तम आहे"
+    ]
+
+
+def iter_product_reviews(product_name):
+    """
+    Yield reviews for a product as they become available
+    In production: yield from ReviewScraper.iter_reviews(product_url)
+    """
+    yield from get_product_reviews(product_name)
+
+
+def analyze_product(product_name, reviews, deadline=None):
+    """
+    Fold reviews not seen before into the product's aggregates and summarize them;
+    aggregates scored by a previous model version are rebuilt from these reviews
+    """
+    version = scoring_version()
+    keys, new_reviews = aggregate_store.unseen(product_name, reviews, version)
     
-    # Identify strengths and weaknesses
-    sorted_aspects = sorted(aspect_scores.items(), key=lambda x: x[1], reverse=True)
-    strengths = [asp[0] for asp in sorted_aspects[:3] if asp[1] > 70]
-    weaknesses = [asp[0] for asp in sorted_aspects[-3:] if asp[1] < 60]
+    # Sentiment and aspect analysis, all new reviews in one batch
+    batch_stats = {}
+    scores, aspect_scores = [], []
+    if new_reviews:
+        texts = [review['text'] if isinstance(review, dict) else review for review in new_reviews]
+        scores, aspect_scores = streaming_analyzer.pipeline.score(texts, stats=batch_stats, deadline=deadline)
+    # Called even with nothing new, so aggregates from another version are dropped
+    aggregate_store.add_reviews(product_name, keys, scores, aspect_scores, version)
     
-    return {
-        'overall_score': round(overall_score, 1),
-        'overall_sentiment': 'positive' if overall_score > 6 else 'neutral' if overall_score > 4 else 'negative',
-        'aspect_scores': aspect_scores,
-        'sample_reviews': [
-            {'text': all_reviews[0], 'rating': 5, 'aspect': 'Camera'},
-            {'text': all_reviews[1], 'rating': 3, 'aspect': 'Battery'},
-            {'text': all_reviews[2], 'rating': 5, 'aspect': 'Performance'}
-        ],
-        'strengths': strengths if strengths else ['Overall Performance'],
-        'weaknesses': weaknesses if weaknesses else ['Price Point']
-    }
+    aggregate_store.touch(product_name, sample_reviews=build_sample_reviews(reviews), model_version=version)
+    analysis = aggregate_store.analysis(product_name)
+    analysis['batch_stats'] = {k: v for k, v in batch_stats.items() if k not in PER_REVIEW_STATS} or None
+    return analysis
 
 
-def build_aspect_comparison(products, aspects):
-    """Build comparison data for charts"""
+SAMPLE_REVIEW_SLOTS = [(5, 'Camera'), (3, 'Battery'), (5, 'Performance')]
+
+
+def build_sample_reviews(reviews):
+    """Up to three reviews to show alongside the analysis (fewer if the product has fewer)"""
+    samples = []
+    for review, (rating, aspect) in zip(reviews[:3], SAMPLE_REVIEW_SLOTS):
+        if isinstance(review, dict):
+            text, rating = review['text'], review.get('rating') or rating
+        else:
+            text = review
+        samples.append({'text': text, 'rating': rating, 'aspect': aspect})
+    return samples
+
+
+def build_aspect_comparison(products, analyses, aspects):
+    """Build comparison data for charts from each product's aspect scores"""
     comparison = []
     for aspect in aspects:
         row = {'aspect': aspect}
         for product in products:
-            # Mock scores - replace with actual analysis
-            import random
-            row[product] = random.randint(60, 90)
+            row[product] = analyses[product]['aspect_scores'].get(aspect, 50)
         comparison.append(row)
     return comparison
 
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """
+    Ready only once the model is loaded and warm (health just means the process is up);
+    a failed warmup stays 503 and reports its error
+    """
+    analyzer = current_analyzer()
+    if analyzer.warmup_error:
+        return jsonify({'status': 'warmup_failed', 'error': analyzer.warmup_error}), 503
+    if not analyzer.warm.is_set():
+        return jsonify({'status': 'warming_up'}), 503
+    return jsonify({'status': 'ready', 'model': analyzer.model_id, 'model_version': analyzer.version})
+
+
+@app.route('/api/admin/model', methods=['GET', 'POST'])
+def admin_model():
+    """
+    GET: serving version, swap status and registered versions
+    POST {"version": "..."}: load and warm that version in the background,
+    then swap it in without dropping requests
+    Requires the X-Admin-Token header to match ADMIN_TOKEN.
+    Only this process swaps; other gunicorn workers pick the version up from
+    the registry when MODEL_REGISTRY_POLL_SECONDS is set, otherwise on restart.
+    """
+    token = os.environ.get('ADMIN_TOKEN')
+    if not token or request.headers.get('X-Admin-Token') != token:
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    if request.method == 'GET':
+        return jsonify({
+            'serving': current_analyzer().version,
+            'model': current_analyzer().model_id,
+            'swap': dict(model_swap_status),
+            'versions': [m['version'] for m in model_registry.list_versions()]
+        })
+    
+    version = (request.get_json(silent=True) or {}).get('version')
+    try:
+        model_registry.get_manifest(version or '')
+    except ModelNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    if not model_swap_lock.acquire(blocking=False):
+        return jsonify({'error': 'A model swap is already in progress', 'swap': dict(model_swap_status)}), 409
+    
+    model_swap_status.update({'state': 'loading', 'version': version, 'error': None})
+    threading.Thread(target=swap_model, args=(version,), name='model-swap', daemon=True).start()
+    return jsonify({'status': 'accepted', 'swap': dict(model_swap_status)}), 202
+
+
+def swap_model(version):
+    """Load and warm the new version alongside the old one, then switch over"""
+    try:
+        new_analyzer = build_analyzer(version)
+        new_analyzer.warmup()
+        if new_analyzer.is_rule_based:
+            raise RuntimeError(f"Model version {version} failed to load")
+        
+        old_analyzer = current_analyzer()
+        # Single attribute swap: batches already running finish on the old model
+        inference_worker.sentiment_analyzer = new_analyzer
+        model_registry.set_current(version)
+        
+        if old_analyzer.model_id != new_analyzer.model_id:
+            old_analyzer.unload()
+        model_swap_status.update({'state': 'done', 'version': version})
+        print(f"Swapped to model version {version}")
+    except Exception as e:
+        model_swap_status.update({'state': 'failed', 'error': str(e)})
+        print(f"Model swap failed: {e}")
+    finally:
+        model_swap_lock.release()
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy', 'version': '1.0.0'})
+    return jsonify({
+        'status': 'healthy',
+        'version': '1.0.0',
+        'model_version': current_analyzer().version,
+        'batching': current_analyzer().bucket_stats(),
+        'cache': sentiment_cache.stats(),
+        'inference': inference_worker.stats()
+    })
 
 
 if __name__ == '__main__':
@@ -1,60 +1,182 @@
+import hashlib
 import json
+import os
+import pickle
 import re
+import threading
+import time
+from keyword_matcher import KeywordAutomaton
 
-class AspectExtractor:
-    def __init__(self):
-        """Initialize aspect keywords"""
-        self.aspect_keywords = {
-            'Camera': [
-                'कैमरा', 'camera', 'फोटो', 'photo', 'पिक्चर', 'picture',
-                'कॅमेरा', 'फोटो', 'चित्र', 'selfie', 'video'
-            ],
-            'Battery': [
-                'बैटरी', 'battery', 'बैकअप', 'backup', 'चार्जिंग', 'charging',
-                'charge', 'power', 'बॅटरी'
-            ],
-            'Performance': [
-                'परफॉर्मेंस', 'performance', 'स्पीड', 'speed', 'तेज', 'fast',
-                'slow', 'lag', 'gaming', 'processor', 'ram', 'परफॉर्मन्स'
-            ],
-            'Display': [
-                'डिस्प्ले', 'display', 'स्क्रीन', 'screen', 'आकार', 'size',
-                'brightness', 'color', 'clarity', 'डिस्पले'
-            ],
-            'Value': [
-                'कीमत', 'price', 'दाम', 'पैसा', 'value', 'money', 'worth',
-                'महाग', 'किंमत', 'costly', 'cheap'
-            ],
-            'Build Quality': [
-                'बिल्ड', 'build', 'quality', 'design', 'डिज़ाइन', 'look',
-                'body', 'material', 'finish', 'गुणवत्ता'
-            ]
-        }
+_SENTENCE_SPLIT_RE = re.compile(r'[।.!?]')
+
+DEFAULT_LEXICON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'data', 'aspect_keywords.json'
+)
+
+# Bump when AspectIndex changes shape so stale on-disk caches are rebuilt
+_INDEX_FORMAT = 1
+
+
+class AspectIndex:
+    """Compiled, language-aware keyword index built from the aspect lexicon"""
     
-    def extract_aspects(self, text):
-        """Extract mentioned aspects from text"""
-        text_lower = text.lower()
-        found_aspects = []
+    def __init__(self, lexicon):
+        # lexicon: {aspect: {language: [keywords]}}
+        self.aspect_keywords = {}
+        self.languages = sorted({lang for by_lang in lexicon.values() for lang in by_lang})
         
-        for aspect, keywords in self.aspect_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    if aspect not in found_aspects:
-                        found_aspects.append(aspect)
-                    break
+        entries = []
+        for aspect, by_language in lexicon.items():
+            merged = []
+            for language, keywords in by_language.items():
+                for keyword in keywords:
+                    entries.append((keyword.lower(), (aspect, language)))
+                    if keyword not in merged:
+                        merged.append(keyword)
+            self.aspect_keywords[aspect] = merged
         
-        return found_aspects
+        self.matcher = KeywordAutomaton(entries)
+
+
+def _default_cache_path(lexicon_path):
+    directory, name = os.path.split(lexicon_path)
+    return os.path.join(directory, f".{name}.index.pkl")
+
+
+def load_aspect_index(lexicon_path, cache_path=None):
+    """Load the compiled index from cache_path, rebuilding it if the lexicon changed"""
+    with open(lexicon_path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw + str(_INDEX_FORMAT).encode()).hexdigest()
+    
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('digest') == digest:
+                return cached['index']
+        except Exception as e:
+            print(f"Ignoring unreadable aspect index cache: {e}")
+    
+    index = AspectIndex(json.loads(raw.decode('utf-8')))
+    
+    if cache_path:
+        try:
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'digest': digest, 'index': index}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Could not write aspect index cache: {e}")
+    
+    return index
+
+
+class AspectExtractor:
+    def __init__(self, lexicon_path=DEFAULT_LEXICON_PATH, cache_path=None, reload_interval=2.0):
+        """
+        Load the aspect lexicon (data/aspect_keywords.json)
+        reload_interval: seconds between mtime checks for hot reload (None disables it)
+        """
+        self.lexicon_path = lexicon_path
+        self.cache_path = cache_path or _default_cache_path(lexicon_path)
+        self.reload_interval = reload_interval
+        
+        self._mtime = os.stat(lexicon_path).st_mtime_ns
+        self._index = load_aspect_index(lexicon_path, self.cache_path)
+        self._reload_lock = threading.Lock()
+        self._next_check = time.monotonic() + (reload_interval or 0)
+    
+    @property
+    def aspect_keywords(self):
+        """Keywords per aspect, merged across languages"""
+        return self._index.aspect_keywords
+    
+    @property
+    def languages(self):
+        return self._index.languages
+    
+    def reload(self):
+        """Rebuild the index from the lexicon file now and swap it in"""
+        mtime = os.stat(self.lexicon_path).st_mtime_ns
+        index = load_aspect_index(self.lexicon_path, self.cache_path)
+        # Single reference assignment: in-flight calls keep the index they started with
+        self._index = index
+        self._mtime = mtime
+    
+    def _current_index(self):
+        """Index to use for this call, scheduling a background reload if the file changed"""
+        if self.reload_interval is not None:
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.reload_interval
+                self._check_for_update()
+        return self._index
+    
+    def _check_for_update(self):
+        try:
+            mtime = os.stat(self.lexicon_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._mtime or not self._reload_lock.acquire(blocking=False):
+            return
+        threading.Thread(target=self._background_reload, daemon=True).start()
+    
+    def _background_reload(self):
+        try:
+            self.reload()
+            print(f"Reloaded aspect lexicon from {self.lexicon_path}")
+        except Exception as e:
+            # Keep serving the old index; don't retry until the file changes again
+            self._mtime = os.stat(self.lexicon_path).st_mtime_ns
+            print(f"Aspect lexicon reload failed: {e}")
+        finally:
+            self._reload_lock.release()
+    
+    def extract_aspects(self, text, language=None):
+        """Extract mentioned aspects from text (optionally only one language's keywords)"""
+        index = self._current_index()
+        found = {
+            aspect for aspect, lang in index.matcher.find_values(text.lower())
+            if language is None or lang == language
+        }
+        # Keep the aspect order of the lexicon
+        return [aspect for aspect in index.aspect_keywords if aspect in found]
+    
+    def find_aspect_matches(self, text, language=None):
+        """
+        Find every keyword hit in one pass
+        Returns: list of (aspect, start, end, keyword); offsets index into text.lower()
+        """
+        index = self._current_index()
+        matches = []
+        seen = set()
+        for start, end, keyword, (aspect, lang) in index.matcher.finditer(text.lower()):
+            if language is not None and lang != language:
+                continue
+            # The same keyword may be listed under several languages
+            if (aspect, start, end) not in seen:
+                seen.add((aspect, start, end))
+                matches.append((aspect, start, end, keyword))
+        return matches
     
     def get_aspect_sentences(self, text, aspect):
         """Extract sentences mentioning specific aspect"""
-        sentences = re.split(r'[।.!?]', text)
-        aspect_sentences = []
-        
-        keywords = self.aspect_keywords.get(aspect, [])
+        return self.get_all_aspect_sentences(text).get(aspect, [])
+    
+    def get_all_aspect_sentences(self, text, language=None):
+        """Map each mentioned aspect to the sentences mentioning it"""
+        index = self._current_index()
+        aspect_sentences = {}
         
-        for sentence in sentences:
+        for sentence in _SENTENCE_SPLIT_RE.split(text):
             sentence = sentence.strip()
-            if any(keyword.lower() in sentence.lower() for keyword in keywords):
-                aspect_sentences.append(sentence)
+            aspects = {
+                aspect for aspect, lang in index.matcher.find_values(sentence.lower())
+                if language is None or lang == language
+            }
+            for aspect in aspects:
+                aspect_sentences.setdefault(aspect, []).append(sentence)
         
-        return aspect_sentences
\ No newline at end of file
+        return aspect_sentences
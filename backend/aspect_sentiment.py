@@ -0,0 +1,142 @@
+from collections import Counter
+
+import numpy as np
+
+from language_id import LanguageIdentifier
+
+# Keys score() adds to stats with one entry per review, as opposed to batch totals
+PER_REVIEW_STATS = ('review_languages', 'code_mixed')
+
+
+class AspectSentimentPipeline:
+    """
+    Per-aspect sentiment from the sentences that mention each aspect. Spans from
+    every review in a batch are deduplicated and scored in a single predict_batch
+    call together with the reviews themselves, then scattered back to
+    (review, aspect) pairs as the mean of that aspect's sentence scores.
+    With a Deduplicator, near-duplicate spans share their representative's score.
+    Unless a language is given, each review's language is identified and only
+    that language's aspect keywords are matched (all of them for code-mixed text).
+    """
+
+    def __init__(self, sentiment_analyzer, aspect_extractor, preprocessor=None, deduplicator=None,
+                 language_identifier=None):
+        """
+        sentiment_analyzer: anything with predict_batch (SentimentAnalyzer or InferenceWorker)
+        preprocessor: optional TextPreprocessor; reviews and spans are cleaned before scoring
+        deduplicator: optional dedup.Deduplicator run over the cleaned spans before scoring
+        language_identifier: defaults to the preprocessor's, or a new LanguageIdentifier
+        """
+        self.sentiment_analyzer = sentiment_analyzer
+        self.aspect_extractor = aspect_extractor
+        self.preprocessor = preprocessor
+        self.deduplicator = deduplicator
+        if language_identifier is None:
+            language_identifier = preprocessor.language_identifier if preprocessor else LanguageIdentifier()
+        self.language_identifier = language_identifier
+
+    def _clean(self, text):
+        return self.preprocessor.clean_text(text) if self.preprocessor else text
+
+    def score(self, texts, language=None, aspects=None, include_reviews=True, stats=None, deadline=None):
+        """
+        Score reviews and their aspect spans in one batched pass
+        language: aspect keyword language for every review (default: identified per review)
+        aspects: only score these aspects (default: every aspect mentioned)
+        include_reviews: also score each whole review
+        stats: optional dict, filled with per-language review counts and how
+        many spans were requested and scored; when languages are identified,
+        also each review's language and code-mixed flag (PER_REVIEW_STATS)
+        deadline: time.monotonic() by which scores are needed, passed on to a
+        scorer that queues work (InferenceWorker)
+        Returns: (review_scores, aspect_scores) where review_scores is a float32
+        array (None without include_reviews) and aspect_scores a list of
+        {aspect: score}, one per review
+        """
+        texts = list(texts)
+        if language is None:
+            languages, mixed = self.language_identifier.identify_batch(texts)
+            # Code-mixed reviews can name aspects in either script, so match every keyword
+            review_languages = [None if m else lang for lang, m in zip(languages, mixed)]
+            if stats is not None:
+                stats['languages'] = dict(Counter('mixed' if m else lang for lang, m in zip(languages, mixed)))
+                stats['review_languages'] = languages
+                stats['code_mixed'] = mixed
+        else:
+            review_languages = [language] * len(texts)
+
+        span_ids = {}  # cleaned text -> position in the batch, so duplicates are scored once
+        review_spans = []
+        pairs = []  # (review, aspect)
+        pair_rows, pair_spans = [], []
+
+        for review, text in enumerate(texts):
+            if include_reviews:
+                review_spans.append(span_ids.setdefault(self._clean(text), len(span_ids)))
+
+            # Sentence splitting needs the raw punctuation, so clean each span afterwards
+            sentences_by_aspect = self.aspect_extractor.get_all_aspect_sentences(text, review_languages[review])
+            for aspect, sentences in sentences_by_aspect.items():
+                if aspects is not None and aspect not in aspects:
+                    continue
+                for sentence in sentences:
+                    pair_rows.append(len(pairs))
+                    pair_spans.append(span_ids.setdefault(self._clean(sentence), len(span_ids)))
+                pairs.append((review, aspect))
+
+        if not span_ids:
+            self._fill_stats(stats, 0, 0, 0, 0, 0)
+            review_scores = np.zeros(len(texts), dtype=np.float32) if include_reviews else None
+            return review_scores, [{} for _ in texts]
+
+        spans = list(span_ids)
+        requested = len(review_spans) + len(pair_spans)
+        if self.deduplicator is not None:
+            # Score one representative per group and fan its score out to the group
+            groups = self.deduplicator.group(spans)
+            scores = self._predict([spans[i] for i in groups.representatives], deadline)
+            span_scores = np.asarray(scores, dtype=np.float32)[groups.assignment]
+            self._fill_stats(stats, requested, len(spans), len(groups.representatives),
+                             groups.exact_duplicates, groups.near_duplicates)
+        else:
+            span_scores = np.asarray(self._predict(spans, deadline), dtype=np.float32)
+            self._fill_stats(stats, requested, len(spans), len(spans), 0, 0)
+        review_scores = span_scores[review_spans] if include_reviews else None
+
+        # Mean span score per (review, aspect) pair
+        pair_rows = np.asarray(pair_rows, dtype=np.intp)
+        sums = np.zeros(len(pairs), dtype=np.float32)
+        counts = np.zeros(len(pairs), dtype=np.float32)
+        np.add.at(sums, pair_rows, span_scores[np.asarray(pair_spans, dtype=np.intp)])
+        np.add.at(counts, pair_rows, 1)
+        pair_scores = sums / np.maximum(counts, 1)
+
+        aspect_scores = [{} for _ in texts]
+        for (review, aspect), score in zip(pairs, pair_scores):
+            aspect_scores[review][aspect] = float(score)
+
+        return review_scores, aspect_scores
+
+    def _predict(self, spans, deadline):
+        if deadline is None:
+            return self.sentiment_analyzer.predict_batch(spans)
+        return self.sentiment_analyzer.predict_batch(spans, deadline=deadline)
+
+    @staticmethod
+    def _fill_stats(stats, requested, distinct, scored, exact_duplicates, near_duplicates):
+        """
+        requested: review and aspect spans before any collapsing
+        distinct: spans left after merging identical cleaned text (e.g. a
+        one-sentence review is also its aspect span)
+        exact/near_duplicates: what the Deduplicator collapsed among the distinct spans
+        """
+        if stats is None:
+            return
+        stats.update({
+            'spans': requested,
+            'repeated_spans': requested - distinct,
+            'scored': scored,
+            'exact_duplicates': exact_duplicates,
+            'near_duplicates': near_duplicates,
+            'dedup_ratio': round(1 - scored / requested, 4) if requested else 0.0
+        })
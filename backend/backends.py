@@ -0,0 +1,276 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from lexicon_scorer import DEFAULT_LEXICON_PATH as DEFAULT_SENTIMENT_LEXICON_PATH, LexiconScorer
+from model_registry import record_variant
+
+# torch and transformers take seconds to import, so they are imported where a
+# backend is actually built; the app can bind its port before any of that runs
+
+# Quantized artifacts for hub models (local model dirs keep theirs alongside the weights)
+QUANTIZED_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_cache')
+QUANTIZED_FILENAME = 'quantized_int8.pt'
+
+# export_onnx.py writes the graph here, inside the checkpoint directory
+ONNX_SUBDIR = 'onnx'
+ONNX_FILENAMES = ('model.optimized.onnx', 'model.onnx')
+
+
+def quantized_artifact_path(model_name):
+    """Where the int8 copy of a model is cached"""
+    if os.path.isdir(model_name):
+        return os.path.join(model_name, QUANTIZED_FILENAME)
+    return os.path.join(QUANTIZED_CACHE_DIR, model_name.replace('/', '--'), QUANTIZED_FILENAME)
+
+
+def weights_fingerprint(model_name):
+    """
+    Identifies the weights a model loads (for the int8 cache and model_id):
+    name, size and mtime of each weight file
+    of a local checkpoint, or the content-addressed blob of a cached hub model,
+    plus the torch version that pickled it
+    Returns: tuple, or None if the weights aren't on disk
+    """
+    import torch
+
+    if os.path.isdir(model_name):
+        files = sorted(
+            glob.glob(os.path.join(model_name, 'model*.safetensors*'))
+            + glob.glob(os.path.join(model_name, 'pytorch_model*.bin*'))
+        )
+        weights = tuple((os.path.basename(f), os.stat(f).st_size, os.stat(f).st_mtime_ns) for f in files)
+    else:
+        from huggingface_hub import try_to_load_from_cache
+
+        weights = []
+        for filename in ('model.safetensors', 'model.safetensors.index.json', 'pytorch_model.bin'):
+            try:
+                cached = try_to_load_from_cache(model_name, filename)
+            except ValueError:
+                # Not a hub id either (e.g. a local path that doesn't exist)
+                break
+            if isinstance(cached, str):
+                # Snapshot files link to blobs named by their hash
+                weights.append((filename, os.path.basename(os.path.realpath(cached))))
+        weights = tuple(weights)
+    return (torch.__version__, weights) if weights else None
+
+
+def weights_tag(fingerprint):
+    """Short stable digest of a weights fingerprint, for model ids and cache keys ('' if unknown)"""
+    if fingerprint is None:
+        return ''
+    return hashlib.sha256(json.dumps(fingerprint).encode('utf-8')).hexdigest()[:12]
+
+
+def load_quantized_model(model_name):
+    """
+    Load the dynamic int8 (Linear layers) version of a model, quantizing and
+    caching it on first use so later startups just deserialize the artifact.
+    The cache is rebuilt when the source weights change.
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification
+    
+    path = quantized_artifact_path(model_name)
+    fingerprint = weights_fingerprint(model_name)
+    if os.path.exists(path):
+        try:
+            cached = torch.load(path, map_location='cpu', weights_only=False)
+            # Unknown weights (not on disk) can't be checked, so the cache is trusted
+            if isinstance(cached, dict) and (fingerprint is None or cached.get('fingerprint') == fingerprint):
+                return cached['model']
+            print(f"Re-quantizing, {path} was built from different weights")
+        except Exception as e:
+            print(f"Re-quantizing, could not load {path}: {e}")
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=3)
+    model.eval()
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # Fingerprint again: a hub model is only on disk once from_pretrained has downloaded it
+        torch.save({'fingerprint': weights_fingerprint(model_name), 'model': quantized}, tmp_path)
+        os.replace(tmp_path, path)
+        print(f"Cached quantized model at {path}")
+        if os.path.isdir(model_name):
+            record_variant(model_name, 'int8', QUANTIZED_FILENAME, method='dynamic', layers='Linear')
+    except OSError as e:
+        print(f"Could not cache quantized model: {e}")
+
+    return quantized
+
+
+def onnx_model_path(model_dir):
+    """Exported ONNX graph for a checkpoint, preferring the optimized one"""
+    for filename in ONNX_FILENAMES:
+        path = os.path.join(model_dir, ONNX_SUBDIR, filename)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def softmax(logits):
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+class TorchBackend:
+    """PyTorch AutoModelForSequenceClassification, optionally dynamic-int8 quantized"""
+
+    name = 'torch'
+    tensor_type = 'pt'
+
+    def __init__(self, model_name, quantize=False):
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        if quantize:
+            # Quantized kernels are CPU-only
+            self.model = load_quantized_model(model_name)
+            self.device = torch.device('cpu')
+        else:
+            self.model = AutoModelForSequenceClassification.from_pretrained(
+                model_name,
+                num_labels=3  # negative, neutral, positive
+            )
+            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+
+        self.model.to(self.device)
+        self.model.eval()
+        # Part of model_id, so scores cached for a checkpoint retrained in place aren't served again
+        self.weights_tag = weights_tag(weights_fingerprint(model_name))
+
+    @property
+    def model_id(self):
+        model_id = f"{self.model_name}@{self.weights_tag}" if self.weights_tag else self.model_name
+        return f"{model_id}:int8" if self.quantize else model_id
+
+    def describe(self):
+        return f"{self.device}" + (" (int8)" if self.quantize else "")
+
+    def predict_proba(self, inputs):
+        import torch
+
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+            probabilities = torch.softmax(outputs.logits, dim=1)
+        return probabilities.cpu().numpy()
+
+
+class OnnxBackend:
+    """ONNX Runtime on CPU over a graph exported by export_onnx.py"""
+
+    name = 'onnx'
+    tensor_type = 'np'
+
+    def __init__(self, model_name, num_threads=None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        path = onnx_model_path(model_name)
+        if path is None:
+            raise FileNotFoundError(f"No ONNX export under {model_name}; run export_onnx.py first")
+
+        self.model_name = model_name
+        self.path = path
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        stat = os.stat(path)
+        self.weights_tag = weights_tag([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+
+    @property
+    def model_id(self):
+        return f"{self.model_name}@{self.weights_tag}:onnx"
+
+    def describe(self):
+        return f"onnxruntime ({os.path.basename(self.path)})"
+
+    def predict_proba(self, inputs):
+        feed = {name: np.asarray(inputs[name], dtype=np.int64) for name in self.input_names}
+        logits = self.session.run(None, feed)[0]
+        return softmax(logits.astype(np.float32))
+
+
+class RuleBasedBackend:
+    """Weighted lexicon scorer: the fallback when no model can be loaded, and the load-shedding tier"""
+
+    name = 'rule'
+    tensor_type = None
+    tokenizer = None
+    model_id = 'rule-based'
+
+    def __init__(self, lexicon_path=DEFAULT_SENTIMENT_LEXICON_PATH):
+        self.scorer = LexiconScorer(lexicon_path)
+
+    def describe(self):
+        return 'rule-based'
+
+    def score_batch(self, texts):
+        """Returns: float32 array of 0.8 (positive), 0.2 (negative) or 0.5 (neutral)"""
+        return self.scorer.score_batch(texts)
+
+    def score(self, text):
+        return self.scorer.score(text)
+
+
+BACKENDS = {
+    'torch': TorchBackend,
+    'onnx': OnnxBackend,
+    'rule': RuleBasedBackend
+}
+
+
+# Process-wide registry so every SentimentAnalyzer with the same config shares one copy of the weights
+_loaded_backends = {}
+_registry_lock = threading.Lock()
+
+
+def get_backend(name, model_name, quantize=False):
+    """Load a backend once per process and share it"""
+    key = (name, model_name, bool(quantize))
+    backend = _loaded_backends.get(key)
+    if backend is not None:
+        return backend
+
+    with _registry_lock:
+        backend = _loaded_backends.get(key)
+        if backend is None:
+            backend = load_backend(name, model_name, quantize=quantize)
+            _loaded_backends[key] = backend
+        return backend
+
+
+def unload_backend(name, model_name, quantize=False):
+    """Forget a shared backend so its memory is freed once nothing else references it"""
+    with _registry_lock:
+        _loaded_backends.pop((name, model_name, bool(quantize)), None)
+
+
+def load_backend(name, model_name, quantize=False):
+    """Instantiate a backend by name ('torch', 'onnx' or 'rule')"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}, expected one of {sorted(BACKENDS)}")
+    if name == 'rule':
+        return RuleBasedBackend()
+    if name == 'torch':
+        return TorchBackend(model_name, quantize=quantize)
+    return OnnxBackend(model_name)
@@ -0,0 +1,72 @@
+import threading
+
+
+class LengthBucketScheduler:
+    """Group texts into token-length buckets so batches only pad to their bucket"""
+
+    def __init__(self, buckets=(32, 64, 128, 256), max_length=128):
+        self.max_length = max_length
+        # Buckets above max_length can never be filled; max_length is always the last one
+        self.buckets = sorted({b for b in buckets if b < max_length} | {max_length})
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def bucket_for(self, length):
+        """Smallest bucket that fits a sequence of this many tokens"""
+        for bucket in self.buckets:
+            if length <= bucket:
+                return bucket
+        return self.buckets[-1]
+
+    def schedule(self, lengths, batch_size):
+        """
+        Split indices into batches of similar length
+        Yields: (bucket, [indices]) with indices sorted by length inside each bucket
+        """
+        grouped = {}
+        for idx, length in enumerate(lengths):
+            grouped.setdefault(self.bucket_for(length), []).append(idx)
+
+        for bucket in self.buckets:
+            indices = sorted(grouped.get(bucket, []), key=lambda i: lengths[i])
+            for start in range(0, len(indices), batch_size):
+                yield bucket, indices[start:start + batch_size]
+
+    def record(self, bucket, lengths):
+        """Record one padded batch: real tokens vs tokens after padding"""
+        padded_to = max(lengths)
+        with self._lock:
+            stats = self._stats[bucket]
+            stats['batches'] += 1
+            stats['texts'] += len(lengths)
+            stats['real_tokens'] += sum(lengths)
+            stats['padded_tokens'] += padded_to * len(lengths)
+            # What the old "pad everything to max_length" path would have cost
+            stats['baseline_tokens'] += self.max_length * len(lengths)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                bucket: {'batches': 0, 'texts': 0, 'real_tokens': 0,
+                         'padded_tokens': 0, 'baseline_tokens': 0}
+                for bucket in self.buckets
+            }
+
+    def stats(self):
+        """Per-bucket counters plus how much padding was saved"""
+        with self._lock:
+            snapshot = {bucket: dict(s) for bucket, s in self._stats.items()}
+
+        buckets = {}
+        for bucket, s in snapshot.items():
+            s['padding_tokens'] = s['padded_tokens'] - s['real_tokens']
+            s['padding_saved_tokens'] = s['baseline_tokens'] - s['padded_tokens']
+            buckets[str(bucket)] = s
+
+        padded = sum(s['padded_tokens'] for s in snapshot.values())
+        baseline = sum(s['baseline_tokens'] for s in snapshot.values())
+        return {
+            'max_length': self.max_length,
+            'buckets': buckets,
+            'padding_saved_ratio': round(1 - padded / baseline, 4) if baseline else 0.0
+        }
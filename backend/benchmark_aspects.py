@@ -0,0 +1,66 @@
+"""
+Benchmark the compiled aspect matcher against the old nested keyword loops.
+
+Usage (from backend/):
+    python benchmark_aspects.py --repeat 20
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from aspect_extractor import AspectExtractor
+
+
+def legacy_extract_aspects(aspect_keywords, text):
+    """The original per-aspect, per-keyword substring scan"""
+    text_lower = text.lower()
+    found_aspects = []
+
+    for aspect, keywords in aspect_keywords.items():
+        for keyword in keywords:
+            if keyword.lower() in text_lower:
+                if aspect not in found_aspects:
+                    found_aspects.append(aspect)
+                break
+
+    return found_aspects
+
+
+def time_it(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aspect matcher microbenchmark")
+    parser.add_argument('--data', default='../datasets/product_reviews1.csv')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.data)['text'].tolist()
+    extractor = AspectExtractor()
+    keywords = extractor.aspect_keywords
+
+    mismatches = sum(
+        1 for text in texts
+        if legacy_extract_aspects(keywords, text) != extractor.extract_aspects(text)
+    )
+
+    legacy_time = time_it(lambda t: legacy_extract_aspects(keywords, t), texts, args.repeat)
+    compiled_time = time_it(extractor.extract_aspects, texts, args.repeat)
+
+    total = len(texts) * args.repeat
+    num_keywords = sum(len(k) for k in keywords.values())
+    print(f"📊 {len(texts)} reviews x {args.repeat} repeats, {num_keywords} keywords")
+    print(f"Nested loops: {total / legacy_time:10.0f} texts/sec ({legacy_time:.3f}s)")
+    print(f"Automaton:    {total / compiled_time:10.0f} texts/sec ({compiled_time:.3f}s)")
+    print(f"Speedup:      {legacy_time / compiled_time:.2f}x")
+    print(f"Mismatched results: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
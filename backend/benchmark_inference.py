@@ -0,0 +1,63 @@
+"""
+Benchmark per-review vs batched sentiment inference.
+
+Usage (from backend/):
+    python benchmark_inference.py --limit 500 --batch-size 32
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from models import DEFAULT_MAX_LENGTH, SentimentAnalyzer
+from preprocessor import TextPreprocessor
+
+
+def time_it(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-review vs batched inference benchmark")
+    parser.add_argument('--data', default='../datasets/product_reviews1.csv')
+    parser.add_argument('--limit', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--model', default='xlm-roberta-base')
+    parser.add_argument('--max-length', type=int, default=DEFAULT_MAX_LENGTH)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    preprocessor = TextPreprocessor()
+    texts = [preprocessor.clean_text(t) for t in df['text'].head(args.limit).tolist()]
+
+    analyzer = SentimentAnalyzer(model_name=args.model, max_length=args.max_length)
+
+    # Warm up both paths so lazy init doesn't skew the first measurement
+    analyzer.predict(texts[0])
+    analyzer.predict_batch(texts[:args.batch_size], batch_size=args.batch_size)
+
+    analyzer.scheduler.reset_stats()
+
+    single, single_time = time_it(lambda: [analyzer.predict(t) for t in texts])
+    batched, batch_time = time_it(lambda: analyzer.predict_batch(texts, batch_size=args.batch_size))
+
+    max_diff = max(abs(a - b) for a, b in zip(single, batched))
+
+    print(f"📊 {len(texts)} reviews")
+    print(f"Per-review: {len(texts) / single_time:8.1f} reviews/sec ({single_time:.2f}s)")
+    print(f"Batched:    {len(texts) / batch_time:8.1f} reviews/sec ({batch_time:.2f}s, batch_size={args.batch_size})")
+    print(f"Speedup:    {single_time / batch_time:.2f}x")
+    print(f"Max score difference: {max_diff:.6f}")
+
+    stats = analyzer.bucket_stats()
+    print(f"\nPadding saved vs max_length={stats['max_length']}: {stats['padding_saved_ratio'] * 100:.1f}%")
+    for bucket, s in stats['buckets'].items():
+        if s['texts']:
+            print(f"  bucket {bucket:>4}: {s['texts']:6d} texts, {s['batches']:5d} batches, "
+                  f"{s['padding_tokens']:7d} pad tokens, {s['padding_saved_tokens']:8d} saved")
+
+
+if __name__ == '__main__':
+    main()
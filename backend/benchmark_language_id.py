@@ -0,0 +1,85 @@
+"""
+Benchmark LanguageIdentifier: accuracy against the dataset's language column,
+batched vs per-text throughput, and how many aspect matches the per-language
+keyword subsets drop compared with matching every language.
+
+Usage (from backend/):
+    python benchmark_language_id.py --repeat 20 --batch-size 256
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from aspect_extractor import AspectExtractor
+from language_id import LanguageIdentifier
+
+# Code-mixed and English reviews the dataset doesn't cover
+EXTRA_CASES = [
+    ("camera quality is great", 'english', False),
+    ("battery बहुत जल्दी खत्म होती है", 'hindi', True),
+    ("display खूप छान आहे", 'marathi', True),
+    ("बॅटरी बॅकअप ठीक", 'marathi', False),
+    ("price थोड़ी ज्यादा है", 'hindi', True),
+]
+
+
+def throughput(fn, count, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = time.perf_counter() - start
+    return count * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Language identification benchmark")
+    parser.add_argument('--data', nargs='+', default=['../datasets/product_reviews.csv',
+                                                      '../datasets/product_reviews1.csv'])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=256)
+    args = parser.parse_args()
+
+    df = pd.concat([pd.read_csv(path) for path in args.data], ignore_index=True)
+    texts = df['text'].tolist()
+    identifier = LanguageIdentifier()
+
+    def batched():
+        for i in range(0, len(texts), args.batch_size):
+            identifier.identify_batch(texts[i:i + args.batch_size])
+
+    n, r = len(texts), args.repeat
+    print(f"📊 {n} reviews x {r} repeats, batch size {args.batch_size}")
+    single_rate = throughput(lambda: [identifier.identify(t) for t in texts], n, r)
+    batch_rate = throughput(batched, n, r)
+    print(f"per-text  {single_rate:10.0f} reviews/s")
+    print(f"batched   {batch_rate:10.0f} reviews/s")
+
+    languages, mixed = identifier.identify_batch(texts)
+    if 'language' in df:
+        expected = df['language'].to_numpy()
+        print(f"Accuracy vs dataset languages: {np.mean(languages == expected) * 100:.1f}%")
+        for language in sorted(set(expected)):
+            rows = expected == language
+            print(f"  {language:8s} {np.mean(languages[rows] == language) * 100:5.1f}% of {int(rows.sum())}")
+
+    extra_languages, extra_mixed = identifier.identify_batch([text for text, _, _ in EXTRA_CASES])
+    correct = sum(
+        language == expected_language and is_mixed == expected_mixed
+        for language, is_mixed, (_, expected_language, expected_mixed)
+        in zip(extra_languages, extra_mixed, EXTRA_CASES)
+    )
+    print(f"Code-mixed / English cases correct: {correct}/{len(EXTRA_CASES)}")
+
+    extractor = AspectExtractor()
+    dropped = sum(
+        len(extractor.get_all_aspect_sentences(text)) -
+        len(extractor.get_all_aspect_sentences(text, None if is_mixed else language))
+        for text, language, is_mixed in zip(texts, languages, mixed)
+    )
+    print(f"Aspect matches lost to per-language keywords: {dropped}")
+
+
+if __name__ == '__main__':
+    main()
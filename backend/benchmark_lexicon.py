@@ -0,0 +1,101 @@
+"""
+Benchmark the batched LexiconScorer against the original per-text word-list
+scorer, and show how the two label the dataset.
+
+Usage (from backend/):
+    python benchmark_lexicon.py --repeat 20 --batch-size 256
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from lexicon_scorer import LexiconScorer
+
+# The word lists the rule-based fallback used before the weighted lexicon
+LEGACY_POSITIVE = [
+    'बढ़िया', 'अच्छा', 'शानदार', 'बेहतरीन', 'जबरदस्त', 'उत्तम',
+    'छान', 'सुंदर', 'perfect', 'best', 'good', 'great', 'excellent'
+]
+LEGACY_NEGATIVE = [
+    'खराब', 'बुरा', 'कम', 'नहीं', 'not', 'bad', 'poor', 'waste',
+    'वाया', 'गयाचा'
+]
+
+# Negation cases the legacy scorer gets wrong
+NEGATION_CASES = [
+    ("कैमरा अच्छा नहीं है", 0.2),
+    ("बैटरी खराब नहीं है", 0.8),
+    ("not good at all", 0.2),
+    ("display is not bad", 0.8),
+    ("फोन काम नहीं करता", 0.2),
+    ("कॅमेरा चांगला नाही", 0.2),
+    ("कमाल का फोन", 0.8),
+    ("no noise, great sound", 0.8),
+]
+
+
+def legacy_score(text):
+    text_lower = text.lower()
+    pos_count = sum(1 for word in LEGACY_POSITIVE if word in text_lower)
+    neg_count = sum(1 for word in LEGACY_NEGATIVE if word in text_lower)
+    if pos_count > neg_count:
+        return 0.8
+    elif neg_count > pos_count:
+        return 0.2
+    return 0.5
+
+
+def throughput(fn, count, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = time.perf_counter() - start
+    return count * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rule-based scorer throughput benchmark")
+    parser.add_argument('--data', default='../datasets/product_reviews1.csv')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=256)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    texts = df['text'].tolist()
+    scorer = LexiconScorer()
+
+    def batched():
+        for i in range(0, len(texts), args.batch_size):
+            scorer.score_batch(texts[i:i + args.batch_size])
+
+    n, r = len(texts), args.repeat
+    print(f"📊 {n} reviews x {r} repeats, batch size {args.batch_size}")
+    legacy_rate = throughput(lambda: [legacy_score(t) for t in texts], n, r)
+    single_rate = throughput(lambda: [scorer.score(t) for t in texts], n, r)
+    batch_rate = throughput(batched, n, r)
+    print(f"legacy per-text   {legacy_rate:10.0f} reviews/s")
+    print(f"lexicon per-text  {single_rate:10.0f} reviews/s")
+    print(f"lexicon batched   {batch_rate:10.0f} reviews/s  ({batch_rate / legacy_rate:.2f}x legacy)")
+
+    legacy = np.array([legacy_score(t) for t in texts], dtype=np.float32)
+    current = scorer.score_batch(texts)
+    print(f"Label agreement with legacy: {np.mean(legacy == current) * 100:.1f}%")
+
+    if 'sentiment' in df:
+        expected = df['sentiment'].map({'negative': 0.2, 'neutral': 0.5, 'positive': 0.8})
+        expected = expected.to_numpy(dtype=np.float32)
+        print(f"Accuracy vs dataset labels: legacy {np.mean(legacy == expected) * 100:.1f}%  "
+              f"lexicon {np.mean(current == expected) * 100:.1f}%")
+
+    negation_texts = [text for text, _ in NEGATION_CASES]
+    negation_expected = np.array([score for _, score in NEGATION_CASES], dtype=np.float32)
+    legacy_ok = int(np.sum(np.array([legacy_score(t) for t in negation_texts], dtype=np.float32) == negation_expected))
+    lexicon_ok = int(np.sum(scorer.score_batch(negation_texts) == negation_expected))
+    print(f"Negation cases correct: legacy {legacy_ok}/{len(NEGATION_CASES)}  "
+          f"lexicon {lexicon_ok}/{len(NEGATION_CASES)}")
+
+
+if __name__ == '__main__':
+    main()
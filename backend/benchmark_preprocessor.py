@@ -0,0 +1,105 @@
+"""
+Benchmark TextPreprocessor against the original uncompiled implementation
+and check that both produce identical output.
+
+Usage (from backend/):
+    python benchmark_preprocessor.py --repeat 20
+"""
+import argparse
+import re
+import time
+
+import pandas as pd
+
+from preprocessor import TextPreprocessor
+
+# Inputs that exercise every branch of the pipeline
+EDGE_CASES = [
+    "", "   ", "कैमरा 😀 बढ़िया!! http://x.co/a?b=1 #best @user",
+    "#www.example.com a@httpfoo bar", "ज\u093c्यादा फ\u093cोन क\u093cीमत ख\u093cराब ग\u093cलत",
+    "\u095b\u095e precomposed", "क\u093c\u093c", "a , b\t\n c",
+    "www.flipkart.com/item बैटरी ,कम है", "@@## ##@@", "फ़ Ⅻ ①②"
+]
+
+
+def legacy_clean_text(text):
+    if not text:
+        return ""
+    text = re.sub(r'http\S+|www\S+', '', text)
+    text = re.sub(r'@\w+|#\w+', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\u0900-\u097F]', '', text)
+    return text.strip()
+
+
+def legacy_normalize_text(text):
+    replacements = {
+        'क़': 'क', 'ख़': 'ख', 'ग़': 'ग',
+        'ज़': 'ज', 'फ़': 'फ'
+    }
+    for old, new in replacements.items():
+        text = text.replace(old, new)
+    return text
+
+
+def legacy_remove_stopwords(preprocessor, text, language='hindi'):
+    stopwords = preprocessor.hindi_stopwords if language == 'hindi' else preprocessor.marathi_stopwords
+    words = text.split()
+    filtered = [word for word in words if word not in stopwords]
+    return ' '.join(filtered)
+
+
+def throughput(fn, count, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = time.perf_counter() - start
+    return count * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocessor throughput benchmark")
+    parser.add_argument('--data', default='../datasets/product_reviews1.csv')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.data)['text'].tolist()
+    # Mix in noisy scraped-style text so the URL/mention/emoji paths are exercised
+    texts = [t + " 👍 http://amzn.in/x #deal" if i % 10 == 0 else t for i, t in enumerate(texts)]
+    preprocessor = TextPreprocessor()
+
+    checked = texts + EDGE_CASES
+    mismatches = 0
+    for text in checked:
+        if preprocessor.clean_text(text) != legacy_clean_text(text):
+            mismatches += 1
+        if preprocessor.normalize_text(text) != legacy_normalize_text(text):
+            mismatches += 1
+        for language in ('hindi', 'marathi'):
+            if preprocessor.remove_stopwords(text, language) != legacy_remove_stopwords(preprocessor, text, language):
+                mismatches += 1
+    if list(preprocessor.clean_many(checked)) != [legacy_clean_text(t) for t in checked]:
+        mismatches += 1
+
+    n, r = len(texts), args.repeat
+    rows = [
+        ('clean_text', lambda: [legacy_clean_text(t) for t in texts],
+         lambda: [preprocessor.clean_text(t) for t in texts]),
+        ('clean_many', lambda: [legacy_clean_text(t) for t in texts],
+         lambda: list(preprocessor.clean_many(texts))),
+        ('normalize_text', lambda: [legacy_normalize_text(t) for t in texts],
+         lambda: [preprocessor.normalize_text(t) for t in texts]),
+        ('remove_stopwords', lambda: [legacy_remove_stopwords(preprocessor, t) for t in texts],
+         lambda: [preprocessor.remove_stopwords(t, 'hindi') for t in texts]),
+    ]
+
+    print(f"📊 {n} reviews x {r} repeats")
+    for name, legacy, current in rows:
+        old_rate = throughput(legacy, n, r)
+        new_rate = throughput(current, n, r)
+        print(f"{name:17s} legacy {old_rate:10.0f}/s  compiled {new_rate:10.0f}/s  ({new_rate / old_rate:.2f}x)")
+    print(f"Output mismatches: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
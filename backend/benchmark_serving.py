@@ -0,0 +1,179 @@
+"""
+Serving benchmark: starts gunicorn (gunicorn.conf.py) with 1..N workers and
+reports requests/sec, latency and memory per worker for /api/compare.
+
+RSS counts shared pages in every process that maps them, so it overstates the
+cost of each worker; PSS splits shared pages between the processes sharing
+them. With the preloaded model, PSS per worker should fall well below RSS as
+workers are added, while one worker without preloading pays the full model.
+
+Usage (from backend/):
+    python benchmark_serving.py --max-workers 4 --duration 15 --concurrency 16
+    SENTIMENT_MODEL=./trained_model python benchmark_serving.py --max-workers 8
+
+The response cache is disabled (SENTIMENT_CACHE_SIZE=0) unless --cache is
+given, since /api/compare serves the same mock reviews on every call.
+--output saves the rows together with the command line, model, core count and
+library versions they were measured with, e.g. the preload comparison:
+    SENTIMENT_MODEL=./trained_model python benchmark_serving.py --max-workers 3 --output bench/serving.json
+    SENTIMENT_MODEL=./trained_model python benchmark_serving.py --max-workers 3 --no-preload \
+        --output bench/serving-no-preload.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+import torch
+
+
+def memory_mb(pid):
+    """(rss, pss) of a process in MB, from /proc/<pid>/smaps_rollup (Linux)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0][:-1]] = int(parts[1]) / 1024
+    return values.get('Rss', 0.0), values.get('Pss', 0.0)
+
+
+def child_pids(pid):
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children", encoding='utf-8') as f:
+            children.extend(int(child) for child in f.read().split())
+    return children
+
+
+def wait_until_ready(url, workers, timeout):
+    """Poll /api/ready until enough consecutive successes that every worker has likely warmed"""
+    deadline = time.monotonic() + timeout
+    streak = 0
+    while time.monotonic() < deadline:
+        try:
+            streak = streak + 1 if requests.get(f"{url}/api/ready", timeout=2).status_code == 200 else 0
+        except requests.RequestException:
+            streak = 0
+        if streak >= workers * 4:
+            return
+        time.sleep(0.1)
+    raise TimeoutError(f"Server at {url} not ready after {timeout}s")
+
+
+def load(url, duration, concurrency):
+    """Hammer /api/compare from concurrency threads for duration seconds"""
+    deadline = time.monotonic() + duration
+
+    def client(worker_id):
+        session = requests.Session()
+        latencies, errors, i = [], 0, 0
+        while time.monotonic() < deadline:
+            body = {'products': [f"phone {worker_id}-{i}", f"phone {worker_id}-{i + 1}"]}
+            start = time.perf_counter()
+            try:
+                ok = session.post(f"{url}/api/compare", json=body, timeout=60).status_code == 200
+            except requests.RequestException:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+            i += 1
+        return latencies, errors
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(client, range(concurrency)))
+    elapsed = time.monotonic() - started
+
+    latencies = np.asarray([ms for worker_latencies, _ in results for ms in worker_latencies])
+    errors = sum(e for _, e in results)
+    return len(latencies) / elapsed, latencies, errors
+
+
+def run(workers, args):
+    port = args.port
+    url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{port}")
+    env['PRELOAD_MODEL'] = '0' if args.no_preload else '1'
+    if not args.cache:
+        env['SENTIMENT_CACHE_SIZE'] = '0'
+
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(url, workers, args.startup_timeout)
+        rps, latencies, errors = load(url, args.duration, args.concurrency)
+
+        pids = child_pids(server.pid)
+        memory = [memory_mb(pid) for pid in pids]
+        master_rss, _ = memory_mb(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    return {
+        'workers': workers,
+        'rps': rps,
+        'p50': float(np.percentile(latencies, 50)) if len(latencies) else float('nan'),
+        'p95': float(np.percentile(latencies, 95)) if len(latencies) else float('nan'),
+        'errors': errors,
+        'rss_per_worker': float(np.mean([rss for rss, _ in memory])) if memory else 0.0,
+        'pss_per_worker': float(np.mean([pss for _, pss in memory])) if memory else 0.0,
+        'master_rss': master_rss
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-worker serving benchmark")
+    parser.add_argument('--max-workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--duration', type=float, default=15, help="seconds of load per worker count")
+    parser.add_argument('--concurrency', type=int, default=16, help="concurrent client threads")
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--startup-timeout', type=float, default=300)
+    parser.add_argument('--cache', action='store_true', help="keep the sentiment cache enabled")
+    parser.add_argument('--no-preload', action='store_true',
+                        help="load the model in each worker instead of once before forking")
+    parser.add_argument('--output', default=None, help="JSON file for the results and how they were produced")
+    args = parser.parse_args()
+
+    print(f"{'workers':>7s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'errors':>6s} "
+          f"{'RSS/worker':>10s} {'PSS/worker':>10s} {'master RSS':>10s}")
+    rows = []
+    for workers in range(1, args.max_workers + 1):
+        r = run(workers, args)
+        rows.append(r)
+        print(f"{r['workers']:7d} {r['rps']:8.1f} {r['p50']:8.1f} {r['p95']:8.1f} {r['errors']:6d} "
+              f"{r['rss_per_worker']:9.0f}M {r['pss_per_worker']:9.0f}M {r['master_rss']:9.0f}M")
+
+    if args.output:
+        report = {
+            'command': ' '.join([os.path.basename(sys.argv[0])] + sys.argv[1:]),
+            'settings': vars(args),
+            'environment': {
+                'cpu_count': multiprocessing.cpu_count(),
+                'python': sys.version.split()[0],
+                'torch': torch.__version__,
+                **{name: os.environ.get(name) for name in
+                   ('SENTIMENT_MODEL', 'MODEL_VERSION', 'SENTIMENT_BACKEND', 'SENTIMENT_QUANTIZE', 'TORCH_THREADS')}
+            },
+            'results': rows
+        }
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"📝 Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Benchmark suite for the hot paths, with saved results and regression checks.
+
+Corpora are synthetic, scaled with datasets/create_datasets.py. Without
+--model-dir the sentiment model is the rule-based scorer, so runs are
+comparable on machines without the checkpoint.
+
+Usage (from backend/):
+    python benchmark_suite.py run --sizes 1000,10000 --output bench/baseline.json
+    python benchmark_suite.py run --sizes 1000,10000 --model-dir ./trained_model --output bench/new.json
+    python benchmark_suite.py compare bench/baseline.json bench/new.json --threshold 0.10
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'datasets')
+
+# Scraped-style noise mixed into every 10th review so URL/mention/emoji paths run
+NOISE = " 👍 http://amzn.in/x #deal"
+
+
+def synthetic_corpus(size, seed=42):
+    """
+    size reviews as (text, language), each 1-3 sentences from the dataset
+    generator, so most reviews are distinct and multi-aspect
+    """
+    sys.path.insert(0, DATASETS_DIR)
+    try:
+        from create_datasets import generate_reviews
+    finally:
+        sys.path.remove(DATASETS_DIR)
+
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, 4, size=size)
+    rows = generate_reviews(int(lengths.sum()), seed=seed)
+
+    corpus, pos = [], 0
+    for i, length in enumerate(lengths):
+        sentences = rows[pos:pos + length]
+        pos += length
+        text = '। '.join(text for text, _, _ in sentences)
+        corpus.append((text + NOISE if i % 10 == 0 else text, sentences[0][2]))
+    return corpus
+
+
+def best_time(fn, repeat):
+    """Fastest of repeat runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def throughput(name, count, seconds):
+    return name, {'value': round(count / seconds, 1), 'unit': 'reviews/s', 'higher_is_better': True}
+
+
+def latency(name, samples_ms):
+    samples_ms = np.asarray(samples_ms)
+    return [
+        (f"{name}/p50", {'value': round(float(np.percentile(samples_ms, 50)), 3), 'unit': 'ms', 'higher_is_better': False}),
+        (f"{name}/p95", {'value': round(float(np.percentile(samples_ms, 95)), 3), 'unit': 'ms', 'higher_is_better': False}),
+    ]
+
+
+def run_benchmarks(sizes, repeat, model_dir=None, model_sample=500, compare_requests=20):
+    # The app reads its configuration at import time
+    os.environ.setdefault('SENTIMENT_BACKEND', 'torch' if model_dir else 'rule')
+    if model_dir:
+        os.environ.setdefault('SENTIMENT_MODEL', model_dir)
+
+    import app as server
+    from aspect_extractor import AspectExtractor
+    from models import SentimentAnalyzer
+    from preprocessor import TextPreprocessor
+
+    preprocessor = TextPreprocessor()
+    extractor = AspectExtractor()
+    rule_analyzer = SentimentAnalyzer(backend='rule')
+    model_analyzer = SentimentAnalyzer(model_dir) if model_dir else None
+    if model_analyzer is not None:
+        model_analyzer.warmup()
+    serving = server.current_analyzer()
+    while not serving.warm.wait(0.5):
+        if serving.warmup_error:
+            raise RuntimeError(f"Server model failed to warm up: {serving.warmup_error}")
+
+    results = {}
+    for size in sizes:
+        corpus = synthetic_corpus(size)
+        texts = [text for text, _ in corpus]
+        clean = [preprocessor.clean_text(text) for text in texts]
+        print(f"📊 {size} reviews")
+
+        rows = [
+            throughput(f"clean_text/{size}", size, best_time(lambda: [preprocessor.clean_text(t) for t in texts], repeat)),
+            throughput(f"extract_aspects/{size}", size, best_time(lambda: [extractor.extract_aspects(t) for t in clean], repeat)),
+            throughput(f"predict_rule/{size}", size, best_time(lambda: [rule_analyzer.predict(t) for t in clean], repeat)),
+        ]
+
+        if model_analyzer is not None:
+            sample = clean[:model_sample]
+            rows.append(throughput(f"predict_model/{size}", len(sample),
+                                   best_time(lambda: [model_analyzer.predict(t) for t in sample], 1)))
+            rows.append(throughput(f"predict_batch_model/{size}", size,
+                                   best_time(lambda: model_analyzer.predict_batch(clean), 1)))
+
+        # Languages are identified when scored, so reviews go in as one flat list
+        reviews = [text for text, _ in corpus]
+
+        def analyze():
+            # Cold cache and empty aggregates each run, so this measures scoring rather than lookups
+            server.sentiment_cache.clear()
+            server.aggregate_store.delete('benchmark')
+            server.analyze_product('benchmark', reviews)
+        rows.append(throughput(f"analyze_product/{size}", size, best_time(analyze, repeat)))
+
+        for name, result in rows:
+            results[name] = result
+            print(f"  {name:32s} {result['value']:12.1f} {result['unit']}")
+
+    # /api/compare serves fixed mock reviews, so it is timed per request rather than per corpus size
+    client = server.app.test_client()
+    samples_ms = []
+    for i in range(compare_requests):
+        start = time.perf_counter()
+        response = client.post('/api/compare', json={'products': [f'phone {i}', f'phone {i + 1}']})
+        samples_ms.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/compare returned {response.status_code}: {response.get_data(as_text=True)}")
+    for name, result in latency('api_compare', samples_ms):
+        results[name] = result
+        print(f"  {name:32s} {result['value']:12.1f} {result['unit']}")
+
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(baseline, current, threshold):
+    """
+    Returns: list of (name, old, new, change, regressed); change is the
+    relative move in the bad direction (positive = slower)
+    """
+    rows = []
+    for name, new in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None or not old['value']:
+            continue
+        delta = (new['value'] - old['value']) / old['value']
+        change = -delta if new['higher_is_better'] else delta
+        rows.append((name, old['value'], new['value'], change, change > threshold))
+    return rows
+
+
+def cmd_run(args):
+    sizes = [int(s) for s in args.sizes.split(',')]
+    results = run_benchmarks(sizes, args.repeat, args.model_dir, args.model_sample, args.compare_requests)
+    report = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'model': args.model_dir or 'rule-based',
+            'sizes': sizes,
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"📝 Results written to {args.output}")
+
+
+def cmd_compare(args):
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+
+    rows = compare_results(baseline, current, args.threshold)
+    print(f"{'benchmark':32s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, old, new, change, regressed in rows:
+        flag = '  ❌ REGRESSION' if regressed else ''
+        print(f"{name:32s} {old:12.1f} {new:12.1f} {-change * 100:+7.1f}%{flag}")
+
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%")
+        return 1
+    print("No regressions")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path benchmark suite")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help="run the suite and save results")
+    run.add_argument('--sizes', default='1000,10000', help="comma-separated corpus sizes, e.g. 1000,10000,100000")
+    run.add_argument('--repeat', type=int, default=3, help="runs per benchmark; the fastest is kept")
+    run.add_argument('--model-dir', default=None, help="also benchmark this checkpoint (default: rule-based only)")
+    run.add_argument('--model-sample', type=int, default=500, help="texts for the per-text model predict benchmark")
+    run.add_argument('--compare-requests', type=int, default=20)
+    run.add_argument('--output', default=os.path.join('bench', 'results.json'))
+
+    compare = sub.add_parser('compare', help="flag regressions between two result files")
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10,
+                         help="relative slowdown that counts as a regression (0.10 = 10%%)")
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        cmd_run(args)
+    else:
+        sys.exit(cmd_compare(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+"""
+Bulk scoring: backfill review sentiment and per-aspect scores for large
+CSV/JSONL files (same schema as datasets/product_reviews1.csv: text plus
+optional sentiment/language columns, which are passed through).
+
+The input is read in chunks and the chunks are scored across a process pool.
+Each worker loads one SentimentAnalyzer and scores its chunk through
+AspectSentimentPipeline (batched predict_batch plus AspectExtractor). Every
+chunk is written as its own part file, named by chunk number, in the output
+directory. checkpoint.json records finished chunks, so a killed job run again
+with the same arguments (and the same model weights) skips them and resumes
+where it stopped.
+
+Parquet/Arrow output needs pyarrow; without it parts are written as CSV.
+
+Usage (from backend/):
+    python bulk_score.py ../datasets/product_reviews1.csv --output scored/ --workers 4
+    python bulk_score.py reviews.jsonl --output scored/ --model-dir ./trained_model --chunk-size 5000
+    python bulk_score.py reviews.csv --output scored/ --backend rule --format arrow
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from aggregation import ASPECTS
+from model_registry import ModelRegistry, ModelNotFoundError, read_manifest
+
+CHECKPOINT_NAME = 'checkpoint.json'
+EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow', 'csv': '.csv'}
+
+_worker = None  # per-process AspectSentimentPipeline, set by _init_worker
+
+
+def aspect_column(aspect):
+    return 'aspect_' + aspect.lower().replace(' ', '_')
+
+
+def resolve_format(requested):
+    """Requested output format, or CSV when pyarrow is missing"""
+    if requested == 'csv':
+        return 'csv'
+    try:
+        import pyarrow  # noqa: F401
+        return requested
+    except ImportError:
+        print(f"⚠️ pyarrow not installed; writing CSV parts instead of {requested}")
+        return 'csv'
+
+
+def count_rows(path):
+    """Data rows in a CSV (minus the header) or JSONL file, by counting newlines; only used for the ETA"""
+    lines, last = 0, b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    lines += last != b'\n'
+    return max(0, lines - (0 if path.endswith('.jsonl') else 1))
+
+
+def iter_chunks(path, chunk_size):
+    """Yields: (chunk number, DataFrame) with a 'row' column numbering input rows from 0"""
+    if path.endswith('.jsonl'):
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False)
+    else:
+        reader = pd.read_csv(path, chunksize=chunk_size)
+
+    start = 0
+    for chunk_id, chunk in enumerate(reader):
+        if 'text' not in chunk:
+            raise ValueError(f"{path} has no 'text' column")
+        chunk.insert(0, 'row', np.arange(start, start + len(chunk), dtype=np.int64))
+        start += len(chunk)
+        yield chunk_id, chunk
+
+
+def part_path(output_dir, chunk_id, fmt):
+    return os.path.join(output_dir, f"part-{chunk_id:06d}{EXTENSIONS[fmt]}")
+
+
+def write_part(frame, path, fmt):
+    """Write one part atomically, so a part file on disk is always complete"""
+    tmp_path = f"{path}.tmp"
+    if fmt == 'csv':
+        frame.to_csv(tmp_path, index=False)
+    else:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, tmp_path)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _init_worker(options):
+    """Process pool initializer: load one model per worker"""
+    global _worker
+
+    from aspect_extractor import AspectExtractor
+    from aspect_sentiment import AspectSentimentPipeline
+    from dedup import Deduplicator
+    from models import SentimentAnalyzer
+    from preprocessor import TextPreprocessor
+
+    if options['backend'] != 'rule':
+        import torch
+
+        # Workers split the cores instead of each spawning one thread per core
+        torch.set_num_threads(options['torch_threads'])
+
+    analyzer = SentimentAnalyzer(options['model_dir'], backend=options['backend'], quantize=options['quantize'])
+    if analyzer.is_rule_based and options['backend'] != 'rule':
+        # Never backfill lexicon scores under a model's name
+        raise RuntimeError(f"Could not load the {options['backend']} model from {options['model_dir']}")
+    _worker = AspectSentimentPipeline(
+        analyzer, AspectExtractor(), TextPreprocessor(),
+        deduplicator=Deduplicator(threshold=options['dedup_threshold'])
+    )
+
+
+def _score_chunk(chunk_id, chunk, path, fmt):
+    """Score one chunk and write its part file; returns (chunk_id, rows)"""
+    texts = chunk['text'].fillna('').astype(str).tolist()
+
+    # The pipeline identifies each review's language anyway; reuse that
+    stats = {}
+    scores, aspect_scores = _worker.score(texts, stats=stats)
+
+    chunk = chunk.copy()
+    chunk['sentiment_score'] = np.asarray(scores, dtype=np.float32)
+    chunk['detected_language'] = stats['review_languages'].astype(str)
+    chunk['code_mixed'] = stats['code_mixed']
+    for aspect in ASPECTS:
+        # NaN where the review doesn't mention the aspect
+        chunk[aspect_column(aspect)] = np.array(
+            [by_aspect.get(aspect, np.nan) for by_aspect in aspect_scores], dtype=np.float32
+        )
+
+    write_part(chunk, path, fmt)
+    return chunk_id, len(chunk)
+
+
+class Checkpoint:
+    """Finished chunks of one job, stored as JSON next to the part files"""
+
+    def __init__(self, path, job):
+        self.path = path
+        self.job = job
+        self.completed = {}  # chunk number -> rows
+
+    @classmethod
+    def load(cls, path, job):
+        """
+        Resume a checkpoint for the same job, or start an empty one
+        Raises: ValueError if the checkpoint belongs to a different input or settings
+        """
+        checkpoint = cls(path, job)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved['job'] != job:
+                raise ValueError(
+                    f"{path} was written for a different job ({saved['job']}); "
+                    f"use another --output or pass --restart"
+                )
+            checkpoint.completed = {int(chunk_id): rows for chunk_id, rows in saved['completed'].items()}
+        return checkpoint
+
+    @property
+    def rows(self):
+        return sum(self.completed.values())
+
+    def mark_done(self, chunk_id, rows):
+        self.completed[chunk_id] = rows
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'job': self.job, 'completed': self.completed}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def model_identity(model_dir, backend):
+    """
+    Registry version and weight-file fingerprint of the model a job scores with,
+    so a resumed job can't mix parts scored by different weights
+    """
+    if backend == 'rule':
+        return None, None
+    from backends import weights_fingerprint
+
+    manifest = read_manifest(model_dir) if os.path.isdir(model_dir) else None
+    # JSON round trip so it compares equal to the copy saved in checkpoint.json
+    return (manifest or {}).get('version'), json.loads(json.dumps(weights_fingerprint(model_dir)))
+
+
+def format_eta(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m{seconds % 60:02d}s"
+
+
+def run(args):
+    fmt = resolve_format(args.format)
+    os.makedirs(args.output, exist_ok=True)
+    checkpoint_path = os.path.join(args.output, CHECKPOINT_NAME)
+    if args.restart:
+        # Drop the old job's parts too, in case it had more chunks than this one
+        for name in os.listdir(args.output):
+            if name == CHECKPOINT_NAME or name.startswith('part-'):
+                os.remove(os.path.join(args.output, name))
+
+    # Part numbers only line up with input rows for the same file and chunk size
+    stat = os.stat(args.input)
+    model_version, weights = model_identity(args.model_dir, args.backend)
+    if args.backend != 'rule' and weights is None:
+        raise ValueError(f"No model weights found for {args.model_dir}; pass --model-dir or --backend rule")
+    job = {
+        'input': os.path.abspath(args.input),
+        'input_size': stat.st_size,
+        'input_mtime': stat.st_mtime,
+        'chunk_size': args.chunk_size,
+        'model': args.model_dir,
+        'model_version': model_version,
+        'weights': weights,
+        'backend': args.backend,
+        'quantize': args.quantize,
+        'format': fmt
+    }
+    checkpoint = Checkpoint.load(checkpoint_path, job)
+
+    total = count_rows(args.input)
+    if checkpoint.completed:
+        print(f"🔁 Resuming: {len(checkpoint.completed)} chunks ({checkpoint.rows} rows) already scored")
+
+    options = {
+        'model_dir': args.model_dir,
+        'backend': args.backend,
+        'quantize': args.quantize,
+        'dedup_threshold': args.dedup_threshold,
+        'torch_threads': args.torch_threads or max(1, multiprocessing.cpu_count() // args.workers)
+    }
+    print(f"📊 {total} rows in {args.input}, {args.workers} workers, chunks of {args.chunk_size}")
+
+    started = time.monotonic()
+    scored = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(options,)) as pool:
+        pending = set()
+
+        def drain(block_until):
+            nonlocal scored
+            done, still_pending = wait(pending, return_when=block_until)
+            for future in done:
+                chunk_id, rows = future.result()
+                checkpoint.mark_done(chunk_id, rows)
+                scored += rows
+                elapsed = time.monotonic() - started
+                rate = scored / elapsed if elapsed else 0.0
+                remaining = max(0, total - checkpoint.rows)
+                eta = format_eta(remaining / rate) if rate else '?'
+                print(f"  chunk {chunk_id}: {checkpoint.rows}/{total} rows, {rate:.0f} rows/s, ETA {eta}")
+            return still_pending
+
+        for chunk_id, chunk in iter_chunks(args.input, args.chunk_size):
+            if chunk_id in checkpoint.completed:
+                continue
+            # Bound chunks in flight so a huge input isn't read into memory ahead of the workers
+            while len(pending) >= args.workers * 2:
+                pending = drain(FIRST_COMPLETED)
+            pending.add(pool.submit(_score_chunk, chunk_id, chunk, part_path(args.output, chunk_id, fmt), fmt))
+
+        while pending:
+            pending = drain(FIRST_COMPLETED)
+
+    elapsed = time.monotonic() - started
+    print(f"✅ Scored {scored} rows in {elapsed:.1f}s ({scored / elapsed if elapsed else 0:.0f} rows/s); "
+          f"{checkpoint.rows} rows total in {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill sentiment and aspect scores for a CSV/JSONL file")
+    parser.add_argument('input', help="CSV or .jsonl file with a text column")
+    parser.add_argument('--output', required=True, help="directory for part files and checkpoint.json")
+    parser.add_argument('--model-dir', default=None,
+                        help="checkpoint to score with (default: the registry's current version)")
+    parser.add_argument('--version', default=None, help="registered model version to score with")
+    parser.add_argument('--backend', choices=['torch', 'onnx', 'rule'], default='torch')
+    parser.add_argument('--quantize', action='store_true', help="use the dynamic int8 torch model")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                        help="worker processes, each holding one model")
+    parser.add_argument('--torch-threads', type=int, default=None,
+                        help="intra-op threads per worker (default: cores / workers)")
+    parser.add_argument('--chunk-size', type=int, default=2000, help="rows per chunk and per part file")
+    parser.add_argument('--format', choices=sorted(EXTENSIONS), default='parquet')
+    parser.add_argument('--dedup-threshold', type=float, default=0.9,
+                        help="near-duplicate cut-off within a chunk (1 = exact duplicates only)")
+    parser.add_argument('--restart', action='store_true', help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    if not args.model_dir:
+        try:
+            args.model_dir, manifest = ModelRegistry().resolve(args.version)
+            print(f"Scoring with registered version {manifest['version']}")
+        except ModelNotFoundError:
+            args.model_dir = './trained_model'
+
+    try:
+        run(args)
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_for_cache(text):
+    """Normalize text so trivially different strings share a cache entry"""
+    text = unicodedata.normalize('NFC', text)
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+class SentimentCache:
+    """Content-addressed score cache: bounded in-memory LRU with optional SQLite tier"""
+
+    def __init__(self, max_entries=10000, db_path=None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+        self._db = None
+        if db_path:
+            self._connect()
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS sentiment_cache (key TEXT PRIMARY KEY, score REAL NOT NULL)'
+        )
+        self._db.commit()
+
+    def reopen(self):
+        """Open a fresh SQLite connection; call in a forked worker, which must not reuse the parent's"""
+        if self.db_path:
+            with self._lock:
+                self._connect()
+
+    @staticmethod
+    def make_key(text, model_id):
+        """Hash of model identifier plus normalized text"""
+        payload = f"{model_id}\0{normalize_for_cache(text)}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def get_many(self, texts, model_id):
+        """
+        Look up cached scores
+        Returns: list with a float per cached text and None per miss
+        """
+        keys = [self.make_key(text, model_id) for text in texts]
+        results = [None] * len(keys)
+        missing = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                score = self._entries.get(key)
+                if score is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    results[i] = score
+                    self._counters['hits'] += 1
+
+            if missing and self._db is not None:
+                found = self._db_get([keys[i] for i in missing])
+                still_missing = []
+                for i in missing:
+                    score = found.get(keys[i])
+                    if score is None:
+                        still_missing.append(i)
+                    else:
+                        results[i] = score
+                        self._counters['disk_hits'] += 1
+                        self._remember(keys[i], score)
+                missing = still_missing
+
+            self._counters['misses'] += len(missing)
+
+        return results
+
+    def put_many(self, texts, scores, model_id):
+        """Store freshly computed scores in both tiers"""
+        rows = [(self.make_key(text, model_id), float(score)) for text, score in zip(texts, scores)]
+
+        with self._lock:
+            for key, score in rows:
+                self._remember(key, score)
+
+            if self._db is not None and rows:
+                self._db.executemany('INSERT OR REPLACE INTO sentiment_cache VALUES (?, ?)', rows)
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        stats['max_entries'] = self.max_entries
+        stats['persistent'] = self._db is not None
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _remember(self, key, score):
+        # Caller holds self._lock
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def _db_get(self, keys):
+        # Caller holds self._lock; chunk to stay under SQLite's variable limit
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._db.execute(
+                f'SELECT key, score FROM sentiment_cache WHERE key IN ({placeholders})', chunk
+            )
+            found.update(rows)
+        return found
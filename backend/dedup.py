@@ -0,0 +1,108 @@
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from cache import normalize_for_cache
+
+_MERSENNE_PRIME = (1 << 31) - 1
+
+DedupResult = namedtuple('DedupResult', [
+    'representatives',   # input positions of the texts that get scored
+    'assignment',        # for every input, the index of its representative
+    'exact_duplicates',  # inputs whose normalized text was seen before
+    'near_duplicates'    # inputs that joined a similar representative
+])
+
+
+class Deduplicator:
+    """
+    Collapse exact duplicates (by normalized text) and near-duplicates
+    (MinHash over character shingles, LSH banding, then an exact Jaccard check
+    against the candidate) so only one representative per group is scored.
+    Texts join the first earlier representative they match, so groups don't chain.
+    """
+
+    def __init__(self, threshold=0.9, shingle_size=4, num_perm=64, bands=8, seed=1):
+        """
+        threshold: minimum shingle Jaccard similarity for a near-duplicate (>= 1 disables them)
+        num_perm / bands: MinHash signature length and LSH bands (num_perm must divide evenly)
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.int64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.int64)
+
+    def _shingles(self, text):
+        k = self.shingle_size
+        if len(text) <= k:
+            return {text}
+        return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+    def _signature(self, shingles):
+        # crc32 rather than hash(): str hashes are salted per process, so groups would differ between runs
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) & _MERSENNE_PRIME for s in shingles), dtype=np.int64, count=len(shingles)
+        )
+        return ((self._a * hashes + self._b) % _MERSENNE_PRIME).min(axis=1)
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def group(self, texts):
+        """Returns: DedupResult for texts"""
+        assignment = np.empty(len(texts), dtype=np.intp)
+        representatives = []
+        rep_shingles = []
+        by_text = {}   # normalized text -> representative index
+        buckets = {}   # (band, band signature) -> representative indices
+        exact = near = 0
+        near_enabled = self.threshold < 1
+
+        for i, text in enumerate(texts):
+            key = normalize_for_cache(text or '')
+            rep = by_text.get(key)
+            if rep is not None:
+                assignment[i] = rep
+                exact += 1
+                continue
+
+            shingles = self._shingles(key)
+            band_keys = None
+            if near_enabled:
+                band_keys = self._band_keys(self._signature(shingles))
+                rep = self._find_similar(shingles, band_keys, buckets, rep_shingles)
+
+            if rep is not None:
+                near += 1
+            else:
+                rep = len(representatives)
+                representatives.append(i)
+                rep_shingles.append(shingles)
+                if band_keys:
+                    for band_key in band_keys:
+                        buckets.setdefault(band_key, []).append(rep)
+
+            by_text[key] = rep
+            assignment[i] = rep
+
+        return DedupResult(representatives, assignment, exact, near)
+
+    def _find_similar(self, shingles, band_keys, buckets, rep_shingles):
+        candidates = set()
+        for band_key in band_keys:
+            candidates.update(buckets.get(band_key, ()))
+
+        # Earliest matching representative wins, independent of bucket order
+        for rep in sorted(candidates):
+            other = rep_shingles[rep]
+            if len(shingles & other) >= self.threshold * len(shingles | other):
+                return rep
+        return None
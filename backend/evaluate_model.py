@@ -1,63 +1,206 @@
-import torch
+"""
+Evaluation harness: streams a labelled CSV in chunks through SentimentAnalyzer
+(the same batched path the server uses) and reports accuracy/F1 alongside
+per-batch latency percentiles, throughput and peak RSS. The JSON report is
+meant to be diffed between model versions. Scores land in the registry
+manifest: the torch fp32 run under metrics, other runs under their variant.
+
+Usage (from backend/):
+    python evaluate_model.py --version v20240101-120000
+    python evaluate_model.py --model-dir ./trained_model --backend onnx --report onnx.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from sklearn.metrics import accuracy_score, classification_report
-from sklearn.model_selection import train_test_split
-
-# -----------------------------
-# Load dataset
-# -----------------------------
-df = pd.read_csv('../datasets/product_reviews.csv')
-
-# Convert sentiment to numeric labels
-sentiment_map = {'negative': 0, 'neutral': 1, 'positive': 2}
-df['label'] = df['sentiment'].map(sentiment_map)
-
-texts = df['text'].tolist()
-labels = df['label'].tolist()
-
-# -----------------------------
-# Split into train/test for evaluation
-# -----------------------------
-texts_train, texts_test, labels_train, labels_test = train_test_split(
-    texts, labels, test_size=0.2, random_state=42, stratify=labels
-)
-
-# -----------------------------
-# Load trained model
-# -----------------------------
-model_dir = './trained_model1'
-tokenizer = AutoTokenizer.from_pretrained(model_dir)
-model = AutoModelForSequenceClassification.from_pretrained(model_dir)
-model.eval()
-
-# -----------------------------
-# Tokenize test set
-# -----------------------------
-encodings_test = tokenizer(
-    texts_test, truncation=True, padding=True, max_length=128, return_tensors='pt'
-)
-
-# -----------------------------
-# Get predictions
-# -----------------------------
-with torch.no_grad():
-    outputs = model(**encodings_test)
-    logits = outputs.logits
-    predictions = torch.argmax(logits, dim=1).numpy()
-
-# -----------------------------
-# Compute accuracy
-# -----------------------------
-acc = accuracy_score(labels_test, predictions)
-print(f"Accuracy on test set: {acc*100:.2f}%")
-
-# -----------------------------
-# Classification report
-# -----------------------------
-# Handle missing classes safely
-unique_labels = sorted(list(set(labels_test)))  # only labels present in test set
-label_names = ['negative', 'neutral', 'positive']
-target_names = [label_names[i] for i in unique_labels]
-
-print(classification_report(labels_test, predictions, labels=unique_labels, target_names=target_names))
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score
+
+from models import SentimentAnalyzer
+from model_registry import LABEL_MAP, ModelRegistry, ModelNotFoundError
+
+LABEL_NAMES = sorted(LABEL_MAP, key=LABEL_MAP.get)
+
+
+def iter_labelled_chunks(path, chunk_size):
+    """Yields: (texts, labels) per CSV chunk, skipping rows with unknown labels"""
+    for chunk in pd.read_csv(path, chunksize=chunk_size, usecols=['text', 'sentiment']):
+        labels = chunk['sentiment'].map(LABEL_MAP)
+        keep = labels.notna() & chunk['text'].notna()
+        yield chunk['text'][keep].astype(str).tolist(), labels[keep].astype(int).tolist()
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def evaluate(analyzer, data_path, chunk_size=1000, batch_size=32):
+    """
+    Run the whole CSV through analyzer.predict_proba_batch
+    Returns: (report, (y_true, y_pred)); report holds metrics, latency, throughput and memory
+    """
+    analyzer.warmup()
+
+    y_true, y_pred, batch_ms = [], [], []
+    started = time.perf_counter()
+    for texts, labels in iter_labelled_chunks(data_path, chunk_size):
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            batch_started = time.perf_counter()
+            probabilities = analyzer.predict_proba_batch(batch, batch_size=batch_size)
+            batch_ms.append((time.perf_counter() - batch_started) * 1000)
+            y_pred.extend(probabilities.argmax(axis=1).tolist())
+        y_true.extend(labels)
+    elapsed = time.perf_counter() - started
+
+    if not y_true:
+        raise ValueError(f"No labelled rows in {data_path}")
+
+    labels = list(range(len(LABEL_NAMES)))
+    per_class_f1 = f1_score(y_true, y_pred, labels=labels, average=None, zero_division=0)
+    batch_ms = np.asarray(batch_ms)
+    return {
+        'model': analyzer.model_id,
+        'version': analyzer.version,
+        'backend': analyzer.backend.name,
+        'data': os.path.abspath(data_path),
+        'reviews': len(y_true),
+        'batch_size': batch_size,
+        'max_length': analyzer.max_length,
+        'accuracy': round(float(accuracy_score(y_true, y_pred)), 4),
+        'macro_f1': round(float(f1_score(y_true, y_pred, labels=labels, average='macro', zero_division=0)), 4),
+        'f1_per_class': {name: round(float(f1), 4) for name, f1 in zip(LABEL_NAMES, per_class_f1)},
+        'confusion_matrix': confusion_matrix(y_true, y_pred, labels=labels).tolist(),
+        'latency_ms': {
+            'p50': round(float(np.percentile(batch_ms, 50)), 3),
+            'p95': round(float(np.percentile(batch_ms, 95)), 3),
+            'p99': round(float(np.percentile(batch_ms, 99)), 3),
+            'mean': round(float(batch_ms.mean()), 3)
+        },
+        'reviews_per_sec': round(len(y_true) / elapsed, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'padding': analyzer.bucket_stats()
+    }, (y_true, y_pred)
+
+
+def build_analyzer(model_dir, version, backend, quantize):
+    """
+    Raises: RuntimeError if the model fails to load, rather than evaluating
+    the rule-based fallback under the model's name
+    """
+    analyzer = SentimentAnalyzer(model_dir, backend=backend, quantize=quantize)
+    if analyzer.is_rule_based and backend != 'rule':
+        raise RuntimeError(f"Could not load the {backend} model from {model_dir}")
+    analyzer.version = version
+    return analyzer
+
+
+def _evaluate_variant(model_dir, version, backend, quantize, data_path, chunk_size, batch_size):
+    report, _ = evaluate(build_analyzer(model_dir, version, backend, quantize), data_path, chunk_size, batch_size)
+    return report
+
+
+def evaluate_in_subprocess(*args):
+    """
+    evaluate() in a fresh process, so peak_rss_mb covers only that model
+    (ru_maxrss never goes down, so a second run in this process would report the larger of the two)
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(_evaluate_variant, *args).result()
+
+
+def variant_name(backend, quantize):
+    """Manifest variant a run belongs to; None for the plain torch fp32 model"""
+    if quantize:
+        return 'int8'
+    return None if backend == 'torch' else backend
+
+
+def print_report(name, report):
+    latency = report['latency_ms']
+    print(f"\n{name}: {report['model']} ({report['backend']}), {report['reviews']} reviews")
+    print(f"accuracy {report['accuracy'] * 100:.2f}%  macro-F1 {report['macro_f1']:.4f}")
+    print(f"batch latency p50 {latency['p50']:.1f}ms  p95 {latency['p95']:.1f}ms  p99 {latency['p99']:.1f}ms")
+    print(f"{report['reviews_per_sec']:.0f} reviews/s  peak RSS {report['peak_rss_mb']:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the trained sentiment model")
+    parser.add_argument('--model-dir', default=None,
+                        help="checkpoint to evaluate (default: the registry's current version)")
+    parser.add_argument('--version', default=None, help="registered model version to evaluate")
+    parser.add_argument('--data', default='../datasets/product_reviews.csv',
+                        help="labelled CSV with text and sentiment columns")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="CSV rows read at a time")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--backend', choices=['torch', 'onnx', 'rule'], default='torch')
+    parser.add_argument('--quantize', action='store_true', help="evaluate the dynamic int8 torch model")
+    parser.add_argument('--compare-quantized', action='store_true',
+                        help="also report accuracy/macro-F1 vs latency for the int8 model")
+    parser.add_argument('--report', default=None,
+                        help="JSON report path (default: eval_reports/<version or model dir>.json)")
+    args = parser.parse_args()
+    if (args.quantize or args.compare_quantized) and args.backend != 'torch':
+        # Dynamic int8 only exists for the torch backend
+        parser.error("--quantize/--compare-quantized need --backend torch")
+
+    registry = ModelRegistry()
+    version = None
+    if args.model_dir:
+        model_dir = args.model_dir
+    else:
+        try:
+            model_dir, manifest = registry.resolve(args.version)
+            version = manifest['version']
+            print(f"Evaluating registered version {version}")
+        except ModelNotFoundError:
+            model_dir = './trained_model'
+
+    try:
+        analyzer = build_analyzer(model_dir, version, args.backend, args.quantize)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    report, (y_true, y_pred) = evaluate(analyzer, args.data, args.chunk_size, args.batch_size)
+    print_report('fp32' if not args.quantize else 'int8', report)
+    present = sorted(set(y_true))
+    print(classification_report(y_true, y_pred, labels=present,
+                                target_names=[LABEL_NAMES[i] for i in present], zero_division=0))
+
+    int8 = None
+    if args.compare_quantized and not args.quantize:
+        int8 = evaluate_in_subprocess(model_dir, version, 'torch', True, args.data, args.chunk_size, args.batch_size)
+        print_report('int8', int8)
+        report['quantized'] = int8
+        print(f"\nmacro-F1 drop: {report['macro_f1'] - int8['macro_f1']:.4f}, "
+              f"p50 speedup: {report['latency_ms']['p50'] / int8['latency_ms']['p50']:.2f}x")
+
+    if version is not None and args.backend != 'rule':
+        runs = [(variant_name(args.backend, args.quantize), report)]
+        if int8 is not None:
+            runs.append(('int8', int8))
+        for variant, run in runs:
+            registry.update_metrics(version, {
+                'test_accuracy': run['accuracy'],
+                'test_macro_f1': run['macro_f1']
+            }, variant=variant)
+
+    suffix = '-int8' if args.quantize else '' if args.backend == 'torch' else f"-{args.backend}"
+    path = args.report or os.path.join(
+        'eval_reports', f"{version or os.path.basename(os.path.normpath(model_dir))}{suffix}.json"
+    )
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, sort_keys=True)
+    print(f"📝 Report written to {path}")
+
+
+if __name__ == '__main__':
+    main()
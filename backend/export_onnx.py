@@ -0,0 +1,122 @@
+"""
+Export a fine-tuned checkpoint to ONNX and check it against PyTorch.
+
+Usage (from backend/):
+    python export_onnx.py --model-dir ./trained_model
+    python export_onnx.py --model-dir ./trained_model --check
+
+The graph is written to <model-dir>/onnx/model.onnx with dynamic batch and
+sequence axes, plus an ONNX Runtime-optimized model.optimized.onnx that
+SentimentAnalyzer(backend='onnx') loads by preference.
+"""
+import argparse
+import inspect
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from backends import ONNX_SUBDIR
+from model_registry import record_variant
+from models import SentimentAnalyzer
+
+# Max score difference allowed between onnxruntime and torch (also used by tests/test_export_onnx.py)
+DEFAULT_TOLERANCE = 1e-4
+
+
+def export(model_dir, opset=17):
+    out_dir = os.path.join(model_dir, ONNX_SUBDIR)
+    os.makedirs(out_dir, exist_ok=True)
+    raw_path = os.path.join(out_dir, 'model.onnx')
+    optimized_path = os.path.join(out_dir, 'model.optimized.onnx')
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    model.eval()
+
+    sample = tokenizer(["कैमरा बहुत बढ़िया है", "battery"], padding=True, return_tensors='pt')
+    input_names = ['input_ids', 'attention_mask']
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['logits'] = {0: 'batch'}
+
+    kwargs = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        # Newer torch defaults to the dynamo exporter; keep the TorchScript one for dynamic_axes
+        kwargs['dynamo'] = False
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample['input_ids'], sample['attention_mask']),
+            raw_path,
+            input_names=input_names,
+            output_names=['logits'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            **kwargs
+        )
+    print(f"✅ Exported {raw_path}")
+
+    # Let ONNX Runtime fold constants and fuse attention/GELU once, offline
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    options.optimized_model_filepath = optimized_path
+    ort.InferenceSession(raw_path, options, providers=['CPUExecutionProvider'])
+    print(f"✅ Optimized graph saved to {optimized_path}")
+
+    record_variant(model_dir, 'onnx', os.path.join(ONNX_SUBDIR, 'model.optimized.onnx'), opset=opset)
+
+
+def check(model_dir, data, limit, tolerance, batch_size):
+    """Parity and latency: torch vs onnxruntime through the same SentimentAnalyzer batch API"""
+    texts = pd.read_csv(data)['text'].head(limit).tolist()
+
+    results = {}
+    for backend in ('torch', 'onnx'):
+        analyzer = SentimentAnalyzer(model_dir, backend=backend)
+        if analyzer.is_rule_based:
+            print(f"❌ Could not load the {backend} backend")
+            return False
+        analyzer.predict_batch(texts[:batch_size], batch_size=batch_size)  # warm up
+        start = time.perf_counter()
+        scores = analyzer.predict_batch(texts, batch_size=batch_size)
+        results[backend] = (scores, time.perf_counter() - start)
+
+    (torch_scores, torch_time), (onnx_scores, onnx_time) = results['torch'], results['onnx']
+    max_delta = float(np.abs(torch_scores - onnx_scores).max())
+
+    print(f"📊 {len(texts)} reviews, batch_size={batch_size}")
+    print(f"torch: {len(texts) / torch_time:8.1f} reviews/sec")
+    print(f"onnx:  {len(texts) / onnx_time:8.1f} reviews/sec ({torch_time / onnx_time:.2f}x)")
+    print(f"Max score delta: {max_delta:.2e} (tolerance {tolerance:.0e})")
+
+    ok = max_delta <= tolerance
+    print("✅ Parity OK" if ok else "❌ Parity check failed")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a checkpoint to ONNX")
+    parser.add_argument('--model-dir', default='./trained_model')
+    parser.add_argument('--opset', type=int, default=17)
+    parser.add_argument('--check', action='store_true', help="only run the parity/latency check")
+    parser.add_argument('--data', default='../datasets/product_reviews1.csv')
+    parser.add_argument('--limit', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    if not args.check:
+        export(args.model_dir, args.opset)
+
+    if not check(args.model_dir, args.data, args.limit, args.tolerance, args.batch_size):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
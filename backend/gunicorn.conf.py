@@ -0,0 +1,77 @@
+"""
+Production server config: gunicorn -c gunicorn.conf.py (from backend/)
+
+The app is imported once in the master with the model weights loaded
+(PRELOAD_MODEL=1), then forked, so workers share the weights copy-on-write
+instead of each loading XLM-RoBERTa. Threads (warmup, inference worker) are
+started per worker after the fork, and each worker gets its own slice of the
+cores for torch so workers don't oversubscribe them. With PRELOAD_MODEL=0 the
+app is not preloaded and every worker imports it and loads its own copy.
+
+POST /api/admin/model only swaps the worker that handles it; it also marks the
+version current in the registry, and every worker polls the registry
+(MODEL_REGISTRY_POLL_SECONDS, default 30 here) and swaps to that version too.
+
+Environment:
+    WEB_CONCURRENCY         worker processes (default: number of cores)
+    GUNICORN_THREADS        request threads per worker (default 4)
+    TORCH_THREADS           intra-op threads per worker (default: cores / workers)
+    BIND                    listen address (default 0.0.0.0:5000)
+    MODEL_REGISTRY_POLL_SECONDS  how often workers check the registry's current version (default 30)
+"""
+import gc
+import multiprocessing
+import os
+import sys
+
+os.environ.setdefault('PRELOAD_MODEL', '1')
+os.environ.setdefault('MODEL_REGISTRY_POLL_SECONDS', '30')
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = 'app:app'
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+# Without PRELOAD_MODEL=1 each worker imports the app (and loads the model) itself
+preload_app = os.environ['PRELOAD_MODEL'] == '1'
+timeout = 120
+graceful_timeout = 30
+
+
+def torch_threads_per_worker(worker_count):
+    if os.environ.get('TORCH_THREADS'):
+        return int(os.environ['TORCH_THREADS'])
+    return max(1, multiprocessing.cpu_count() // max(1, worker_count))
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the GC's reach, so collections in the
+    # workers don't write to (and un-share) the master's pages
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    # Runs in each worker once it has the app, whether preloaded and forked or imported here.
+    # Only configure torch if the app actually loaded it (not in rule-based mode)
+    if 'torch' in sys.modules:
+        import torch
+
+        intra = torch_threads_per_worker(worker.cfg.workers)
+        torch.set_num_threads(intra)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Already fixed once the parent ran an inter-op parallel region
+            pass
+        worker.log.info(f"Worker {worker.pid}: {intra} torch intra-op threads, 1 inter-op")
+
+    if not worker.cfg.preload_app:
+        # Imported in this worker, so the app already opened its files and started its threads
+        return
+
+    import app
+
+    app.sentiment_cache.reopen()
+    app.aggregate_store.reopen()
+    app.start_background_threads()
@@ -0,0 +1,249 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait
+
+import numpy as np
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class QueueFullError(Exception):
+    """Raised when the inference queue is saturated and a request must be shed"""
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request's deadline passes before all of its texts are scored"""
+
+
+class InferenceMetrics:
+    """Batch-size histogram and queue-wait counters for the inference worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.shed = 0
+        self.batch_sizes = {str(b): 0 for b in BATCH_SIZE_BUCKETS}
+        self.batch_sizes['+Inf'] = 0
+        self.queue_wait_ms = {str(b): 0 for b in QUEUE_WAIT_BUCKETS_MS}
+        self.queue_wait_ms['+Inf'] = 0
+        self.queue_wait_total_ms = 0.0
+        self.queue_wait_max_ms = 0.0
+
+    @staticmethod
+    def _bucket(value, bounds):
+        for bound in bounds:
+            if value <= bound:
+                return str(bound)
+        return '+Inf'
+
+    def record_batch(self, size, waits_ms):
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.batch_sizes[self._bucket(size, BATCH_SIZE_BUCKETS)] += 1
+            for wait_ms in waits_ms:
+                self.queue_wait_ms[self._bucket(wait_ms, QUEUE_WAIT_BUCKETS_MS)] += 1
+                self.queue_wait_total_ms += wait_ms
+                self.queue_wait_max_ms = max(self.queue_wait_max_ms, wait_ms)
+
+    def record_rejected(self, count):
+        with self._lock:
+            self.rejected += count
+
+    def record_shed(self, count):
+        with self._lock:
+            self.shed += count
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'rejected': self.rejected,
+                'shed': self.shed,
+                'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+                'batch_size_histogram': dict(self.batch_sizes),
+                'queue_wait_ms_histogram': dict(self.queue_wait_ms),
+                'avg_queue_wait_ms': round(self.queue_wait_total_ms / self.items, 3) if self.items else 0.0,
+                'max_queue_wait_ms': round(self.queue_wait_max_ms, 3)
+            }
+
+
+class InferenceWorker:
+    """
+    Single thread that owns the model. Request threads enqueue texts and wait on
+    per-item futures; the worker forms dynamic batches bounded by max_batch_size
+    and max_wait_ms, so concurrent requests share forward passes.
+    """
+
+    def __init__(self, sentiment_analyzer, max_batch_size=64, max_wait_ms=5, max_queue_depth=4096,
+                 shed_scorer=None):
+        """
+        shed_scorer: optional cheap scorer with score_batch(texts) (e.g. RuleBasedBackend);
+            when set, requests that don't fit in the queue are scored by it instead of rejected
+        """
+        self.sentiment_analyzer = sentiment_analyzer
+        self.shed_scorer = shed_scorer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_depth = max_queue_depth
+        self.metrics = InferenceMetrics()
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit_many(self, texts, deadline=None):
+        """
+        Queue texts for scoring. A request larger than the whole queue is
+        admitted in queue-sized chunks, each waiting until there is room for it.
+        deadline: time.monotonic() after which an oversized request stops waiting for room
+        Returns: one Future per text, each resolving to a float score
+        Raises: QueueFullError if the queue cannot take all of them and there is no shed_scorer;
+            DeadlineExceededError if the deadline passes while chunks are still waiting
+        """
+        texts = list(texts)
+        futures = [Future() for _ in texts]
+        if not texts:
+            return futures
+
+        self._ensure_started()
+        if len(texts) > self.max_queue_depth:
+            for start in range(0, len(texts), self.max_queue_depth):
+                end = start + self.max_queue_depth
+                if not self._enqueue_when_room(texts[start:end], futures[start:end], deadline):
+                    self._cancel(futures)
+                    raise DeadlineExceededError(f"Deadline passed with {len(texts) - start} texts not yet queued")
+            return futures
+
+        enqueued_at = time.monotonic()
+        with self._cond:
+            # Admit a request whole or not at all, so a shed request leaves no stray work
+            overloaded = len(self._pending) + len(texts) > self.max_queue_depth
+            if overloaded and self.shed_scorer is None:
+                self.metrics.record_rejected(len(texts))
+                raise QueueFullError(
+                    f"Inference queue is full ({len(self._pending)}/{self.max_queue_depth} pending)"
+                )
+            if not overloaded:
+                for text, future in zip(texts, futures):
+                    self._pending.append((text, future, enqueued_at))
+                self._cond.notify_all()
+                return futures
+
+        # Degraded mode: score on the caller's thread with the cheap scorer
+        self.metrics.record_shed(len(texts))
+        for future, score in zip(futures, self.shed_scorer.score_batch(texts)):
+            future.set_result(float(score))
+        return futures
+
+    def _enqueue_when_room(self, texts, futures, deadline=None):
+        """Returns: False if the deadline passed before there was room"""
+        with self._cond:
+            while len(self._pending) + len(texts) > self.max_queue_depth:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    return False
+                self._cond.wait(timeout)
+            enqueued_at = time.monotonic()
+            for text, future in zip(texts, futures):
+                self._pending.append((text, future, enqueued_at))
+            self._cond.notify_all()
+            return True
+
+    @staticmethod
+    def _cancel(futures):
+        # Queued items are skipped by the worker once cancelled; running ones just finish
+        for future in futures:
+            future.cancel()
+
+    def predict_batch(self, texts, batch_size=None, deadline=None):
+        """
+        Drop-in for SentimentAnalyzer.predict_batch that goes through the shared queue
+        deadline: time.monotonic() by which the scores are needed; texts still queued
+            then are dropped from the queue
+        Raises: DeadlineExceededError if the deadline passes first
+        """
+        futures = self.submit_many(texts, deadline)
+        if deadline is not None:
+            _, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            if not_done:
+                self._cancel(not_done)
+                raise DeadlineExceededError(f"Deadline passed with {len(not_done)}/{len(futures)} texts unscored")
+        return np.array([future.result() for future in futures], dtype=np.float32)
+
+    def predict(self, text):
+        return float(self.predict_batch([text])[0])
+
+    def queue_depth(self):
+        with self._cond:
+            return len(self._pending)
+
+    def stats(self):
+        stats = self.metrics.snapshot()
+        stats.update({
+            'queue_depth': self.queue_depth(),
+            'max_queue_depth': self.max_queue_depth,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000
+        })
+        return stats
+
+    def _ensure_started(self):
+        # Started lazily so the thread is created in the process that serves requests
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='inference-worker', daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+
+            # Give other requests up to max_wait to join this batch
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._pending), self.max_batch_size)
+            batch = [self._pending.popleft() for _ in range(size)]
+            # Wake oversized requests waiting for room (submitters share this condition)
+            self._cond.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.monotonic()
+            self.metrics.record_batch(
+                len(batch), [(started - enqueued_at) * 1000 for _, _, enqueued_at in batch]
+            )
+            self._process(batch)
+
+    def _process(self, batch):
+        # Skip items whose caller has already given up
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            scores = self.sentiment_analyzer.predict_batch(
+                [text for text, _, _ in batch], batch_size=self.max_batch_size
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future, _), score in zip(batch, scores):
+            future.set_result(float(score))
@@ -0,0 +1,93 @@
+from collections import deque
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton for matching many keywords in one pass over a text.
+    Keywords map to values (e.g. aspect names); a keyword may carry several values.
+    """
+
+    def __init__(self, keywords=None):
+        self._goto = [{}]
+        self._outputs = [[]]
+        self._delta = None
+        if keywords:
+            for keyword, value in keywords:
+                self.add(keyword, value)
+            self.build()
+
+    def add(self, keyword, value):
+        """Add a keyword; call build() after the last add"""
+        if not keyword:
+            return
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._outputs.append([])
+            state = nxt
+        if (keyword, value) not in self._outputs[state]:
+            self._outputs[state].append((keyword, value))
+        self._delta = None
+
+    def build(self):
+        """Compute failure links and flatten them into a full transition table"""
+        fail = [0] * len(self._goto)
+        delta = [dict(edges) for edges in self._goto]
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                fail[nxt] = self._goto[fallback].get(ch, 0) if fallback or state else 0
+                if fail[nxt] == nxt:
+                    fail[nxt] = 0
+                self._outputs[nxt] = self._outputs[nxt] + [
+                    out for out in self._outputs[fail[nxt]] if out not in self._outputs[nxt]
+                ]
+            # Inherit the failure state's transitions so matching never has to follow fail links
+            if state:
+                for ch, target in delta[fail[state]].items():
+                    delta[state].setdefault(ch, target)
+
+        self._delta = delta
+        return self
+
+    def finditer(self, text):
+        """
+        Scan text once
+        Yields: (start, end, keyword, value) for every (possibly overlapping) match
+        """
+        if self._delta is None:
+            self.build()
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for pos, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                end = pos + 1
+                for keyword, value in outputs[state]:
+                    yield end - len(keyword), end, keyword, value
+
+    def find_values(self, text):
+        """Set of values whose keywords occur anywhere in text"""
+        if self._delta is None:
+            self.build()
+        delta = self._delta
+        outputs = self._outputs
+        found = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                for _, value in outputs[state]:
+                    found.add(value)
+        return found
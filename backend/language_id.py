@@ -0,0 +1,168 @@
+import json
+import os
+import re
+
+import numpy as np
+
+DEFAULT_MARKERS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'data', 'language_markers.json'
+)
+
+LANGUAGES = ('hindi', 'marathi', 'english')
+
+# Same word-character class as the lexicon scorer: \w plus Devanagari signs, minus the dandas
+_WORD_CHARS = r'\w\u0900-\u0963\u0966-\u097F'
+_SEPARATOR = '\x00'
+_DEVANAGARI_RE = re.compile(r'[\u0900-\u097F]')
+
+# Letters that are common in Marathi and close to absent in Hindi:
+# ळ, and candra E (ॅ) in loanwords like बॅटरी where Hindi writes बैटरी
+_MARATHI_CODEPOINTS = (0x0933, 0x0945)
+
+# Code point -> class bits (1 Devanagari, 2 Latin letter, 4 Marathi-only letter);
+# everything above the Devanagari block is clipped onto the last, empty slot
+_DEVANAGARI, _LATIN, _MARATHI = 1, 2, 4
+_CLASSES = np.zeros(0x0981, dtype=np.uint8)
+_CLASSES[0x0900:0x0980] = _DEVANAGARI
+_CLASSES[ord('a'):ord('z') + 1] = _LATIN
+_CLASSES[ord('A'):ord('Z') + 1] = _LATIN
+_CLASSES[list(_MARATHI_CODEPOINTS)] |= _MARATHI
+
+# Code point -> word character (_WORD_CHARS) up to the end of the Devanagari
+# block; the few code points above it are looked up per batch
+_WORD_RE = re.compile(f"[{_WORD_CHARS}]")
+_IS_WORD = np.array([_WORD_RE.match(chr(code)) is not None for code in range(0x0980)])
+_HASH_BASE = np.uint64(0x100000001B3)
+
+
+def _word_mask(codes):
+    """Bool array marking the code points that are word characters"""
+    is_word = _IS_WORD[np.minimum(codes, len(_IS_WORD) - 1)]
+    high = codes >= len(_IS_WORD)
+    if high.any():
+        unique, inverse = np.unique(codes[high], return_inverse=True)
+        is_word[high] = np.array([_WORD_RE.match(chr(code)) is not None for code in unique.tolist()])[inverse]
+    return is_word
+
+
+class LanguageIdentifier:
+    """
+    Batch language ID for Hindi / Marathi / English reviews. Script comes from
+    Unicode ranges over the code points of the whole joined batch; Devanagari
+    text is then split into Marathi vs Hindi by marker words and letters.
+    Code-mixed reviews (Devanagari plus Latin letters) get their Devanagari
+    language and are flagged as mixed.
+    """
+
+    def __init__(self, markers_path=DEFAULT_MARKERS_PATH, default='hindi'):
+        """
+        markers_path: JSON {"marathi": [words], "hindi": [words]}
+        default: language for Devanagari text without any markers, and for text without letters
+        Raises: ValueError if a word is listed as a marker for both languages
+        """
+        self.markers_path = markers_path
+        self.default = default
+
+        with open(markers_path, encoding='utf-8') as f:
+            markers = json.load(f)
+
+        shared = set(markers.get('hindi', [])) & set(markers.get('marathi', []))
+        if shared:
+            raise ValueError(f"Markers listed for both languages in {markers_path}: {sorted(shared)}")
+
+        # word -> +1 for Marathi, -1 for Hindi
+        self.markers = {word: -1 for word in markers.get('hindi', [])}
+        self.markers.update({word: 1 for word in markers.get('marathi', [])})
+        self.tokens = re.compile(f"[{_WORD_CHARS}]+")
+
+        # Batches look markers up by a polynomial hash of each word's code points,
+        # computed in numpy, so no Python work is done per word
+        words = sorted(self.markers)
+        lengths = np.array([len(word) for word in words], dtype=np.int64)
+        self._powers = _HASH_BASE ** np.arange(lengths.max(initial=0), dtype=np.uint64)
+        hashes = np.array([self._hash(np.array([ord(c) for c in word], dtype=np.uint64)) for word in words],
+                          dtype=np.uint64)
+        order = np.argsort(hashes)
+        self._marker_hashes = hashes[order]
+        self._marker_lengths = lengths[order]
+        self._marker_weights = np.array([self.markers[word] for word in words], dtype=np.int64)[order]
+
+    def _hash(self, codes):
+        return np.sum(codes * self._powers[:len(codes)], dtype=np.uint64)
+
+    @staticmethod
+    def _join(texts):
+        """Returns: (joined batch, code points as an array, row of each code point)"""
+        joined = _SEPARATOR.join([text or '' for text in texts])
+        if joined.isascii():
+            codes = np.frombuffer(joined.encode('ascii'), dtype=np.uint8).astype(np.uint32)
+        else:
+            codes = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32)
+        # Separators number the rows as they pass
+        rows = np.cumsum(codes == 0)
+        return joined, codes, rows
+
+    def script_counts(self, texts, joined=None):
+        """
+        joined: _join(texts), when the caller already has it
+        Returns: (devanagari, latin, marathi_letters) int arrays of letter counts per text
+        """
+        _, codes, rows = joined or self._join(texts)
+        classes = _CLASSES[np.minimum(codes, len(_CLASSES) - 1)]
+        # One bincount over (row, class bits) pairs instead of one per class
+        counts = np.bincount(rows * 8 + classes, minlength=len(texts) * 8).reshape(len(texts), 8)
+        return tuple(counts[:, [c for c in range(8) if c & bit]].sum(axis=1)
+                     for bit in (_DEVANAGARI, _LATIN, _MARATHI))
+
+    def marker_scores(self, texts, joined=None):
+        """Marathi minus Hindi marker words per text (positive leans Marathi)"""
+        _, codes, rows = joined or self._join(texts)
+        edges = np.diff(_word_mask(codes).astype(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1)
+        lengths = np.flatnonzero(edges == -1) - starts
+
+        # Words longer than every marker can't be one
+        keep = lengths <= len(self._powers)
+        starts, lengths = starts[keep], lengths[keep]
+        if not len(starts):
+            return np.zeros(len(texts), dtype=np.int64)
+
+        # Hash every remaining word at once: sum of code point * base ** offset in the word
+        firsts = np.cumsum(lengths) - lengths
+        offsets = np.arange(lengths.sum()) - np.repeat(firsts, lengths)
+        chars = codes[np.repeat(starts, lengths) + offsets].astype(np.uint64)
+        hashes = np.add.reduceat(chars * self._powers[offsets], firsts)
+
+        found = np.searchsorted(self._marker_hashes, hashes).clip(max=len(self._marker_hashes) - 1)
+        hit = (self._marker_hashes[found] == hashes) & (self._marker_lengths[found] == lengths)
+        weights = np.where(hit, self._marker_weights[found], 0)
+        return np.bincount(rows[starts], weights=weights, minlength=len(texts)).astype(np.int64)
+
+    def identify_batch(self, texts):
+        """
+        Returns: (languages, mixed) where languages is an object array of
+        'hindi' / 'marathi' / 'english' and mixed a bool array marking
+        reviews that combine Devanagari and Latin letters
+        """
+        texts = list(texts)
+        languages = np.full(len(texts), 'english', dtype=object)
+        joined = self._join(texts)
+        devanagari, latin, marathi_letters = self.script_counts(texts, joined)
+        has_devanagari = devanagari > 0
+        mixed = has_devanagari & (latin > 0)
+        languages[~has_devanagari & (latin == 0)] = self.default
+
+        # Cheap path: without Devanagari (e.g. an all-English batch) there are no markers to look for
+        if has_devanagari.any():
+            leaning = (self.marker_scores(texts, joined) + marathi_letters)[has_devanagari]
+            languages[has_devanagari] = np.where(leaning > 0, 'marathi', np.where(leaning < 0, 'hindi', self.default))
+        return languages, mixed
+
+    def identify(self, text):
+        """Language of one text; same rules as identify_batch without the array setup"""
+        text = text or ''
+        if not _DEVANAGARI_RE.search(text):
+            return 'english' if any(c.isascii() and c.isalpha() for c in text) else self.default
+        leaning = sum(self.markers.get(word, 0) for word in self.tokens.findall(text))
+        leaning += sum(text.count(chr(code)) for code in _MARATHI_CODEPOINTS)
+        return 'marathi' if leaning > 0 else 'hindi' if leaning < 0 else self.default
@@ -0,0 +1,170 @@
+import json
+import os
+import re
+
+import numpy as np
+
+DEFAULT_LEXICON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'data', 'sentiment_lexicon.json'
+)
+
+POSITIVE_SCORE = 0.8
+NEGATIVE_SCORE = 0.2
+NEUTRAL_SCORE = 0.5
+
+# \w misses Devanagari vowel signs and viramas (category M*), so add the block minus the dandas
+_WORD_CHARS = r'\w\u0900-\u0963\u0966-\u097F'
+_CLAUSE_BREAK_RE = re.compile(r'[,.!?;।]')
+
+# Joins a batch into one string; never part of a word, so boundaries hold at text edges
+_SEPARATOR = '\x00'
+
+
+class LexiconScorer:
+    """
+    Weighted lexicon scorer for whole batches. The batch is joined and scanned
+    by one compiled alternation regex; hit weights are scattered into per-text
+    NumPy arrays. Negation cues flip the nearest sentiment word in their scope
+    ('नहीं' looks back, 'not' looks ahead) within the same clause.
+    """
+
+    def __init__(self, lexicon_path=DEFAULT_LEXICON_PATH, negation_window=3):
+        """
+        lexicon_path: JSON with "positive"/"negative" {word: weight} and
+            "negations" {cue: {"scope": "previous"|"next", "weight": w}}
+        negation_window: max words between a negation cue and the word it flips
+        """
+        self.lexicon_path = lexicon_path
+        self.negation_window = negation_window
+
+        with open(lexicon_path, encoding='utf-8') as f:
+            lexicon = json.load(f)
+
+        # word -> (kind, weight); kind +1 positive, -1 negative, 0 negation cue
+        self.entries = {}
+        for word, weight in lexicon.get('positive', {}).items():
+            self.entries[word.lower()] = (1, float(weight))
+        for word, weight in lexicon.get('negative', {}).items():
+            self.entries[word.lower()] = (-1, float(weight))
+        self.negation_scope = {}
+        for word, cue in lexicon.get('negations', {}).items():
+            self.entries[word.lower()] = (0, float(cue.get('weight', 1.0)))
+            self.negation_scope[word.lower()] = cue.get('scope', 'next')
+
+        # Every entry must be a whole word, so 'कम' doesn't fire inside 'कमरा' or
+        # 'no' inside 'noise'; inflected forms are listed in the lexicon instead.
+        # Longest first so the alternation is leftmost-longest; the leading
+        # first-letter lookahead lets the regex engine skip ahead to candidates.
+        alternatives = '|'.join(re.escape(word) for word in sorted(self.entries, key=len, reverse=True))
+        first_letters = re.escape(''.join(sorted({word[0] for word in self.entries})))
+        self.pattern = re.compile(
+            f"(?=[{first_letters}])(?<![{_WORD_CHARS}])(?:{alternatives})(?![{_WORD_CHARS}])"
+        )
+        # Sentiment word -> signed weight, for texts without negation cues
+        self.signed_weights = {word: kind * weight for word, (kind, weight) in self.entries.items() if kind}
+
+    def counts(self, texts):
+        """
+        Weighted positive/negative evidence per text
+        Returns: (positive, negative) float32 arrays of length len(texts)
+        """
+        positive, negative = self._evidence(texts)
+        return positive.astype(np.float32), negative.astype(np.float32)
+
+    def _evidence(self, texts):
+        """counts() in float64, summed in the same order as score() so both break ties alike"""
+        texts = [text or '' for text in texts]
+        positive = np.zeros(len(texts))
+        negative = np.zeros(len(texts))
+        if not texts:
+            return positive, negative
+
+        joined = _SEPARATOR.join(texts).lower()
+        hits = [(m.start(), m.end(), m.group()) for m in self.pattern.finditer(joined)]
+        if not hits:
+            return positive, negative
+
+        offsets = np.cumsum([0] + [len(text) + 1 for text in texts[:-1]])
+        starts = np.fromiter((start for start, _, _ in hits), dtype=np.int64, count=len(hits))
+        rows = np.searchsorted(offsets, starts, side='right') - 1
+        kinds = np.fromiter((self.entries[word][0] for _, _, word in hits), dtype=np.float64, count=len(hits))
+        weights = np.fromiter((self.entries[word][1] for _, _, word in hits), dtype=np.float64, count=len(hits))
+
+        signed = kinds * weights
+        self._apply_negations(joined, hits, rows, kinds, weights, signed, np.flatnonzero(kinds == 0))
+
+        positive = np.bincount(rows, weights=np.maximum(signed, 0), minlength=len(texts))
+        negative = np.bincount(rows, weights=np.maximum(-signed, 0), minlength=len(texts))
+        return positive, negative
+
+    def _apply_negations(self, joined, hits, rows, kinds, weights, signed, cues):
+        """Flip the sentiment word each negation cue scopes over, in place"""
+        for i in cues:
+            target = self._negation_target(joined, hits, rows, kinds, i)
+            if target is None:
+                # A bare negation ("काम नहीं करता") still reads as a complaint
+                signed[i] = -weights[i]
+            else:
+                signed[target] = -signed[target]
+                kinds[target] = 0  # each sentiment word is flipped at most once
+
+    def _negation_target(self, joined, hits, rows, kinds, i):
+        """Index of the sentiment hit negation cue i flips, or None"""
+        start, end, word = hits[i]
+        step = -1 if self.negation_scope[word] == 'previous' else 1
+        j = i + step
+        while 0 <= j < len(hits) and rows[j] == rows[i] and kinds[j] == 0:
+            j += step
+        if not (0 <= j < len(hits)) or rows[j] != rows[i]:
+            return None
+
+        gap = joined[hits[j][1]:start] if step < 0 else joined[end:hits[j][0]]
+        if len(gap.split()) > self.negation_window or _CLAUSE_BREAK_RE.search(gap):
+            return None
+        return j
+
+    def score_batch(self, texts):
+        """
+        Returns: float32 array of 0.8 (positive), 0.2 (negative) or 0.5 (neutral)
+        """
+        texts = list(texts)
+        if len(texts) == 1:
+            return np.array([self.score(texts[0])], dtype=np.float32)
+        positive, negative = self._evidence(texts)
+        return np.where(
+            positive > negative, POSITIVE_SCORE,
+            np.where(negative > positive, NEGATIVE_SCORE, NEUTRAL_SCORE)
+        ).astype(np.float32)
+
+    def score(self, text):
+        """
+        One text, same result as score_batch([text]) but in plain Python:
+        for a single text the array setup costs more than the scoring
+        """
+        text = (text or '').lower()
+        words = self.pattern.findall(text)
+        if not words:
+            return NEUTRAL_SCORE
+
+        try:
+            signed = list(map(self.signed_weights.__getitem__, words))
+        except KeyError:
+            # A negation cue: needs hit positions to find what it flips
+            signed = self._negated_hits(text)
+        positive = sum(value for value in signed if value > 0)
+        negative = sum(-value for value in signed if value < 0)
+        if positive > negative:
+            return POSITIVE_SCORE
+        if negative > positive:
+            return NEGATIVE_SCORE
+        return NEUTRAL_SCORE
+
+    def _negated_hits(self, text):
+        """Signed weight of each lexicon hit in one lowercased text, negations applied"""
+        hits = [(m.start(), m.end(), m.group()) for m in self.pattern.finditer(text)]
+        kinds = [self.entries[word][0] for _, _, word in hits]
+        weights = [self.entries[word][1] for _, _, word in hits]
+        signed = [kind * weight for kind, weight in zip(kinds, weights)]
+        cues = [i for i, kind in enumerate(kinds) if kind == 0]
+        self._apply_negations(text, hits, [0] * len(hits), kinds, weights, signed, cues)
+        return signed
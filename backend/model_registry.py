@@ -0,0 +1,150 @@
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+
+DEFAULT_REGISTRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_registry')
+MANIFEST_FILENAME = 'manifest.json'
+CURRENT_FILENAME = 'CURRENT'
+
+# Column order SentimentAnalyzer assumes for the classifier head
+LABEL_MAP = {'negative': 0, 'neutral': 1, 'positive': 2}
+
+
+class ModelNotFoundError(LookupError):
+    """Raised when a requested model version is not in the registry"""
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(model_dir):
+    """Manifest of a registered version directory, or None for a plain checkpoint"""
+    path = os.path.join(model_dir, MANIFEST_FILENAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def record_variant(model_dir, name, relative_path, **info):
+    """Note a derived artifact (int8, onnx, ...) in a version's manifest, if it has one"""
+    manifest = read_manifest(model_dir)
+    if manifest is None:
+        return
+    manifest.setdefault('variants', {})[name] = {'path': relative_path, **info}
+    _write_json(os.path.join(model_dir, MANIFEST_FILENAME), manifest)
+
+
+class ModelRegistry:
+    """
+    Versioned local model store. Each version is a directory holding a
+    save_pretrained checkpoint plus manifest.json (tokenizer, max_length,
+    label map, metrics, quantization variants); CURRENT names the live version.
+    """
+
+    def __init__(self, root=DEFAULT_REGISTRY_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def version_dir(self, version):
+        return os.path.join(self.root, version)
+
+    def list_versions(self):
+        """Manifests of all registered versions, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        manifests = []
+        for name in os.listdir(self.root):
+            manifest = read_manifest(self.version_dir(name))
+            if manifest is not None:
+                manifests.append(manifest)
+        return sorted(manifests, key=lambda m: m['created_at'])
+
+    def get_manifest(self, version):
+        manifest = read_manifest(self.version_dir(version))
+        if manifest is None:
+            raise ModelNotFoundError(f"Model version {version!r} is not registered in {self.root}")
+        return manifest
+
+    def current_version(self):
+        """The version marked live, else the newest one, else None"""
+        path = os.path.join(self.root, CURRENT_FILENAME)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                version = f.read().strip()
+            if read_manifest(self.version_dir(version)) is not None:
+                return version
+
+        versions = self.list_versions()
+        return versions[-1]['version'] if versions else None
+
+    def set_current(self, version):
+        self.get_manifest(version)  # must exist
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f".{CURRENT_FILENAME}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.root, CURRENT_FILENAME))
+
+    def resolve(self, version=None):
+        """
+        Find a version's directory and manifest (None means the current version)
+        Returns: (model_dir, manifest)
+        """
+        version = version or self.current_version()
+        if version is None:
+            raise ModelNotFoundError(f"No model versions registered in {self.root}")
+        return self.version_dir(version), self.get_manifest(version)
+
+    def register(self, source_dir, version=None, base_model=None, max_length=None,
+                 label_map=LABEL_MAP, metrics=None, make_current=False):
+        """
+        Copy a save_pretrained checkpoint into the registry
+        Returns: the new version name
+        """
+        version = version or datetime.now(timezone.utc).strftime('v%Y%m%d-%H%M%S')
+        target = self.version_dir(version)
+
+        with self._lock:
+            if os.path.exists(target):
+                raise ValueError(f"Model version {version!r} already exists")
+
+            # Copy next to the final location, then rename, so readers never see a half-written version
+            staging = os.path.join(self.root, f".{version}.staging")
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.copytree(source_dir, staging)
+
+            tokenizer_config = {}
+            tokenizer_config_path = os.path.join(staging, 'tokenizer_config.json')
+            if os.path.exists(tokenizer_config_path):
+                with open(tokenizer_config_path, encoding='utf-8') as f:
+                    tokenizer_config = json.load(f)
+
+            _write_json(os.path.join(staging, MANIFEST_FILENAME), {
+                'version': version,
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'base_model': base_model,
+                'tokenizer': tokenizer_config.get('tokenizer_class'),
+                'max_length': max_length,
+                'label_map': label_map,
+                'metrics': metrics or {},
+                'variants': {}
+            })
+            os.replace(staging, target)
+
+        if make_current:
+            self.set_current(version)
+        return version
+
+    def update_metrics(self, version, metrics, variant=None):
+        """Merge evaluation results into a version's manifest, or into one of its variants (int8, onnx, ...)"""
+        manifest = self.get_manifest(version)
+        target = manifest if variant is None else manifest.setdefault('variants', {}).setdefault(variant, {})
+        target.setdefault('metrics', {}).update(metrics)
+        _write_json(os.path.join(self.version_dir(version), MANIFEST_FILENAME), manifest)
@@ -1,100 +1,296 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import threading
 import numpy as np
+from aspect_extractor import AspectExtractor
+from aspect_sentiment import AspectSentimentPipeline
+from backends import RuleBasedBackend, get_backend, unload_backend
+from batching import LengthBucketScheduler
+from model_registry import LABEL_MAP
+
+# Matches max_length used in train_model.py
+DEFAULT_MAX_LENGTH = 128
+DEFAULT_BUCKETS = (32, 64, 128, 256)
+
+# Dummy inputs for warmup, spread across length buckets
+WARMUP_TEXTS = [
+    "कैमरा अच्छा है",
+    "बैटरी बैकअप थोड़ा कम है लेकिन परफॉर्मेंस एकदम जबरदस्त है",
+    "डिस्प्ले बहुत अच्छा है, कीमत थोड़ी ज्यादा है, बिल्ड क्वालिटी ठीक है " * 4
+]
 
 class SentimentAnalyzer:
-    def __init__(self):
-        """Initialize multilingual sentiment model"""
+    def __init__(self, model_name="xlm-roberta-base", max_length=DEFAULT_MAX_LENGTH,
+                 buckets=DEFAULT_BUCKETS, cache=None, quantize=False, backend='torch', lazy=False):
+        """
+        Initialize multilingual sentiment model
+        backend: 'torch', 'onnx' or 'rule' (see backends.py)
+        quantize: with the torch backend, run a dynamic int8 copy of the model on CPU
+        lazy: defer loading the model until it is first used (or warmup() runs)
+        """
         # Using XLM-RoBERTa for multilingual support
-        model_name = "xlm-roberta-base"
+        self.model_name = model_name
+        self.max_length = max_length
+        self.quantize = quantize
+        self.cache = cache  # optional SentimentCache in front of the model
+        self.scheduler = LengthBucketScheduler(buckets=buckets, max_length=max_length)
+        self.rule_backend = RuleBasedBackend()
+        
+        self.backend_name = backend
+        self.version = None  # set when loaded from the model registry
+        self.warm = threading.Event()
+        self.warmup_error = None  # why the last warmup failed, if it did
+        self._backend = None
+        self._unloaded = False  # retired by a hot swap; never loads again
+        self._load_lock = threading.Lock()
+        
+        if not lazy:
+            self._load()
+    
+    @classmethod
+    def from_registry(cls, registry, version=None, **kwargs):
+        """
+        Build an analyzer for a registered model version (None means the current one)
+        Raises: ModelNotFoundError if the version (or any version) is missing
+        """
+        model_dir, manifest = registry.resolve(version)
+        if manifest.get('label_map', LABEL_MAP) != LABEL_MAP:
+            raise ValueError(f"Unsupported label map {manifest['label_map']}, expected {LABEL_MAP}")
         
+        kwargs.setdefault('max_length', manifest.get('max_length') or DEFAULT_MAX_LENGTH)
+        analyzer = cls(model_name=model_dir, **kwargs)
+        analyzer.version = manifest['version']
+        return analyzer
+    
+    @property
+    def backend(self):
+        """
+        The loaded backend; the first access loads it when constructed lazily
+        Raises: RuntimeError once the analyzer has been unloaded
+        """
+        backend = self._backend
+        if backend is None:
+            self._load()
+            backend = self._backend
+        return backend
+    
+    @property
+    def tokenizer(self):
+        return self.backend.tokenizer
+    
+    def _load(self):
+        with self._load_lock:
+            if self._backend is not None:
+                return
+            if self._unloaded:
+                raise RuntimeError(f"Analyzer for {self.model_name} was unloaded by a model swap")
+            
+            if self.backend_name == 'rule':
+                print("Using simple rule-based classifier")
+                self._backend = self.rule_backend
+                return
+            
+            try:
+                self._backend = get_backend(self.backend_name, self.model_name, quantize=self.quantize)
+                print(f"Model loaded successfully on {self._backend.describe()}")
+            except Exception as e:
+                print(f"Using simple rule-based classifier ({e})")
+                self._backend = self.rule_backend
+    
+    def unload(self):
+        """
+        Drop this analyzer's model (after a hot swap): forget the shared backend
+        and this analyzer's own reference, so the weights can be freed. Batches
+        already running keep the backend they started with; the analyzer is
+        retired and never loads the weights again.
+        """
+        with self._load_lock:
+            self._unloaded = True
+            unload_backend(self.backend_name, self.model_name, quantize=self.quantize)
+            self._backend = None
+            self.warm.clear()
+    
+    def warmup(self, rounds=3, batch_sizes=(1, 8, 32)):
+        """
+        Load the model and run a few dummy batches so allocator and thread pools
+        settle before real traffic; sets self.warm only if every batch ran,
+        otherwise records the error in self.warmup_error and re-raises
+        """
+        self.warmup_error = None
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = AutoModelForSequenceClassification.from_pretrained(
-                model_name,
-                num_labels=3  # negative, neutral, positive
-            )
-            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-            self.model.to(self.device)
-            print(f"Model loaded successfully on {self.device}")
-        except:
-            print("Using simple rule-based classifier")
-            self.tokenizer = None
-            self.model = None
+            for _ in range(rounds):
+                for size in batch_sizes:
+                    texts = [WARMUP_TEXTS[i % len(WARMUP_TEXTS)] for i in range(size)]
+                    self._run_model(texts, size)
+        except Exception as e:
+            self.warmup_error = f"{type(e).__name__}: {e}"
+            raise
+        # Dummy batches shouldn't show up in the padding stats
+        self.scheduler.reset_stats()
+        self.warm.set()
     
     def predict(self, text):
         """
         Predict sentiment score
         Returns: float between 0-1 (0=negative, 0.5=neutral, 1=positive)
         """
-        if self.model is None:
-            # Simple rule-based backup
-            return self._rule_based_sentiment(text)
+        return float(self.predict_batch([text], batch_size=1)[0])
+    
+    @property
+    def model_id(self):
+        """Identifies which scorer produced a score (part of the cache key)"""
+        return self.backend.model_id
+    
+    @property
+    def is_rule_based(self):
+        return self.backend is self.rule_backend
+    
+    def predict_batch(self, texts, batch_size=32):
+        """
+        Predict sentiment scores for many texts at once
+        Returns: NumPy array of floats between 0-1, in input order
+        """
+        texts = list(texts)
+        # One backend for the whole call, even if a hot swap unloads it meanwhile
+        backend = self.backend
+        if self.cache is None:
+            scores, _ = self._predict_uncached(texts, batch_size, backend)
+            return scores
         
-        try:
-            # Tokenize
-            inputs = self.tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                max_length=512,
-                padding=True
-            )
-            
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            # Predict
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                probabilities = torch.softmax(outputs.logits, dim=1)
-            
-            # Convert to score
-            probs = probabilities.cpu().numpy()[0]
-            score = probs[2]  # positive probability
+        model_id = backend.model_id
+        scores = np.empty(len(texts), dtype=np.float32)
+        
+        # Only score texts the cache hasn't seen, each distinct string once
+        missing = {}
+        for i, score in enumerate(self.cache.get_many(texts, model_id)):
+            if score is None:
+                missing.setdefault(texts[i], []).append(i)
+            else:
+                scores[i] = score
+        
+        if missing:
+            missing_texts = list(missing)
+            fresh, fell_back = self._predict_uncached(missing_texts, batch_size, backend)
+            for text, score in zip(missing_texts, fresh):
+                scores[missing[text]] = score
             
-            return float(score)
+            # Rule-based fallbacks after a model error must not be cached as model output
+            keep = ~fell_back
+            self.cache.put_many(
+                [t for t, k in zip(missing_texts, keep) if k], fresh[keep], model_id
+            )
+        
+        return scores
+    
+    def predict_proba_batch(self, texts, batch_size=32):
+        """
+        Class probabilities for many texts (uncached)
+        Returns: NumPy array of shape (n, 3): negative, neutral, positive
+        """
+        texts = list(texts)
+        probabilities, fell_back = self._run_model(texts, batch_size)
+        fallback_idx = np.flatnonzero(fell_back)
+        if len(fallback_idx):
+            probabilities[fallback_idx] = self._rule_based_probabilities([texts[i] for i in fallback_idx])
+        return probabilities
+    
+    def _predict_uncached(self, texts, batch_size, backend):
+        """
+        Run the model over texts
+        Returns: (scores, fell_back) where fell_back marks texts scored by the rule-based backup
+        """
+        probabilities, fell_back = self._run_model(texts, batch_size, backend)
+        
+        # Convert to score: positive probability
+        scores = probabilities[:, 2].copy()
+        fallback_idx = np.flatnonzero(fell_back)
+        if len(fallback_idx):
+            scores[fallback_idx] = self.rule_backend.score_batch([texts[i] for i in fallback_idx])
+        
+        if backend is self.rule_backend:
+            # Rule-based is the scorer itself here, not a fallback
+            fell_back[:] = False
+        return scores, fell_back
+    
+    def _run_model(self, texts, batch_size, backend=None):
+        """
+        backend: the backend to run on (default: this analyzer's, read once)
+        Returns: (probabilities, fell_back); rows where fell_back is set were not
+        scored by the model and must be filled in by the caller
+        """
+        backend = backend or self.backend
+        probabilities = np.zeros((len(texts), 3), dtype=np.float32)
+        fell_back = np.ones(len(texts), dtype=bool)
         
+        if backend is self.rule_backend or not texts:
+            return probabilities, fell_back
+        
+        tokenizer = backend.tokenizer
+        try:
+            # Tokenize once without padding to learn each text's length
+            encodings = tokenizer(texts, truncation=True, max_length=self.max_length)
         except Exception as e:
             print(f"Prediction error: {e}")
-            return self._rule_based_sentiment(text)
-    
-    def _rule_based_sentiment(self, text):
-        """Backup rule-based sentiment analysis"""
-        positive_words = [
-            'बढ़िया', 'अच्छा', 'शानदार', 'बेहतरीन', 'जबरदस्त', 'उत्तम',
-            'छान', 'सुंदर', 'perfect', 'best', 'good', 'great', 'excellent'
-        ]
-        negative_words = [
-            'खराब', 'बुरा', 'कम', 'नहीं', 'not', 'bad', 'poor', 'waste',
-            'वाया', 'गयाचा'
-        ]
+            return probabilities, fell_back
         
-        text_lower = text.lower()
+        lengths = [len(ids) for ids in encodings['input_ids']]
         
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
+        for bucket, batch_idx in self.scheduler.schedule(lengths, batch_size):
+            try:
+                # Pad only to the longest text in this bucket's batch
+                inputs = tokenizer.pad(
+                    {k: [v[i] for i in batch_idx] for k, v in encodings.items()},
+                    return_tensors=backend.tensor_type
+                )
+                self.scheduler.record(bucket, [lengths[i] for i in batch_idx])
+                
+                # Predict
+                probabilities[batch_idx] = backend.predict_proba(inputs)
+                fell_back[batch_idx] = False
+            
+            except Exception as e:
+                print(f"Prediction error: {e}")
         
-        if pos_count > neg_count:
-            return 0.8
-        elif neg_count > pos_count:
-            return 0.2
-        else:
-            return 0.5
+        return probabilities, fell_back
+    
+    def bucket_stats(self):
+        """Per-bucket batch/padding counters for the inference path"""
+        return self.scheduler.stats()
+    
+    def _rule_based_probabilities(self, texts):
+        """One-hot class probabilities from the rule-based labels, shape (n, 3)"""
+        scores = self.rule_backend.score_batch(texts)
+        labels = np.where(scores > 0.5, 2, np.where(scores < 0.5, 0, 1))
+        probabilities = np.zeros((len(texts), 3), dtype=np.float32)
+        probabilities[np.arange(len(texts)), labels] = 1.0
+        return probabilities
+    
+    def _rule_based_sentiment(self, text):
+        """Backup rule-based sentiment analysis"""
+        return self.rule_backend.score(text)
 
 
 class AspectClassifier:
     """Classify sentiment for specific aspects"""
     
-    def __init__(self):
-        self.sentiment_analyzer = SentimentAnalyzer()
+    def __init__(self, sentiment_analyzer=None, aspect_extractor=None):
+        # Model weights are shared process-wide, so this doesn't load a second copy
+        self.sentiment_analyzer = sentiment_analyzer or SentimentAnalyzer(lazy=True)
+        self.aspect_extractor = aspect_extractor or AspectExtractor()
+        self.pipeline = AspectSentimentPipeline(self.sentiment_analyzer, self.aspect_extractor)
     
     def classify_aspect_sentiment(self, text, aspect):
         """Get sentiment for a specific aspect in text"""
-        # Check if aspect is mentioned
-        if aspect.lower() not in text.lower():
-            return None
-        
-        # Get sentiment for the whole text
-        # In production: extract aspect-specific sentences
-        sentiment = self.sentiment_analyzer.predict(text)
-        return sentiment
\ No newline at end of file
+        return self.classify_aspect_sentiments([text], aspect)[0]
+    
+    def classify_aspect_sentiments(self, texts, aspect):
+        """Get sentiment for a specific aspect in each text (None if not mentioned)"""
+        _, aspect_scores = self.pipeline.score(texts, aspects={aspect}, include_reviews=False)
+        return [scores.get(aspect) for scores in aspect_scores]
+    
+    def classify_all_aspects(self, texts, language=None):
+        """
+        Score every mentioned aspect from the sentences that mention it,
+        all texts in one batched pass
+        Returns: list of {aspect: score}, one per text
+        """
+        _, aspect_scores = self.pipeline.score(texts, language, include_reviews=False)
+        return aspect_scores
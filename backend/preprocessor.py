@@ -1,53 +1,100 @@
 import re
 import string
 
+from language_id import LanguageIdentifier
+
+# Patterns compiled once at import instead of on every clean_text call
+_URL_RE = re.compile(r'http\S+|www\S+')
+_MENTION_RE = re.compile(r'@\w+|#\w+')
+_WHITESPACE_RE = re.compile(r'\s+')
+_SYMBOL_RE = re.compile(r'[^\w\s\u0900-\u097F]')
+
+# Consonant + nukta sequences folded to the plain consonant. These are two
+# code points each, so one regex pass replaces the chain of str.replace calls.
+_NUKTA = '\u093c'
+_NUKTA_RE = re.compile('([कखगजफ])' + _NUKTA)
+
+
 class TextPreprocessor:
-    def __init__(self):
+    def __init__(self, language_identifier=None):
+        """language_identifier: used when no language is given (default: LanguageIdentifier())"""
+        self._language_identifier = language_identifier
+
         self.hindi_stopwords = [
             'का', 'के', 'की', 'है', 'हैं', 'था', 'थी', 'थे', 'हो',
             'और', 'या', 'में', 'से', 'को', 'पर', 'यह', 'वह'
         ]
-        
+
         self.marathi_stopwords = [
             'आहे', 'आहेत', 'होते', 'होता', 'आणि', 'किंवा', 'मध्ये',
             'पासून', 'साठी', 'वर', 'हे', 'ते'
         ]
-    
+
+        self.english_stopwords = [
+            'the', 'a', 'an', 'is', 'are', 'was', 'were', 'and', 'or', 'of',
+            'in', 'on', 'to', 'for', 'it', 'this', 'that', 'with'
+        ]
+
+        # O(1) membership for remove_stopwords
+        self._stopword_sets = {
+            'hindi': frozenset(self.hindi_stopwords),
+            'marathi': frozenset(self.marathi_stopwords),
+            'english': frozenset(self.english_stopwords)
+        }
+        self._all_stopwords = frozenset().union(*self._stopword_sets.values())
+
+    @property
+    def language_identifier(self):
+        if self._language_identifier is None:
+            self._language_identifier = LanguageIdentifier()
+        return self._language_identifier
+
     def clean_text(self, text):
         """Clean and normalize text"""
         if not text:
             return ""
-        
-        # Remove URLs
-        text = re.sub(r'http\S+|www\S+', '', text)
-        
+
+        # Remove URLs (skip the regex when no URL can be present)
+        if 'http' in text or 'www' in text:
+            text = _URL_RE.sub('', text)
+
         # Remove mentions and hashtags
-        text = re.sub(r'@\w+|#\w+', '', text)
-        
+        if '@' in text or '#' in text:
+            text = _MENTION_RE.sub('', text)
+
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
+        text = _WHITESPACE_RE.sub(' ', text)
+
         # Remove emojis (optional)
-        text = re.sub(r'[^\w\s\u0900-\u097F]', '', text)
-        
+        text = _SYMBOL_RE.sub('', text)
+
         return text.strip()
-    
-    def remove_stopwords(self, text, language='hindi'):
-        """Remove stopwords"""
-        stopwords = self.hindi_stopwords if language == 'hindi' else self.marathi_stopwords
-        words = text.split()
-        filtered = [word for word in words if word not in stopwords]
-        return ' '.join(filtered)
-    
+
+    def clean_many(self, texts):
+        """Clean a stream of texts lazily, yielding one result per input"""
+        clean_text = self.clean_text
+        for text in texts:
+            yield clean_text(text)
+
+    def remove_stopwords(self, text, language=None):
+        """Remove stopwords (language detected when not given); English matches ignore case"""
+        if language is None:
+            # Cheap paths: ASCII text is English, and text without any stopword
+            # is returned as is, neither needing language ID
+            if text.isascii():
+                language = 'english'
+            elif self._all_stopwords.isdisjoint([word.lower() for word in text.split()]):
+                return ' '.join(text.split())
+            else:
+                language = self.language_identifier.identify(text)
+        stopwords = self._stopword_sets.get(language, self._stopword_sets['marathi'])
+        if language == 'english':
+            return ' '.join([word for word in text.split() if word.lower() not in stopwords])
+        return ' '.join([word for word in text.split() if word not in stopwords])
+
     def normalize_text(self, text):
         """Normalize unicode and variations"""
-        # Normalize variations of similar characters
-        replacements = {
-            'क़': 'क', 'ख़': 'ख', 'ग़': 'ग',
-            'ज़': 'ज', 'फ़': 'फ'
-        }
-        
-        for old, new in replacements.items():
-            text = text.replace(old, new)
-        
-        return text
\ No newline at end of file
+        # Normalize variations of similar characters: क़ ख़ ग़ ज़ फ़ -> क ख ग ज फ
+        if _NUKTA not in text:
+            return text
+        return _NUKTA_RE.sub(r'\1', text)
@@ -1,149 +1,328 @@
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+import threading
 import time
 import random
 
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests/sec with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            # Jitter so parallel workers don't wake in lockstep
+            time.sleep(wait * random.uniform(1, 1.2))
+
+
+# Responses worth asking for again: throttled or a transient server error
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryableFetchError(Exception):
+    """Raised by a page fetch that failed transiently and may be retried"""
+
+
+class _ProductCrawl:
+    """
+    Page-ordered fetches for one product. The host's rate-limit token is taken
+    before each page is submitted, at most `prefetch` pages are in flight, and
+    nothing is submitted past the first empty or failed page.
+    """
+
+    def __init__(self, scraper, platform, product_url, max_pages):
+        self.scraper = scraper
+        self.platform = platform
+        self.product_url = product_url
+        self.max_pages = max_pages
+        self.next_page = 1
+        self.pending = deque()  # (page, future, attempt) in page order
+        self.stopped = False
+
+    @property
+    def done(self):
+        return self.stopped or (not self.pending and self.next_page > self.max_pages)
+
+    @property
+    def head(self):
+        """Future of the next page to hand out, or None"""
+        return self.pending[0][1] if self.pending else None
+
+    def _submit(self, page):
+        url = ReviewScraper._page_url(self.platform, self.product_url, page)
+        self.scraper._bucket_for(url).acquire()
+        return self.scraper._executor.submit(self.scraper._fetch_page, self.platform, url, page)
+
+    def top_up(self):
+        while not self.stopped and len(self.pending) < self.scraper.prefetch and self.next_page <= self.max_pages:
+            self.pending.append((self.next_page, self._submit(self.next_page), 0))
+            self.next_page += 1
+
+    def take_ready(self):
+        """Returns: reviews of each finished page at the front of the queue, in page order"""
+        ready = []
+        while self.pending and self.pending[0][1].done():
+            page, future, attempt = self.pending.popleft()
+            try:
+                page_reviews = future.result()
+            except RetryableFetchError as e:
+                if attempt < self.scraper.retries:
+                    print(f"Retrying page {page}: {e}")
+                    self.pending.appendleft((page, self._submit(page), attempt + 1))
+                    continue
+                print(f"Failed to fetch page {page}: {e}")
+                page_reviews = None
+            except Exception as e:
+                print(f"Scraping error: {e}")
+                page_reviews = None
+
+            # Like the sequential scraper, stop at the first failed page, and at the first empty one
+            if not page_reviews:
+                self.stop()
+                break
+            ready.append(page_reviews)
+        return ready
+
+    def stop(self):
+        self.stopped = True
+        for _, future, _ in self.pending:
+            future.cancel()
+        self.pending.clear()
+
+
 class ReviewScraper:
-    def __init__(self):
+    def __init__(self, max_workers=8, requests_per_second=0.5, burst=2, prefetch=2, retries=2):
+        """
+        max_workers: concurrent page fetches across all products
+        requests_per_second / burst: politeness limit applied per host
+        prefetch: pages of one product fetched ahead of the page being read
+        retries: extra attempts for a page after a connection error, 429 or 5xx
+        """
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-    
+        self.max_workers = max_workers
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.prefetch = max(1, prefetch)
+        self.retries = retries
+
+        # One pooled keep-alive session shared by all worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scraper')
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def _bucket_for(self, url):
+        host = urlsplit(url).netloc
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.requests_per_second, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def _fetch(self, url):
+        """GET a URL once the host's rate limit allows it"""
+        self._bucket_for(url).acquire()
+        return self.session.get(url, headers=self.headers, timeout=10)
+
+    def _fetch_page(self, platform, url, page):
+        """
+        Fetch and parse one review page; the caller has already taken the rate-limit token
+        Returns: list of reviews, or None if the page could not be fetched
+        Raises: RetryableFetchError on a connection error, 429 or 5xx
+        """
+        try:
+            response = self.session.get(url, headers=self.headers, timeout=10)
+        except requests.RequestException as e:
+            raise RetryableFetchError(e) from e
+
+        if response.status_code in RETRY_STATUSES:
+            raise RetryableFetchError(f"HTTP {response.status_code}")
+        if response.status_code != 200:
+            print(f"Failed to fetch page {page}")
+            return None
+
+        if platform == 'flipkart':
+            return self._parse_flipkart_page(response.content)
+        return self._parse_amazon_page(response.content)
+
+    @staticmethod
+    def _page_url(platform, product_url, page):
+        if page == 1:
+            return product_url
+        if platform == 'flipkart':
+            return f"{product_url}&page={page}"
+        return f"{product_url}?pageNumber={page}"
+
+    def iter_reviews(self, product_url, platform='flipkart', max_pages=5):
+        """Yield review records as soon as each page has arrived, in page order"""
+        crawl = _ProductCrawl(self, platform, product_url, max_pages)
+        try:
+            while not crawl.done:
+                crawl.top_up()
+                wait([crawl.head])
+                for page_reviews in crawl.take_ready():
+                    yield from page_reviews
+        finally:
+            # Pages past a failure (or an abandoned iterator) are no longer needed
+            crawl.stop()
+
+    def scrape_many(self, product_urls, platform='flipkart', max_pages=5):
+        """
+        Scrape several products concurrently
+        Returns: {product_url: [reviews]}
+        """
+        crawls = {url: _ProductCrawl(self, platform, url, max_pages) for url in product_urls}
+        results = {url: [] for url in product_urls}
+
+        active = list(crawls.items())
+        while active:
+            for _, crawl in active:
+                crawl.top_up()
+            wait([crawl.head for _, crawl in active], return_when=FIRST_COMPLETED)
+            for url, crawl in active:
+                for page_reviews in crawl.take_ready():
+                    results[url].extend(page_reviews)
+            active = [(url, crawl) for url, crawl in active if not crawl.done]
+        return results
+
     def scrape_flipkart_reviews(self, product_url, max_pages=5):
         """Scrape reviews from Flipkart"""
-        all_reviews = []
-        
-        try:
-            for page in range(1, max_pages + 1):
-                # Construct page URL
-                if page == 1:
-                    url = product_url
-                else:
-                    url = f"{product_url}&page={page}"
-                
-                response = requests.get(url, headers=self.headers, timeout=10)
-                
-                if response.status_code != 200:
-                    print(f"Failed to fetch page {page}")
-                    break
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Find review containers
-                reviews = soup.find_all('div', {'class': '_1AtVbE'})
-                
-                for review in reviews:
-                    try:
-                        # Extract rating
-                        rating_div = review.find('div', {'class': '_3LWZlK'})
-                        rating = int(rating_div.text.strip()) if rating_div else 0
-                        
-                        # Extract review text
-                        text_div = review.find('div', {'class': 't-ZTKy'})
-                        if not text_div:
-                            text_div = review.find('div', {'class': '_6K-7Co'})
-                        
-                        review_text = text_div.text.strip() if text_div else ""
-                        
-                        if review_text:
-                            all_reviews.append({
-                                'text': review_text,
-                                'rating': rating,
-                                'source': 'flipkart'
-                            })
-                    
-                    except Exception as e:
-                        print(f"Error parsing review: {e}")
-                        continue
-                
-                # Be polite - add delay
-                time.sleep(random.uniform(1, 3))
-            
-            print(f"Scraped {len(all_reviews)} reviews from Flipkart")
-            return all_reviews
-        
-        except Exception as e:
-            print(f"Scraping error: {e}")
-            return []
-    
+        all_reviews = self.scrape_many([product_url], 'flipkart', max_pages)[product_url]
+        print(f"Scraped {len(all_reviews)} reviews from Flipkart")
+        return all_reviews
+
     def scrape_amazon_reviews(self, product_url, max_pages=5):
         """Scrape reviews from Amazon"""
-        all_reviews = []
-        
-        try:
-            for page in range(1, max_pages + 1):
-                url = product_url if page == 1 else f"{product_url}?pageNumber={page}"
-                
-                response = requests.get(url, headers=self.headers, timeout=10)
-                
-                if response.status_code != 200:
-                    break
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Find review containers
-                reviews = soup.find_all('div', {'data-hook': 'review'})
-                
-                for review in reviews:
-                    try:
-                        # Extract rating
-                        rating_span = review.find('i', {'data-hook': 'review-star-rating'})
-                        rating = 0
-                        if rating_span:
-                            rating_text = rating_span.find('span').text
-                            rating = int(float(rating_text.split()[0]))
-                        
-                        # Extract review text
-                        text_span = review.find('span', {'data-hook': 'review-body'})
-                        review_text = text_span.text.strip() if text_span else ""
-                        
-                        if review_text:
-                            all_reviews.append({
-                                'text': review_text,
-                                'rating': rating,
-                                'source': 'amazon'
-                            })
-                    
-                    except Exception as e:
-                        continue
-                
-                time.sleep(random.uniform(1, 3))
-            
-            print(f"Scraped {len(all_reviews)} reviews from Amazon")
-            return all_reviews
-        
-        except Exception as e:
-            print(f"Amazon scraping error: {e}")
-            return []
-    
+        all_reviews = self.scrape_many([product_url], 'amazon', max_pages)[product_url]
+        print(f"Scraped {len(all_reviews)} reviews from Amazon")
+        return all_reviews
+
+    def _parse_flipkart_page(self, content):
+        soup = BeautifulSoup(content, 'html.parser')
+        page_reviews = []
+
+        # Find review containers
+        reviews = soup.find_all('div', {'class': '_1AtVbE'})
+
+        for review in reviews:
+            try:
+                # Extract rating
+                rating_div = review.find('div', {'class': '_3LWZlK'})
+                rating = int(rating_div.text.strip()) if rating_div else 0
+
+                # Extract review text
+                text_div = review.find('div', {'class': 't-ZTKy'})
+                if not text_div:
+                    text_div = review.find('div', {'class': '_6K-7Co'})
+
+                review_text = text_div.text.strip() if text_div else ""
+
+                if review_text:
+                    page_reviews.append({
+                        'text': review_text,
+                        'rating': rating,
+                        'source': 'flipkart'
+                    })
+
+            except Exception as e:
+                print(f"Error parsing review: {e}")
+                continue
+
+        return page_reviews
+
+    def _parse_amazon_page(self, content):
+        soup = BeautifulSoup(content, 'html.parser')
+        page_reviews = []
+
+        # Find review containers
+        reviews = soup.find_all('div', {'data-hook': 'review'})
+
+        for review in reviews:
+            try:
+                # Extract rating
+                rating_span = review.find('i', {'data-hook': 'review-star-rating'})
+                rating = 0
+                if rating_span:
+                    rating_text = rating_span.find('span').text
+                    rating = int(float(rating_text.split()[0]))
+
+                # Extract review text
+                text_span = review.find('span', {'data-hook': 'review-body'})
+                review_text = text_span.text.strip() if text_span else ""
+
+                if review_text:
+                    page_reviews.append({
+                        'text': review_text,
+                        'rating': rating,
+                        'source': 'amazon'
+                    })
+
+            except Exception as e:
+                continue
+
+        return page_reviews
+
     def search_product(self, product_name, platform='flipkart'):
         """Search for product and get review page URL"""
         search_urls = {
             'flipkart': f"https://www.flipkart.com/search?q={product_name.replace(' ', '+')}",
             'amazon': f"https://www.amazon.in/s?k={product_name.replace(' ', '+')}"
         }
-        
+
         try:
             url = search_urls.get(platform)
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self._fetch(url)
             soup = BeautifulSoup(response.content, 'html.parser')
-            
+
             # Find first product link
             if platform == 'flipkart':
                 product_link = soup.find('a', {'class': '_1fQZEK'})
             else:
                 product_link = soup.find('a', {'class': 'a-link-normal s-no-outline'})
-            
+
             if product_link:
                 href = product_link.get('href')
                 if platform == 'flipkart':
                     full_url = f"https://www.flipkart.com{href}"
                 else:
                     full_url = f"https://www.amazon.in{href}"
-                
+
                 return full_url
-        
+
         except Exception as e:
             print(f"Search error: {e}")
-        
-        return None
\ No newline at end of file
+
+        return None
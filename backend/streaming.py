@@ -0,0 +1,40 @@
+from aggregation import RunningAggregate
+from aspect_sentiment import AspectSentimentPipeline
+
+
+class StreamingAnalyzer:
+    """Score reviews in micro-batches as they arrive, keeping running aggregates"""
+
+    def __init__(self, sentiment_analyzer, aspect_extractor, preprocessor, batch_size=32, deduplicator=None):
+        self.sentiment_analyzer = sentiment_analyzer
+        self.aspect_extractor = aspect_extractor
+        self.preprocessor = preprocessor
+        self.batch_size = batch_size
+        self.pipeline = AspectSentimentPipeline(sentiment_analyzer, aspect_extractor, preprocessor, deduplicator)
+
+    def run(self, reviews, aggregate=None, batch_size=None):
+        """
+        Consume an iterable of reviews (strings or scraper records with 'text')
+        Yields: the updated RunningAggregate after every micro-batch
+        """
+        aggregate = aggregate if aggregate is not None else RunningAggregate()
+        batch_size = batch_size or self.batch_size
+        batch = []
+
+        for review in reviews:
+            batch.append(review['text'] if isinstance(review, dict) else review)
+            if len(batch) >= batch_size:
+                self._score(batch, aggregate)
+                batch = []
+                yield aggregate
+
+        if batch:
+            self._score(batch, aggregate)
+            yield aggregate
+
+    def _score(self, texts, aggregate):
+        # Reviews and their aspect sentences share one batched inference pass
+        scores, aspect_scores = self.pipeline.score(texts)
+
+        for score, aspects in zip(scores, aspect_scores):
+            aggregate.add(float(score), aspects)
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+# Backend modules use flat imports (run from backend/), so put backend/ on the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def tiny_checkpoint(tmp_path_factory):
+    """A randomly initialised two-layer XLM-R classifier with its own small tokenizer, saved like a trained model"""
+    pytest.importorskip('torch')
+    tokenizers = pytest.importorskip('tokenizers')
+    transformers = pytest.importorskip('transformers')
+
+    corpus = [
+        "great phone with an amazing camera", "battery drains very fast", "screen is bright and sharp",
+        "worth the price", "build quality feels cheap", "बहुत अच्छा फोन है", "कॅमेरा छान आहे", "performance is smooth"
+    ]
+    tokenizer = tokenizers.Tokenizer(tokenizers.models.WordPiece(unk_token='<unk>'))
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tokenizer.train_from_iterator(corpus, tokenizers.trainers.WordPieceTrainer(
+        vocab_size=200, special_tokens=['<s>', '<pad>', '</s>', '<unk>', '<mask>']
+    ))
+    tokenizer.post_processor = tokenizers.processors.TemplateProcessing(
+        single='<s> $A </s>', special_tokens=[('<s>', 0), ('</s>', 2)]
+    )
+    fast = transformers.PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, bos_token='<s>', eos_token='</s>', pad_token='<pad>', unk_token='<unk>',
+        mask_token='<mask>', cls_token='<s>', sep_token='</s>'
+    )
+
+    path = str(tmp_path_factory.mktemp('tiny_model'))
+    fast.save_pretrained(path)
+    config = transformers.XLMRobertaConfig(
+        vocab_size=fast.vocab_size, hidden_size=32, num_hidden_layers=2, num_attention_heads=4,
+        intermediate_size=64, max_position_embeddings=130, num_labels=3, pad_token_id=1
+    )
+    transformers.XLMRobertaForSequenceClassification(config).save_pretrained(path)
+    return path
@@ -0,0 +1,61 @@
+import pytest
+
+from aggregate_store import AggregateStore
+
+
+def fold(store, product, reviews, score, version='v1'):
+    keys, new = store.unseen(product, reviews, version)
+    store.add_reviews(product, keys, [score] * len(new), [{'Camera': score}] * len(new), version)
+    store.touch(product, model_version=version)
+    return len(new)
+
+
+def test_identical_reviews_from_different_buyers_each_count():
+    store = AggregateStore()
+    assert fold(store, 'phone', ['बहुत अच्छा'] * 3 + ['खराब'], 0.9) == 4
+    assert store.analysis('phone')['reviews_analyzed'] == 4
+
+
+def test_refetching_the_same_listing_adds_nothing():
+    store = AggregateStore()
+    reviews = ['बहुत अच्छा', 'बहुत अच्छा', 'खराब']
+    fold(store, 'phone', reviews, 0.9)
+    assert fold(store, 'phone', reviews, 0.9) == 0
+    # One more identical review on the next fetch is a new review
+    assert fold(store, 'phone', reviews + ['बहुत अच्छा'], 0.9) == 1
+    assert store.analysis('phone')['reviews_analyzed'] == 4
+
+
+def test_scraper_records_are_keyed_by_position():
+    records = [{'text': 'ok', 'source': 'flipkart', 'page': 1, 'position': i} for i in range(2)]
+    assert len(set(AggregateStore.review_keys(records))) == 2
+
+
+def test_new_model_version_rebuilds_aggregates():
+    store = AggregateStore()
+    fold(store, 'phone', ['a', 'b'], 0.2, version='v1')
+    low = store.analysis('phone')['overall_score']
+    assert not store.is_stale('phone', 'v1')
+    assert store.is_stale('phone', 'v2')
+
+    assert fold(store, 'phone', ['a', 'b'], 0.8, version='v2') == 2
+    analysis = store.analysis('phone')
+    assert analysis['reviews_analyzed'] == 2
+    assert analysis['model_version'] == 'v2'
+    assert analysis['overall_score'] > low
+    assert sum(analysis['score_histogram']) == 2
+
+
+def test_delete_rolls_back_on_error():
+    store = AggregateStore()
+    fold(store, 'phone', ['a'], 0.5)
+
+    def failing_delete(product):
+        store._db.execute('DELETE FROM reviews WHERE product = ?', (product,))
+        raise RuntimeError('boom')
+
+    store._delete = failing_delete
+    with pytest.raises(RuntimeError):
+        store.delete('phone')
+    _, new = store.unseen('phone', ['a'], 'v1')
+    assert new == []
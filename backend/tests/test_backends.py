@@ -0,0 +1,64 @@
+import os
+import shutil
+
+import pytest
+
+from backends import QUANTIZED_FILENAME, TorchBackend, load_quantized_model
+
+torch = pytest.importorskip('torch')
+
+
+@pytest.fixture
+def checkpoint(tiny_checkpoint, tmp_path):
+    path = str(tmp_path / 'model')
+    shutil.copytree(tiny_checkpoint, path)
+    return path
+
+
+@pytest.fixture
+def quantize_calls(monkeypatch):
+    calls = []
+    quantize_dynamic = torch.ao.quantization.quantize_dynamic
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return quantize_dynamic(*args, **kwargs)
+
+    monkeypatch.setattr(torch.ao.quantization, 'quantize_dynamic', counting)
+    return calls
+
+
+def test_int8_cache_is_reused(checkpoint, quantize_calls):
+    load_quantized_model(checkpoint)
+    assert os.path.exists(os.path.join(checkpoint, QUANTIZED_FILENAME))
+    load_quantized_model(checkpoint)
+    assert len(quantize_calls) == 1
+
+
+def test_int8_cache_is_rebuilt_when_weights_change(checkpoint, quantize_calls):
+    from transformers import AutoModelForSequenceClassification
+
+    load_quantized_model(checkpoint)
+
+    model = AutoModelForSequenceClassification.from_pretrained(checkpoint)
+    with torch.no_grad():
+        model.classifier.out_proj.bias.add_(1.0)
+    model.save_pretrained(checkpoint)
+
+    quantized = load_quantized_model(checkpoint)
+    assert len(quantize_calls) == 2
+    assert torch.allclose(quantized.classifier.out_proj.bias(), model.classifier.out_proj.bias)
+
+
+def test_model_id_changes_when_weights_are_retrained_in_place(checkpoint):
+    from transformers import AutoModelForSequenceClassification
+
+    before = TorchBackend(checkpoint).model_id
+    assert before == TorchBackend(checkpoint).model_id
+
+    model = AutoModelForSequenceClassification.from_pretrained(checkpoint)
+    with torch.no_grad():
+        model.classifier.out_proj.bias.add_(1.0)
+    model.save_pretrained(checkpoint)
+
+    assert TorchBackend(checkpoint).model_id != before
@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import bulk_score
+
+
+def bulk_args(input_path, output, fmt):
+    return argparse.Namespace(
+        input=str(input_path), output=str(output), model_dir='rule-based', backend='rule', quantize=False,
+        workers=1, torch_threads=1, chunk_size=3, format=fmt, dedup_threshold=0.9, restart=False
+    )
+
+
+@pytest.fixture
+def reviews_csv(tmp_path):
+    path = tmp_path / 'reviews.csv'
+    pd.DataFrame({'text': [
+        "कैमरा बहुत बढ़िया है", "बॅटरी बॅकअप कमी आहे", "battery drains fast",
+        "डिस्प्ले बहुत अच्छा है", "camera बहुत अच्छा है"
+    ]}).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+def test_writes_scored_parts_and_resumes(reviews_csv, tmp_path, fmt):
+    if fmt == 'parquet':
+        pytest.importorskip('pyarrow')
+    output = tmp_path / 'scored'
+    bulk_score.run(bulk_args(reviews_csv, output, fmt))
+
+    parts = sorted(name for name in os.listdir(output) if name.startswith('part-'))
+    assert parts == [os.path.basename(bulk_score.part_path(output, chunk_id, fmt)) for chunk_id in (0, 1)]
+    read = pd.read_parquet if fmt == 'parquet' else pd.read_csv
+    scored = pd.concat([read(output / name) for name in parts], ignore_index=True)
+    assert scored['row'].tolist() == [0, 1, 2, 3, 4]
+    assert scored['detected_language'].tolist()[:4] == ['hindi', 'marathi', 'english', 'hindi']
+    assert scored['code_mixed'].tolist() == [False, False, False, False, True]
+    assert scored['sentiment_score'].between(0, 1).all()
+    assert 'aspect_camera' in scored
+
+    with open(output / bulk_score.CHECKPOINT_NAME, encoding='utf-8') as f:
+        assert json.load(f)['completed'] == {'0': 3, '1': 2}
+
+    # Rerunning the finished job scores nothing and leaves the parts alone
+    mtimes = [os.stat(output / name).st_mtime_ns for name in parts]
+    bulk_score.run(bulk_args(reviews_csv, output, fmt))
+    assert [os.stat(output / name).st_mtime_ns for name in parts] == mtimes
+
+
+def test_refuses_a_model_job_without_weights(reviews_csv, tmp_path):
+    args = bulk_args(reviews_csv, tmp_path / 'scored', 'csv')
+    args.backend, args.model_dir = 'torch', str(tmp_path / 'missing_model')
+    with pytest.raises(ValueError, match='No model weights'):
+        bulk_score.run(args)
+
+
+def test_fails_instead_of_falling_back_to_rules(reviews_csv, tmp_path):
+    model_dir = tmp_path / 'broken_model'
+    model_dir.mkdir()
+    (model_dir / 'model.safetensors').write_bytes(b'not a checkpoint')
+    args = bulk_args(reviews_csv, tmp_path / 'scored', 'csv')
+    args.backend, args.model_dir = 'torch', str(model_dir)
+    with pytest.raises(RuntimeError):
+        bulk_score.run(args)
+    assert not [name for name in os.listdir(args.output) if name.startswith('part-')]
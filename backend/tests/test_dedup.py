@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+
+from aspect_sentiment import AspectSentimentPipeline
+from aspect_extractor import AspectExtractor
+from dedup import Deduplicator
+from models import SentimentAnalyzer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEXTS = [
+    "battery life is great and lasts all day",
+    "battery life is great  and lasts all day ",
+    "battery life is great and lasts all day!!",
+    "camera is bad in low light"
+]
+
+
+def test_exact_and_near_duplicates():
+    groups = Deduplicator(threshold=0.5).group(TEXTS)
+    assert groups.representatives == [0, 3]
+    assert groups.assignment.tolist() == [0, 0, 0, 1]
+    assert (groups.exact_duplicates, groups.near_duplicates) == (1, 1)
+
+
+def test_groups_are_the_same_in_every_process():
+    script = (
+        "import json, sys; from dedup import Deduplicator; "
+        "print(json.dumps(Deduplicator(threshold=0.5).group(json.loads(sys.argv[1])).assignment.tolist()))"
+    )
+    results = set()
+    for seed in ('1', '2', '3'):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        output = subprocess.run([sys.executable, '-c', script, json.dumps(TEXTS)], cwd=BACKEND_DIR, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        results.add(output.strip())
+    assert len(results) == 1
+
+
+def test_pipeline_counts_only_deduplicator_collapses_as_duplicates():
+    pipeline = AspectSentimentPipeline(
+        SentimentAnalyzer(backend='rule'), AspectExtractor(), deduplicator=Deduplicator(threshold=1.0)
+    )
+    stats = {}
+    # The single-sentence review is also its own Battery span
+    pipeline.score(["battery is bad", "battery  is bad"], language='english', stats=stats)
+    assert stats['spans'] == 4
+    assert stats['repeated_spans'] == 2
+    assert stats['exact_duplicates'] == 1
+    assert stats['scored'] == 1
@@ -0,0 +1,35 @@
+import shutil
+
+import numpy as np
+import pytest
+
+pytest.importorskip('onnx')
+pytest.importorskip('onnxruntime')
+
+from export_onnx import DEFAULT_TOLERANCE, export  # noqa: E402 (needs torch, skipped above when missing)
+from models import SentimentAnalyzer  # noqa: E402
+
+TEXTS = [
+    "great phone with an amazing camera",
+    "battery drains very fast and the screen is not bright enough for outdoor use",
+    "बहुत अच्छा फोन है",
+    "कॅमेरा छान आहे पण बॅटरी कमी आहे",
+    "ok",
+    "worth the price " * 20
+]
+
+
+def test_onnx_export_matches_torch(tiny_checkpoint, tmp_path):
+    model_dir = str(tmp_path / 'model')
+    shutil.copytree(tiny_checkpoint, model_dir)
+    export(model_dir)
+
+    probabilities = {}
+    for backend in ('torch', 'onnx'):
+        analyzer = SentimentAnalyzer(model_dir, backend=backend)
+        assert not analyzer.is_rule_based, f"{backend} backend failed to load"
+        # Mixed lengths in one batch, so padding and attention masks are exercised too
+        probabilities[backend] = analyzer.predict_proba_batch(TEXTS, batch_size=4)
+
+    assert probabilities['onnx'].shape == (len(TEXTS), 3)
+    np.testing.assert_allclose(probabilities['onnx'], probabilities['torch'], atol=DEFAULT_TOLERANCE)
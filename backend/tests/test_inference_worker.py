@@ -0,0 +1,69 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from inference_worker import DeadlineExceededError, InferenceWorker, QueueFullError
+
+
+class ConstantAnalyzer:
+    def __init__(self, score=0.7, delay=0.0):
+        self.score = score
+        self.delay = delay
+        self.calls = 0
+        self.scored = 0
+
+    def predict_batch(self, texts, batch_size=32):
+        self.calls += 1
+        self.scored += len(texts)
+        time.sleep(self.delay)
+        return np.full(len(texts), self.score, dtype=np.float32)
+
+
+def test_request_larger_than_queue_is_admitted_in_chunks():
+    worker = InferenceWorker(ConstantAnalyzer(), max_batch_size=8, max_wait_ms=1, max_queue_depth=20)
+    scores = worker.predict_batch([str(i) for i in range(500)])
+    assert len(scores) == 500
+    assert np.allclose(scores, 0.7)
+    assert worker.stats()['rejected'] == 0
+    assert worker.queue_depth() == 0
+
+
+def test_concurrent_oversized_requests_all_complete():
+    worker = InferenceWorker(ConstantAnalyzer(), max_batch_size=8, max_wait_ms=1, max_queue_depth=16)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(worker.predict_batch(['x'] * 50)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert [len(r) for r in results] == [50] * 4
+
+
+def test_request_that_fits_is_rejected_when_queue_is_busy():
+    worker = InferenceWorker(ConstantAnalyzer(), max_queue_depth=4)
+    # Fill the queue without a running worker thread so it stays full
+    worker._ensure_started = lambda: None
+    worker.submit_many(['a', 'b', 'c'])
+    with pytest.raises(QueueFullError):
+        worker.submit_many(['d', 'e'])
+
+
+def test_deadline_drops_queued_texts():
+    analyzer = ConstantAnalyzer(delay=0.05)
+    worker = InferenceWorker(analyzer, max_batch_size=4, max_wait_ms=1)
+    with pytest.raises(DeadlineExceededError):
+        worker.predict_batch([str(i) for i in range(200)], deadline=time.monotonic() + 0.1)
+
+    time.sleep(0.2)
+    assert worker.queue_depth() == 0
+    # Only the batches already running at the deadline were scored
+    assert analyzer.scored < 40
+
+
+def test_deadline_met():
+    worker = InferenceWorker(ConstantAnalyzer(), max_batch_size=8, max_wait_ms=1)
+    scores = worker.predict_batch(['a'] * 20, deadline=time.monotonic() + 10)
+    assert np.allclose(scores, 0.7)
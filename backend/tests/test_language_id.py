@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from language_id import LanguageIdentifier
+from preprocessor import TextPreprocessor
+
+
+def test_identifies_hindi_marathi_and_mixed():
+    languages, mixed = LanguageIdentifier().identify_batch([
+        "बैटरी जल्दी खत्म होती है", "बॅटरी लवकर संपते", "camera is good", "camera बहुत अच्छा है"
+    ])
+    assert languages.tolist()[:3] == ['hindi', 'marathi', 'english']
+    assert mixed.tolist() == [False, False, False, True]
+
+
+def test_batch_agrees_with_per_text():
+    identifier = LanguageIdentifier()
+    texts = [
+        "बॅटरी खूप छान आहे.", "कैमरा अच्छा है।", "xआहे और", "आहे_x है", "display ठीक 😀", "किंमत जास्त, पण मस्त",
+        "ñandu", "", None, "१२३", "batteryआहे", "है है आहे"
+    ]
+    languages, _ = identifier.identify_batch(texts)
+    assert languages.tolist() == [identifier.identify(text) for text in texts]
+
+
+def test_marker_in_both_languages_is_rejected(tmp_path):
+    path = tmp_path / 'markers.json'
+    path.write_text(json.dumps({'marathi': ['आहे', 'होता'], 'hindi': ['है', 'होता']}), encoding='utf-8')
+    with pytest.raises(ValueError, match='होता'):
+        LanguageIdentifier(str(path))
+
+
+def test_english_stopwords_ignore_case():
+    preprocessor = TextPreprocessor()
+    assert preprocessor.remove_stopwords("The camera Is great and THIS works", 'english') == "camera great works"
+
+
+def test_stopwords_without_language_match_identified_language():
+    preprocessor = TextPreprocessor()
+    for text in ["बॅटरी आणि कॅमेरा छान आहे", "कैमरा और बैटरी अच्छी है", "The camera is great", "बॅटरी  मस्त"]:
+        language = preprocessor.language_identifier.identify(text)
+        assert preprocessor.remove_stopwords(text) == preprocessor.remove_stopwords(text, language)
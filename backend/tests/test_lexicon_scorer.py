@@ -0,0 +1,29 @@
+import pytest
+
+from lexicon_scorer import NEGATIVE_SCORE, NEUTRAL_SCORE, POSITIVE_SCORE, LexiconScorer
+
+
+def test_entries_only_match_whole_words():
+    scorer = LexiconScorer()
+    # 'कम' inside 'कमरा' (room) and 'good' inside 'goodbye' are not sentiment
+    assert scorer.score_batch(["कमरा बड़ा है", "goodbye old phone"]).tolist() == pytest.approx([NEUTRAL_SCORE, NEUTRAL_SCORE])
+
+
+def test_listed_inflections_match():
+    scorer = LexiconScorer()
+    scores = scorer.score_batch(["बैटरी कमजोर है", "I loved this phone", "फोटो अच्छे आते हैं"])
+    assert scores.tolist() == pytest.approx([NEGATIVE_SCORE, POSITIVE_SCORE, POSITIVE_SCORE])
+
+
+def test_negation_flips_nearest_word():
+    scorer = LexiconScorer()
+    assert scorer.score_batch(["कैमरा अच्छा नहीं है", "not bad at all"]).tolist() == pytest.approx([NEGATIVE_SCORE, POSITIVE_SCORE])
+
+
+def test_single_text_matches_batch():
+    scorer = LexiconScorer()
+    texts = [
+        "कैमरा अच्छा नहीं है", "बैटरी खराब नहीं है", "not good at all", "फोन काम नहीं करता",
+        "कॅमेरा चांगला नाही", "Great camera, bad battery", "कमरा बड़ा है", "", None
+    ]
+    assert [scorer.score(text) for text in texts] == pytest.approx(scorer.score_batch(texts).tolist())
@@ -0,0 +1,46 @@
+import pytest
+
+from models import SentimentAnalyzer
+
+
+def test_warmup_marks_warm_on_success():
+    analyzer = SentimentAnalyzer(backend='rule')
+    analyzer.warmup(rounds=1)
+    assert analyzer.warm.is_set()
+    assert analyzer.warmup_error is None
+
+
+def test_failed_warmup_is_not_warm(monkeypatch):
+    analyzer = SentimentAnalyzer(backend='rule')
+
+    def broken(texts, batch_size):
+        raise RuntimeError("out of memory")
+
+    monkeypatch.setattr(analyzer, '_run_model', broken)
+    with pytest.raises(RuntimeError):
+        analyzer.warmup(rounds=1)
+    assert not analyzer.warm.is_set()
+    assert analyzer.warmup_error == "RuntimeError: out of memory"
+
+
+def test_unloaded_analyzer_never_reloads(tiny_checkpoint, monkeypatch):
+    import backends
+
+    analyzer = SentimentAnalyzer(tiny_checkpoint)
+    assert not analyzer.is_rule_based
+
+    # A hot swap unloads the analyzer while one of its batches is still running
+    real_run_model = SentimentAnalyzer._run_model
+
+    def swap_mid_batch(self, texts, batch_size, backend=None):
+        backend = backend or self.backend
+        self.unload()
+        return real_run_model(self, texts, batch_size, backend)
+
+    monkeypatch.setattr(SentimentAnalyzer, '_run_model', swap_mid_batch)
+    scores = analyzer.predict_batch(["great phone", "battery drains very fast"])
+
+    assert len(scores) == 2
+    assert ('torch', tiny_checkpoint, False) not in backends._loaded_backends
+    with pytest.raises(RuntimeError):
+        analyzer.backend
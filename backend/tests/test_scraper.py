@@ -0,0 +1,87 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from scraper import ReviewScraper
+
+REVIEW_PAGES = 3  # pages 1-3 have reviews, page 4 is empty
+FLAKY_PAGE = 2    # answers 503 the first time
+
+
+def amazon_page(page):
+    if page > REVIEW_PAGES:
+        return '<html><body></body></html>'
+    reviews = ''.join(
+        f'<div data-hook="review"><i data-hook="review-star-rating"><span>4.0 out of 5</span></i>'
+        f'<span data-hook="review-body">page {page} review {i}</span></div>'
+        for i in range(2)
+    )
+    return f'<html><body>{reviews}</body></html>'
+
+
+@pytest.fixture
+def review_server():
+    requests_seen = []  # (monotonic time, page)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            page = int(parse_qs(urlsplit(self.path).query).get('pageNumber', ['1'])[0])
+            with lock:
+                requests_seen.append((time.monotonic(), page))
+                attempts = sum(1 for _, seen in requests_seen if seen == page)
+            if page == FLAKY_PAGE and attempts == 1:
+                self.send_response(503)
+                self.end_headers()
+                return
+            body = amazon_page(page).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/product", requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+def test_pages_in_order_with_retry_and_early_stop(review_server):
+    url, requests_seen = review_server
+    scraper = ReviewScraper(max_workers=4, requests_per_second=50, burst=1, prefetch=2, retries=2)
+    try:
+        reviews = list(scraper.iter_reviews(url, platform='amazon', max_pages=20))
+    finally:
+        scraper.close()
+
+    assert [r['text'] for r in reviews] == [
+        f"page {page} review {i}" for page in range(1, REVIEW_PAGES + 1) for i in range(2)
+    ]
+    pages = [page for _, page in requests_seen]
+    assert pages.count(FLAKY_PAGE) == 2
+    # Nothing is fetched more than `prefetch` pages past the empty page
+    assert max(pages) <= REVIEW_PAGES + 2
+
+
+def test_requests_respect_rate_limit(review_server):
+    url, requests_seen = review_server
+    rate = 20
+    scraper = ReviewScraper(max_workers=4, requests_per_second=rate, burst=1, prefetch=3)
+    try:
+        results = scraper.scrape_many([url], platform='amazon', max_pages=REVIEW_PAGES)
+    finally:
+        scraper.close()
+
+    assert len(results[url]) == REVIEW_PAGES * 2
+    times = sorted(t for t, _ in requests_seen)
+    # burst=1: each request after the first waits for a fresh token
+    assert times[-1] - times[0] >= (len(times) - 1) / rate * 0.9
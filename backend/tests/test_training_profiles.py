@@ -0,0 +1,49 @@
+import pytest
+
+pytest.importorskip('torch')
+transformers = pytest.importorskip('transformers')
+
+from token_cache import DynamicPaddingCollator, MemmapReviewDataset, build_token_cache
+from training_profiles import EpochThroughputCallback, TokenCacheTrainer, build_training_args
+
+TEXTS = ["great phone", "battery drains very fast and the screen is dim", "worth the price", "कॅमेरा छान आहे"] * 5
+
+
+@pytest.fixture
+def cached_dataset(tiny_checkpoint, tmp_path):
+    tokenizer = transformers.AutoTokenizer.from_pretrained(tiny_checkpoint)
+    path = build_token_cache(tokenizer, TEXTS, [i % 3 for i in range(len(TEXTS))], 32, cache_dir=str(tmp_path))
+    return tokenizer, MemmapReviewDataset(path)
+
+
+def test_length_grouping_reads_lengths_from_the_cache(tiny_checkpoint, cached_dataset, tmp_path, monkeypatch):
+    tokenizer, dataset = cached_dataset
+    trainer = TokenCacheTrainer(
+        model=transformers.AutoModelForSequenceClassification.from_pretrained(tiny_checkpoint),
+        args=build_training_args('cpu', output_dir=str(tmp_path / 'out'), dataloader_num_workers=0),
+        train_dataset=dataset,
+        data_collator=DynamicPaddingCollator(tokenizer.pad_token_id)
+    )
+    # Building the sampler must not read every row
+    monkeypatch.setattr(MemmapReviewDataset, '__getitem__', lambda self, idx: pytest.fail("row was read"))
+
+    sampler = trainer._get_train_sampler()
+    assert isinstance(sampler, transformers.trainer_pt_utils.LengthGroupedSampler)
+    assert sampler.lengths == dataset.lengths.tolist()
+    assert sorted(sampler) == list(range(len(TEXTS)))
+
+
+def test_epoch_report_counts_the_real_dataset_size(tiny_checkpoint, cached_dataset, tmp_path):
+    tokenizer, dataset = cached_dataset
+    callback = EpochThroughputCallback()
+    trainer = TokenCacheTrainer(
+        model=transformers.AutoModelForSequenceClassification.from_pretrained(tiny_checkpoint),
+        # 20 rows in batches of 3: the last batch of each epoch has 2
+        args=build_training_args('default', output_dir=str(tmp_path / 'out'), num_train_epochs=2,
+                                 per_device_train_batch_size=3, save_strategy='no', report_to=[]),
+        train_dataset=dataset,
+        data_collator=DynamicPaddingCollator(tokenizer.pad_token_id),
+        callbacks=[callback]
+    )
+    trainer.train()
+    assert [epoch['samples'] for epoch in callback.epochs] == [len(TEXTS), len(TEXTS)]
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'token_cache')
+
+# Bump when the on-disk layout changes so old caches are rebuilt
+_CACHE_FORMAT = 1
+
+
+def cache_key(tokenizer, max_length, texts, labels):
+    """Hash of everything that determines the tokenized output"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        'format': _CACHE_FORMAT,
+        'tokenizer': getattr(tokenizer, 'name_or_path', ''),
+        'tokenizer_class': type(tokenizer).__name__,
+        'vocab_size': len(tokenizer),
+        'max_length': max_length
+    }, sort_keys=True).encode('utf-8'))
+    for text, label in zip(texts, labels):
+        digest.update(f"{label}\t{text}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def build_token_cache(tokenizer, texts, labels, max_length, cache_dir=DEFAULT_CACHE_DIR, batch_size=1000):
+    """
+    Tokenize texts once (no padding) into flat memory-mappable arrays:
+    input_ids.npy (all ids back to back), offsets.npy (n + 1 row starts), labels.npy.
+    Reuses an existing cache with the same key.
+    Returns: the cache directory
+    """
+    texts = list(texts)
+    labels = list(labels)
+    path = os.path.join(cache_dir, cache_key(tokenizer, max_length, texts, labels))
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        print(f"♻️  Using tokenized cache {path}")
+        return path
+
+    rows, lengths = [], []
+    for start in range(0, len(texts), batch_size):
+        encodings = tokenizer(texts[start:start + batch_size], truncation=True, max_length=max_length)
+        for ids in encodings['input_ids']:
+            rows.append(np.asarray(ids, dtype=np.int32))
+            lengths.append(len(ids))
+
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    input_ids = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+
+    # Write next to the final location, then rename, so a crash never leaves a half cache
+    staging = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    np.save(os.path.join(staging, 'input_ids.npy'), input_ids)
+    np.save(os.path.join(staging, 'offsets.npy'), offsets)
+    np.save(os.path.join(staging, 'labels.npy'), np.asarray(labels, dtype=np.int64))
+    with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'rows': len(rows),
+            'tokens': int(offsets[-1]),
+            'max_length': max_length,
+            'pad_token_id': tokenizer.pad_token_id,
+            'tokenizer': getattr(tokenizer, 'name_or_path', '')
+        }, f, indent=2)
+    try:
+        os.replace(staging, path)
+    except OSError:
+        # Another process finished the same cache first
+        shutil.rmtree(staging, ignore_errors=True)
+
+    print(f"💾 Tokenized {len(rows)} texts into {path}")
+    return path
+
+
+class MemmapReviewDataset:
+    """
+    Map-style dataset over a token cache. Arrays are memory-mapped, so items
+    are zero-copy slices of the page cache rather than fresh Python lists.
+    """
+
+    def __init__(self, path):
+        self._open(path)
+
+    def _open(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.input_ids = np.load(os.path.join(path, 'input_ids.npy'), mmap_mode='r')
+        self.offsets = np.load(os.path.join(path, 'offsets.npy'), mmap_mode='r')
+        self.labels = np.load(os.path.join(path, 'labels.npy'), mmap_mode='r')
+
+    # Dataloader workers reopen the maps instead of receiving pickled copies of the arrays
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self._open(state['path'])
+
+    @property
+    def lengths(self):
+        """Token count of every row"""
+        return np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, idx):
+        return {
+            'input_ids': self.input_ids[self.offsets[idx]:self.offsets[idx + 1]],
+            'labels': self.labels[idx]
+        }
+
+
+class DynamicPaddingCollator:
+    """Pad a batch only to its own longest row and build the attention mask"""
+
+    def __init__(self, pad_token_id, pad_to_multiple_of=None):
+        self.pad_token_id = pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features):
+        import torch
+
+        width = max(len(f['input_ids']) for f in features)
+        if self.pad_to_multiple_of:
+            width = -(-width // self.pad_to_multiple_of) * self.pad_to_multiple_of
+
+        input_ids = np.full((len(features), width), self.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(features), width), dtype=np.int64)
+        for row, feature in enumerate(features):
+            length = len(feature['input_ids'])
+            input_ids[row, :length] = feature['input_ids']
+            attention_mask[row, :length] = 1
+
+        return {
+            'input_ids': torch.from_numpy(input_ids),
+            'attention_mask': torch.from_numpy(attention_mask),
+            'labels': torch.as_tensor(np.asarray([f['labels'] for f in features], dtype=np.int64))
+        }
@@ -1,7 +1,29 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, Trainer, TrainingArguments
+import argparse
+import os
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from transformers.trainer_utils import get_last_checkpoint
 import pandas as pd
 from sklearn.model_selection import train_test_split
-import torch
+from models import DEFAULT_MAX_LENGTH
+from model_registry import ModelRegistry
+from token_cache import DynamicPaddingCollator, MemmapReviewDataset, build_token_cache
+from training_profiles import (
+    TRAINING_PROFILES, EpochThroughputCallback, TokenCacheTrainer, build_training_args, configure_cpu_threads,
+    freeze_encoder_layers
+)
+
+parser = argparse.ArgumentParser(description="Fine-tune the sentiment model")
+parser.add_argument('--profile', choices=sorted(TRAINING_PROFILES), default='default',
+                    help="'cpu' groups batches by length, accumulates gradients, "
+                         "loads data in parallel and checkpoints every epoch")
+parser.add_argument('--epochs', type=float, default=3)
+parser.add_argument('--batch-size', type=int, default=None, help="per-device train batch size")
+parser.add_argument('--grad-accum', type=int, default=None, help="gradient accumulation steps")
+parser.add_argument('--workers', type=int, default=None, help="dataloader worker processes")
+parser.add_argument('--freeze-layers', type=int, default=0,
+                    help="freeze the embeddings and this many lower encoder layers")
+parser.add_argument('--resume', action='store_true', help="continue from the last checkpoint in ./trained_model1")
+args = parser.parse_args()
 
 print("🚀 Starting Model Training...")
 
@@ -31,53 +53,65 @@ model = AutoModelForSequenceClassification.from_pretrained(model_name, num_label
 
 print("✅ Model loaded")
 
-# Tokenize
-train_encodings = tokenizer(train_texts, truncation=True, padding=True, max_length=128)
-val_encodings = tokenizer(val_texts, truncation=True, padding=True, max_length=128)
-
-# Create dataset
-class ReviewDataset(torch.utils.data.Dataset):
-    def __init__(self, encodings, labels):
-        self.encodings = encodings
-        self.labels = labels
-
-    def __getitem__(self, idx):
-        item = {key: torch.tensor(val[idx]) for key, val in self.encodings.items()}
-        item['labels'] = torch.tensor(self.labels[idx])
-        return item
+if args.freeze_layers:
+    trainable = freeze_encoder_layers(model, args.freeze_layers)
+    print(f"🧊 Froze {args.freeze_layers} encoder layers, {trainable:,} parameters left trainable")
 
-    def __len__(self):
-        return len(self.labels)
+# Tokenize once into memory-mapped caches; re-runs with the same data and tokenizer skip this
+train_dataset = MemmapReviewDataset(build_token_cache(tokenizer, train_texts, train_labels, DEFAULT_MAX_LENGTH))
+val_dataset = MemmapReviewDataset(build_token_cache(tokenizer, val_texts, val_labels, DEFAULT_MAX_LENGTH))
 
-train_dataset = ReviewDataset(train_encodings, train_labels)
-val_dataset = ReviewDataset(val_encodings, val_labels)
+# Pad each batch only to its own longest review
+data_collator = DynamicPaddingCollator(tokenizer.pad_token_id)
 
-training_args = TrainingArguments(
+training_args = build_training_args(
+    args.profile,
     output_dir='./trained_model1',
-    num_train_epochs=3,
-    per_device_train_batch_size=8,
-    per_device_eval_batch_size=8,
+    num_train_epochs=args.epochs,
+    per_device_train_batch_size=args.batch_size,
+    gradient_accumulation_steps=args.grad_accum,
+    dataloader_num_workers=args.workers,
     warmup_steps=100,
     weight_decay=0.01,
     logging_dir='./logs',
     logging_steps=10,
-    # evaluation_strategy="epoch",  # remove or comment out
-    # save_strategy="epoch"         # remove or comment out
 )
 
-trainer = Trainer(
+if args.profile == 'cpu':
+    threads = configure_cpu_threads(training_args.dataloader_num_workers)
+    print(f"🧵 {threads} compute threads, {training_args.dataloader_num_workers} dataloader workers")
+
+# Length grouping reads row lengths from the token cache's offsets
+trainer = TokenCacheTrainer(
     model=model,
     args=training_args,
     train_dataset=train_dataset,
-    eval_dataset=val_dataset
+    eval_dataset=val_dataset,
+    data_collator=data_collator,
+    callbacks=[EpochThroughputCallback()]
 )
 
+resume_from = None
+if args.resume:
+    resume_from = get_last_checkpoint(training_args.output_dir) if os.path.isdir(training_args.output_dir) else None
+    print(f"↩️  Resuming from {resume_from}" if resume_from else "No checkpoint found, starting fresh")
+
 print("🔥 Training started...")
-trainer.train()
+trainer.train(resume_from_checkpoint=resume_from)
 
 # Save model
 model.save_pretrained('./trained_model')
 tokenizer.save_pretrained('./trained_model')
 
 print("✅ Model saved to ./trained_model")
+
+# Register a new version so the server can load it by name
+version = ModelRegistry().register(
+    './trained_model',
+    base_model=model_name,
+    max_length=DEFAULT_MAX_LENGTH,
+    label_map=sentiment_map,
+    metrics={k: float(v) for k, v in trainer.evaluate().items()}
+)
+print(f"📦 Registered model version {version}")
 print("🎉 Training complete!")
\ No newline at end of file
@@ -0,0 +1,138 @@
+import inspect
+import json
+import os
+import time
+
+from transformers import Trainer, TrainerCallback, TrainingArguments
+from transformers.trainer_pt_utils import LengthGroupedSampler
+
+# TrainingArguments overrides per hardware profile; 'default' is the original setup
+TRAINING_PROFILES = {
+    'default': {
+        'per_device_train_batch_size': 8,
+        'per_device_eval_batch_size': 8,
+    },
+    'cpu': {
+        # 16 x 2 accumulation = effective batch of 32 without the memory of one
+        'per_device_train_batch_size': 16,
+        'per_device_eval_batch_size': 32,
+        'gradient_accumulation_steps': 2,
+        'group_by_length': True,
+        'dataloader_num_workers': 2,
+        'dataloader_pin_memory': False,
+        'save_strategy': 'epoch',
+        'save_total_limit': 2,
+    },
+}
+
+
+def build_training_args(profile='default', **overrides):
+    """TrainingArguments for a profile, with explicit overrides taking precedence"""
+    if profile not in TRAINING_PROFILES:
+        raise ValueError(f"Unknown training profile {profile!r}, expected one of {sorted(TRAINING_PROFILES)}")
+    kwargs = {**TRAINING_PROFILES[profile], **{k: v for k, v in overrides.items() if v is not None}}
+
+    # Newer transformers replaced group_by_length with train_sampling_strategy
+    if kwargs.pop('group_by_length', False):
+        if 'group_by_length' in inspect.signature(TrainingArguments).parameters:
+            kwargs['group_by_length'] = True
+        else:
+            kwargs['train_sampling_strategy'] = 'group_by_length'
+
+    return TrainingArguments(**kwargs)
+
+
+class TokenCacheTrainer(Trainer):
+    """
+    Trainer whose length-grouped sampler takes row lengths from the token
+    cache (MemmapReviewDataset.lengths) instead of reading every item
+    """
+
+    def _get_train_sampler(self, *args, **kwargs):
+        # Older transformers call this without the dataset argument
+        dataset = (args or [kwargs.get('train_dataset')])[0] or self.train_dataset
+        grouped = (getattr(self.args, 'group_by_length', False)
+                   or getattr(self.args, 'train_sampling_strategy', None) == 'group_by_length')
+        if grouped and hasattr(dataset, 'lengths'):
+            return LengthGroupedSampler(
+                self.args.train_batch_size * self.args.gradient_accumulation_steps,
+                lengths=dataset.lengths.tolist()
+            )
+        return super()._get_train_sampler(*args, **kwargs)
+
+
+def configure_cpu_threads(dataloader_workers):
+    """Leave a core per dataloader worker so they don't fight the compute threads"""
+    import torch
+
+    threads = max(1, (os.cpu_count() or 1) - dataloader_workers)
+    torch.set_num_threads(threads)
+    return threads
+
+
+def freeze_encoder_layers(model, num_layers):
+    """
+    Freeze the embeddings and the lowest num_layers encoder layers
+    Returns: number of parameters left trainable
+    """
+    if num_layers > 0:
+        base = model.base_model
+        for param in base.embeddings.parameters():
+            param.requires_grad = False
+        for layer in base.encoder.layer[:num_layers]:
+            for param in layer.parameters():
+                param.requires_grad = False
+    return sum(p.numel() for p in model.parameters() if p.requires_grad)
+
+
+class EpochThroughputCallback(TrainerCallback):
+    """Print wall-clock time and samples/sec per epoch, and save them to epoch_report.json"""
+
+    def __init__(self):
+        self.epochs = []
+        self._started = None
+        self._start_step = 0
+        self._start_epoch = 0.0
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        # A resumed run keeps the report of the epochs it already finished
+        path = os.path.join(args.output_dir, 'epoch_report.json')
+        if state.global_step and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.epochs = [e for e in json.load(f) if e['epoch'] <= (state.epoch or 0)]
+
+    def on_epoch_begin(self, args, state, control, **kwargs):
+        self._started = time.perf_counter()
+        self._start_step = state.global_step
+        self._start_epoch = state.epoch or 0.0
+
+    def on_epoch_end(self, args, state, control, **kwargs):
+        if self._started is None:
+            return
+        elapsed = time.perf_counter() - self._started
+        dataset = getattr(kwargs.get('train_dataloader'), 'dataset', None)
+        try:
+            # The share of the dataset this epoch covered (a whole epoch, or less
+            # when resumed or stopped mid-epoch), so the last partial batch counts
+            # as its real size
+            samples = round(((state.epoch or 0.0) - self._start_epoch) * len(dataset))
+        except TypeError:
+            # No dataset length (iterable dataset): every step counted as full
+            samples = (
+                (state.global_step - self._start_step)
+                * args.per_device_train_batch_size * args.gradient_accumulation_steps * args.world_size
+            )
+        report = {
+            'epoch': round(state.epoch or 0, 2),
+            'seconds': round(elapsed, 2),
+            'samples': samples,
+            'samples_per_second': round(samples / elapsed, 2) if elapsed else 0.0
+        }
+        self.epochs.append(report)
+        print(f"⏱️  Epoch {report['epoch']}: {report['seconds']}s, "
+              f"{report['samples_per_second']} samples/s")
+
+        if state.is_world_process_zero:
+            os.makedirs(args.output_dir, exist_ok=True)
+            with open(os.path.join(args.output_dir, 'epoch_report.json'), 'w', encoding='utf-8') as f:
+                json.dump(self.epochs, f, indent=2)
@@ -36,22 +36,34 @@ marathi_negative = [
 languages = ["hindi", "marathi"]
 sentiments = ["positive", "negative"]
 
-rows = []
-
-for _ in range(1000):
-    lang = random.choice(languages)
-    if lang == "hindi":
-        sentiment = random.choice(["positive","negative"])
-        text = random.choice(hindi_positive if sentiment=="positive" else hindi_negative)
-    else:
-        sentiment = random.choice(["positive","negative"])
-        text = random.choice(marathi_positive if sentiment=="positive" else marathi_negative)
-    rows.append([text, sentiment, lang])
-
-# Write CSV
-with open("product_reviews1.csv", "w", newline="", encoding="utf-8") as f:
-    writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-    writer.writerow(["text","sentiment","language"])
-    writer.writerows(rows)
-
-print("✅ product_reviews.csv generated with 1000 rows")
+
+def generate_reviews(count=1000, seed=None):
+    """Synthetic labelled reviews as [text, sentiment, language] rows"""
+    rng = random.Random(seed)
+    rows = []
+
+    for _ in range(count):
+        lang = rng.choice(languages)
+        if lang == "hindi":
+            sentiment = rng.choice(["positive","negative"])
+            text = rng.choice(hindi_positive if sentiment=="positive" else hindi_negative)
+        else:
+            sentiment = rng.choice(["positive","negative"])
+            text = rng.choice(marathi_positive if sentiment=="positive" else marathi_negative)
+        rows.append([text, sentiment, lang])
+
+    return rows
+
+
+def write_reviews(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(["text","sentiment","language"])
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    # Write CSV
+    write_reviews(generate_reviews(1000), "product_reviews1.csv")
+
+    print("✅ product_reviews.csv generated with 1000 rows")